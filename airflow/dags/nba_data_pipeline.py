@@ -1,7 +1,9 @@
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Dict, List
 
-from airflow.decorators import dag
+from airflow.decorators import dag, task, task_group
+from airflow.operators.python import get_current_context
 from airflow.providers.docker.operators.docker import DockerOperator
 
 default_args = {
@@ -27,6 +29,40 @@ docker_env = {
   "MINIO_SECURE": os.getenv("MINIO_SECURE"),
 }
 
+# Caps concurrent scraper containers across all shards and runs; created by airflow-init
+SCRAPER_POOL = "nba_scraper"
+RAW_OUTPUT_DIR = "player_box_scores"
+# How far back the corrections DAG re-checks box scores for stat corrections
+RECHECK_DAYS = int(os.getenv("NBA_RECHECK_DAYS", "3"))
+# Default number of scrape queue workers the queue backfill DAG starts
+QUEUE_WORKERS = int(os.getenv("NBA_QUEUE_WORKERS", "4"))
+
+
+def season_for(day: date) -> str:
+  """
+  NBA season ('YYYY-YY') a calendar day belongs to; October starts a new season.
+  """
+  start_year = day.year if day.month >= 10 else day.year - 1
+  return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def split_into_shards(start: date, end: date, shard_by: str = "month") -> List[Dict[str, str]]:
+  """
+  Split the inclusive range [start, end] into day or calendar-month shards.
+  Shards never cross a season boundary since seasons start on the first of a month.
+  """
+  shards = []
+  shard_start = start
+  while shard_start <= end:
+    if shard_by == "day":
+      shard_end = shard_start
+    else:
+      next_month = (shard_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+      shard_end = min(end, next_month - timedelta(days=1))
+    shards.append({"season": season_for(shard_start), "start": shard_start.isoformat(), "end": shard_end.isoformat()})
+    shard_start = shard_end + timedelta(days=1)
+  return shards
+
 
 @dag(
   default_args=default_args,
@@ -36,29 +72,266 @@ docker_env = {
   tags=["nba", "data-pipeline"],
 )
 def nba_data_pipeline():
+  @task
+  def plan_shards() -> List[Dict[str, str]]:
+    """
+    Shards for this run: the data interval by default, or dag_run.conf
+    {"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "shard_by": "month" | "day"} for backfills.
+    """
+    context = get_current_context()
+    conf = context["dag_run"].conf or {}
+    if conf.get("start_date") and conf.get("end_date"):
+      start = date.fromisoformat(conf["start_date"])
+      end = date.fromisoformat(conf["end_date"])
+    else:
+      start = context["data_interval_start"].date()
+      end = max(start, (context["data_interval_end"] - timedelta(days=1)).date())
+
+    run_timestamp = context["logical_date"].strftime("%Y-%m-%d_%H-%M-%S")
+    shards = split_into_shards(start, end, conf.get("shard_by", "month"))
+    for shard in shards:
+      shard["object_name"] = (
+        f"{RAW_OUTPUT_DIR}/{shard['season']}/"
+        f"nba_player_stats_{shard['season']}_{shard['start']}_to_{shard['end']}_{run_timestamp}.csv"
+      )
+    return shards
+
+  @task_group
+  def shard_pipeline(shard: Dict[str, str]):
+    @task
+    def ingestion_environment(shard: Dict[str, str]) -> Dict[str, str]:
+      return {
+        **docker_env,
+        "SCRAPE_SEASON": shard["season"],
+        "SCRAPE_START_DATE": shard["start"][5:],
+        "SCRAPE_END_DATE": shard["end"][5:],
+        "OUTPUT_OBJECT_NAME": shard["object_name"],
+      }
+
+    @task
+    def processing_environment(shard: Dict[str, str]) -> Dict[str, str]:
+      return {**docker_env, "INPUT_OBJECT_NAME": shard["object_name"]}
+
+    data_ingestion = DockerOperator(
+      task_id="run_data_ingestion",
+      image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-ingestion:latest",
+      command="python data_ingestion/main.py",
+      network_mode="nba_network",
+      auto_remove=True,
+      docker_url="unix://var/run/docker.sock",
+      environment=ingestion_environment(shard),
+      mount_tmp_dir=False,
+      pool=SCRAPER_POOL,
+    )
+
+    data_processing = DockerOperator(
+      task_id="run_data_processing",
+      image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-processing:latest",
+      command="python data_processing/main.py",
+      network_mode="nba_network",
+      auto_remove=True,
+      docker_url="unix://var/run/docker.sock",
+      environment=processing_environment(shard),
+      mount_tmp_dir=False,
+    )
+
+    data_ingestion >> data_processing
+
+  @task
+  def feature_environment(shards: List[Dict[str, str]]) -> Dict[str, str]:
+    return {
+      **docker_env,
+      "FEATURE_START_DATE": min(shard["start"] for shard in shards),
+      "FEATURE_END_DATE": max(shard["end"] for shard in shards),
+    }
+
+  shards = plan_shards()
+
+  # Each mapped group instance chains its own ingestion and processing, so a shard's processing
+  # starts as soon as that shard is scraped instead of waiting for every shard.
+  processed = shard_pipeline.expand(shard=shards)
+
+  # Rolling features look back across shard boundaries, so they run once every shard is stored
+  feature_generation = DockerOperator(
+    task_id="run_feature_generation",
+    image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/feature-generation:latest",
+    command="python feature_generation/main.py",
+    network_mode="nba_network",
+    auto_remove=True,
+    docker_url="unix://var/run/docker.sock",
+    environment=feature_environment(shards),
+    mount_tmp_dir=False,
+  )
+
+  processed >> feature_generation
+
+
+nba_data_pipeline()
+
+
+@dag(
+  default_args=default_args,
+  description="Re-check recent NBA box scores and upsert the games whose stats were corrected",
+  schedule_interval=timedelta(days=1),
+  catchup=False,
+  tags=["nba", "data-pipeline"],
+)
+def nba_stat_corrections():
+  @task
+  def plan_recheck() -> Dict[str, str]:
+    """
+    The re-checked window, ending on the run's data interval end, and the corrections object to write.
+    """
+    context = get_current_context()
+    end = context["data_interval_end"].date()
+    start = end - timedelta(days=RECHECK_DAYS - 1)
+    run_timestamp = context["logical_date"].strftime("%Y-%m-%d_%H-%M-%S")
+    return {
+      "start": start.isoformat(),
+      "end": end.isoformat(),
+      "object_name": f"{RAW_OUTPUT_DIR}/corrections/nba_player_stats_corrections_{start}_to_{end}_{run_timestamp}.csv",
+    }
+
+  @task
+  def ingestion_environment(recheck: Dict[str, str]) -> Dict[str, str]:
+    return {**docker_env, "RECHECK_DAYS": str(RECHECK_DAYS), "OUTPUT_OBJECT_NAME": recheck["object_name"]}
+
+  @task
+  def processing_environment(recheck: Dict[str, str]) -> Dict[str, str]:
+    return {**docker_env, "INPUT_OBJECT_NAME": recheck["object_name"]}
+
+  @task
+  def feature_environment(recheck: Dict[str, str]) -> Dict[str, str]:
+    # Rolling features of every later game include the corrected ones
+    return {**docker_env, "FEATURE_START_DATE": recheck["start"], "FEATURE_END_DATE": recheck["end"]}
+
+  recheck = plan_recheck()
+
   data_ingestion = DockerOperator(
-    task_id="run_data_ingestion",
+    task_id="run_box_score_recheck",
     image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-ingestion:latest",
     command="python data_ingestion/main.py",
     network_mode="nba_network",
     auto_remove=True,
     docker_url="unix://var/run/docker.sock",
-    environment=docker_env,
+    environment=ingestion_environment(recheck),
     mount_tmp_dir=False,
+    pool=SCRAPER_POOL,
   )
 
   data_processing = DockerOperator(
-    task_id="run_data_processing",
+    task_id="run_corrections_processing",
     image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-processing:latest",
     command="python data_processing/main.py",
     network_mode="nba_network",
     auto_remove=True,
     docker_url="unix://var/run/docker.sock",
-    environment=docker_env,
+    environment=processing_environment(recheck),
     mount_tmp_dir=False,
   )
 
-  data_ingestion >> data_processing
+  feature_generation = DockerOperator(
+    task_id="run_feature_generation",
+    image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/feature-generation:latest",
+    command="python feature_generation/main.py",
+    network_mode="nba_network",
+    auto_remove=True,
+    docker_url="unix://var/run/docker.sock",
+    environment=feature_environment(recheck),
+    mount_tmp_dir=False,
+  )
 
+  data_ingestion >> data_processing >> feature_generation
 
-nba_data_pipeline()
+
+nba_stat_corrections()
+
+
+@dag(
+  default_args=default_args,
+  description="Backfill NBA box scores through the Postgres scrape queue with several parallel workers",
+  schedule_interval=None,
+  catchup=False,
+  tags=["nba", "data-pipeline"],
+)
+def nba_queue_backfill():
+  @task
+  def plan_seasons() -> List[Dict[str, str]]:
+    """
+    One planner environment per season of dag_run.conf {"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}.
+    """
+    conf = get_current_context()["dag_run"].conf or {}
+    seasons: Dict[str, Dict[str, str]] = {}
+    for shard in split_into_shards(date.fromisoformat(conf["start_date"]), date.fromisoformat(conf["end_date"])):
+      seasons.setdefault(shard["season"], {"start": shard["start"]})["end"] = shard["end"]
+    return [
+      {**docker_env, "QUEUE_ROLE": "plan", "SCRAPE_SEASON": season, "SCRAPE_START_DATE": dates["start"][5:],
+       "SCRAPE_END_DATE": dates["end"][5:]}
+      for season, dates in seasons.items()
+    ]  # fmt: skip
+
+  @task
+  def worker_environments() -> List[Dict[str, str]]:
+    """
+    Worker count from dag_run.conf "workers" (default NBA_QUEUE_WORKERS). Workers share the database
+    rate limit, so more of them overlap fetching with parsing and uploads rather than hitting the site harder.
+    They fetch box scores, so like every scraper container they run in SCRAPER_POOL, which caps how many
+    run at once.
+    """
+    conf = get_current_context()["dag_run"].conf or {}
+    workers = int(conf.get("workers", QUEUE_WORKERS))
+    return [{**docker_env, "QUEUE_ROLE": "work", "WORKER_ID": f"airflow-worker-{index}"} for index in range(workers)]
+
+  @task
+  def feature_environment() -> Dict[str, str]:
+    conf = get_current_context()["dag_run"].conf or {}
+    return {**docker_env, "FEATURE_START_DATE": conf["start_date"], "FEATURE_END_DATE": conf["end_date"]}
+
+  queue_plan = DockerOperator.partial(
+    task_id="run_queue_plan",
+    image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-ingestion:latest",
+    command="python data_ingestion/queue_main.py",
+    network_mode="nba_network",
+    auto_remove=True,
+    docker_url="unix://var/run/docker.sock",
+    mount_tmp_dir=False,
+    pool=SCRAPER_POOL,
+  ).expand(environment=plan_seasons())
+
+  queue_workers = DockerOperator.partial(
+    task_id="run_queue_worker",
+    image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-ingestion:latest",
+    command="python data_ingestion/queue_main.py",
+    network_mode="nba_network",
+    auto_remove=True,
+    docker_url="unix://var/run/docker.sock",
+    mount_tmp_dir=False,
+    pool=SCRAPER_POOL,
+  ).expand(environment=worker_environments())
+
+  data_processing = DockerOperator(
+    task_id="run_queue_processing",
+    image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/data-processing:latest",
+    command="python data_processing/main.py",
+    network_mode="nba_network",
+    auto_remove=True,
+    docker_url="unix://var/run/docker.sock",
+    environment={**docker_env, "PROCESSING_FROM_QUEUE": "true"},
+    mount_tmp_dir=False,
+  )
+
+  feature_generation = DockerOperator(
+    task_id="run_feature_generation",
+    image="us-west1-docker.pkg.dev/nba-fantasy-ml/nba-data-pipeline-repo/feature-generation:latest",
+    command="python feature_generation/main.py",
+    network_mode="nba_network",
+    auto_remove=True,
+    docker_url="unix://var/run/docker.sock",
+    environment=feature_environment(),
+    mount_tmp_dir=False,
+  )
+
+  queue_plan >> queue_workers >> data_processing >> feature_generation
+
+
+nba_queue_backfill()
@@ -0,0 +1,296 @@
+# Command line entry point: python -m data_pipeline_services <stage>
+#
+# Only the standard library and light config helpers are imported here. Each subcommand imports its
+# stage (and with it pandas, bs4, minio, psycopg2, ...) when it runs, so cheap paths such as an
+# off-season daily run exit before any heavy module is loaded.
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+from datetime import date
+from typing import Dict, List, Tuple
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.data_ingestion.utils import scrape_window, split_range_by_season
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+# Third-party packages each stage pulls in, imported one at a time so the report can attribute the cost
+STAGE_DEPENDENCIES: Dict[str, List[str]] = {
+  "ingest": ["yaml", "dotenv", "numpy", "pandas", "requests", "bs4", "minio"],
+  "process": ["dotenv", "numpy", "pandas", "psycopg2", "minio"],
+  "features": ["yaml", "dotenv", "numpy", "pandas", "psycopg2"],
+  "predict": ["yaml", "dotenv", "numpy", "pandas", "psycopg2", "xgboost"],
+  "backfill": ["yaml", "dotenv", "numpy", "pandas", "requests", "bs4", "psycopg2"],
+  "migrate": ["dotenv", "psycopg2"],
+  "export": ["dotenv", "numpy", "pandas", "psycopg2"],
+  "queue": ["yaml", "dotenv", "numpy", "pandas", "requests", "bs4", "psycopg2", "minio"],
+  "compile-model": ["yaml", "numpy", "xgboost"],
+}
+
+STAGE_ENTRY_POINTS = {
+  "ingest": "data_pipeline_services.data_ingestion.main",
+  "process": "data_pipeline_services.data_processing.main",
+  "features": "data_pipeline_services.feature_generation.main",
+  "predict": "data_pipeline_services.prediction.main",
+  "backfill": "data_pipeline_services.pipeline_runner",
+  "migrate": "data_pipeline_services.migrations.runner",
+  "export": "data_pipeline_services.dataset_export.main",
+  "queue": "data_pipeline_services.data_ingestion.queue_main",
+  "compile-model": "data_pipeline_services.prediction.compile_model",
+}
+
+import_times: List[Tuple[str, float]] = []
+
+
+def timed_import(module_name: str):
+  if module_name in sys.modules:
+    return sys.modules[module_name]
+  started = time.perf_counter()
+  module = importlib.import_module(module_name)
+  import_times.append((module_name, time.perf_counter() - started))
+  return module
+
+
+def import_stage(stage: str):
+  for dependency in STAGE_DEPENDENCIES[stage]:
+    timed_import(dependency)
+  return timed_import(STAGE_ENTRY_POINTS[stage])
+
+
+def print_import_report(started: float) -> None:
+  total = time.perf_counter() - started
+  imports = sum(seconds for _, seconds in import_times)
+  lines = [f"{'module':<50} {'ms':>9}"]
+  lines += [f"{module:<50} {seconds * 1000:>9.1f}" for module, seconds in import_times]
+  lines.append(f"{'imports':<50} {imports * 1000:>9.1f}")
+  lines.append(f"{'total (startup to exit)':<50} {total * 1000:>9.1f}")
+  print("\n".join(lines), file=sys.stderr)
+
+
+def load_scraping_config() -> dict:
+  yaml = timed_import("yaml")
+  with open(config_path("data_ingestion", "scraping_config.yml"), "r") as file:
+    return yaml.safe_load(file)
+
+
+def set_env(**values: str) -> None:
+  for name, value in values.items():
+    if value is not None:
+      os.environ[name] = value
+
+
+def run_ingest(args: argparse.Namespace) -> int:
+  set_env(
+    SCRAPE_SEASON=args.season, SCRAPE_START_DATE=args.start, SCRAPE_END_DATE=args.end, OUTPUT_OBJECT_NAME=args.output
+  )
+  set_env(RECHECK_DAYS=args.recheck_days and str(args.recheck_days))
+  if int(os.getenv("RECHECK_DAYS", "0")) > 0:
+    import_stage("ingest").main()
+    return 0
+
+  config = load_scraping_config()
+  job = config["scraping_job"]
+  season = os.getenv("SCRAPE_SEASON", job["season"])
+  window = scrape_window(
+    season,
+    os.getenv("SCRAPE_START_DATE", job["start_date"]),
+    os.getenv("SCRAPE_END_DATE", job["end_date"]),
+    config["default_nba_dates"]["start"],
+    config["default_nba_dates"]["end"],
+  )
+  if window is None:
+    logger.info(f"No {season} games can fall in the requested dates. Nothing to do.")
+    return 0
+
+  import_stage("ingest").main()
+  return 0
+
+
+def run_process(args: argparse.Namespace) -> int:
+  set_env(INPUT_OBJECT_NAME=args.input, PROCESSING_FROM_QUEUE=args.from_queue and "true")
+  import_stage("process").main()
+  return 0
+
+
+def run_features(args: argparse.Namespace) -> int:
+  set_env(FEATURE_START_DATE=args.start_date, FEATURE_END_DATE=args.end_date)
+
+  start_date, end_date = os.getenv("FEATURE_START_DATE"), os.getenv("FEATURE_END_DATE")
+  if start_date and end_date:
+    config = load_scraping_config()
+    defaults = config["default_nba_dates"]
+    chunks = split_range_by_season(date.fromisoformat(start_date), date.fromisoformat(end_date))
+    if not any(scrape_window(season, start, end, defaults["start"], defaults["end"]) for season, start, end in chunks):
+      logger.info(f"No games can fall between {start_date} and {end_date}. Nothing to do.")
+      return 0
+
+  import_stage("features").main()
+  return 0
+
+
+def run_predict(args: argparse.Namespace) -> int:
+  set_env(PREDICTION_HOST=args.host, PREDICTION_PORT=args.port and str(args.port))
+  import_stage("predict").main()
+  return 0
+
+
+def run_backfill(args: argparse.Namespace) -> int:
+  config = load_scraping_config()
+  defaults = config["default_nba_dates"]
+  chunks = split_range_by_season(date.fromisoformat(args.start_date), date.fromisoformat(args.end_date))
+  chunks = [chunk for chunk in chunks if scrape_window(*chunk, defaults["start"], defaults["end"])]
+  if not chunks:
+    logger.info(f"No games can fall between {args.start_date} and {args.end_date}. Nothing to do.")
+    return 0
+
+  if args.persist_raw:
+    timed_import("minio")
+  runner = import_stage("backfill")
+  try:
+    for season, start, end in chunks:
+      logger.info(f"Backfilling {season} from {start} to {end}")
+      success = runner.run_pipeline(
+        season,
+        start,
+        end,
+        (defaults["start"], defaults["end"]),
+        persist_raw=args.persist_raw,
+        output_dir=config["minio"]["output_dir"],
+      )
+      if not success:
+        return 1
+    return 0
+  finally:
+    runner.publish_run_metrics("backfill")
+
+
+def run_migrate(args: argparse.Namespace) -> int:
+  import_stage("migrate").main()
+  return 0
+
+
+def run_export(args: argparse.Namespace) -> int:
+  set_env(
+    SNAPSHOT_DIR=args.snapshot_dir,
+    SNAPSHOT_START_DATE=args.start_date,
+    SNAPSHOT_END_DATE=args.end_date,
+    SNAPSHOT_LOOKBACK_DAYS=args.lookback_days and str(args.lookback_days),
+  )
+  import_stage("export").main()
+  return 0
+
+
+def run_queue(args: argparse.Namespace) -> int:
+  set_env(QUEUE_ROLE=args.role, SCRAPE_SEASON=args.season, SCRAPE_START_DATE=args.start, SCRAPE_END_DATE=args.end)
+  set_env(WORKER_ID=args.worker_id, QUEUE_BATCH_SIZE=args.batch_size and str(args.batch_size))
+  import_stage("queue").main()
+  return 0
+
+
+def run_compile_model(args: argparse.Namespace) -> int:
+  set_env(MODEL_VERSION=args.version)
+  import_stage("compile-model").main()
+  return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(prog="python -m data_pipeline_services", description="NBA data pipeline stages")
+  parser.add_argument(
+    "--import-report",
+    action="store_true",
+    default=os.getenv("PIPELINE_IMPORT_REPORT", "false").lower() == "true",
+    help="print per-module import times to stderr on exit",
+  )
+  parser.add_argument(
+    "--profile",
+    nargs="?",
+    const="true",
+    metavar="STAGES",
+    help="profile with cProfile and tracemalloc: every stage, or a comma-separated subset of "
+    "ingestion,processing,feature_generation,backfill (sets PIPELINE_PROFILE)",
+  )
+  subparsers = parser.add_subparsers(dest="stage", required=True)
+
+  ingest = subparsers.add_parser("ingest", help="scrape box scores to MinIO")
+  ingest.add_argument("--season", help="season as YYYY-YY")
+  ingest.add_argument("--start", help="first day as MM-DD")
+  ingest.add_argument("--end", help="last day as MM-DD")
+  ingest.add_argument("--output", help="MinIO object name to write")
+  ingest.add_argument(
+    "--recheck-days",
+    type=int,
+    metavar="N",
+    help="instead of scraping, re-check the last N days' box scores and write only the games that changed",
+  )
+  ingest.set_defaults(handler=run_ingest)
+
+  process = subparsers.add_parser("process", help="clean raw box scores from MinIO into Postgres")
+  process.add_argument("--input", help="MinIO object name to process (default: latest upload)")
+  process.add_argument(
+    "--from-queue", action="store_true", help="process every object scrape queue workers uploaded since the last run"
+  )
+  process.set_defaults(handler=run_process)
+
+  features = subparsers.add_parser("features", help="materialize rolling player features")
+  features.add_argument("--start-date", help="first game date as YYYY-MM-DD")
+  features.add_argument("--end-date", help="last game date as YYYY-MM-DD")
+  features.set_defaults(handler=run_features)
+
+  predict = subparsers.add_parser("predict", help="serve batch predictions over HTTP")
+  predict.add_argument("--host")
+  predict.add_argument("--port", type=int)
+  predict.set_defaults(handler=run_predict)
+
+  backfill = subparsers.add_parser("backfill", help="scrape, process and build features in one process")
+  backfill.add_argument("--start-date", required=True, help="first day as YYYY-MM-DD")
+  backfill.add_argument("--end-date", required=True, help="last day as YYYY-MM-DD")
+  backfill.add_argument("--persist-raw", action="store_true", help="also archive raw box scores to MinIO")
+  backfill.set_defaults(handler=run_backfill)
+
+  migrate = subparsers.add_parser("migrate", help="apply pending database schema migrations")
+  migrate.set_defaults(handler=run_migrate)
+
+  export = subparsers.add_parser("export", help="append new games to the memory-mapped training dataset snapshot")
+  export.add_argument("--snapshot-dir", help="snapshot directory (sets SNAPSHOT_DIR)")
+  export.add_argument("--start-date", help="re-read games from this YYYY-MM-DD date (default: --lookback-days)")
+  export.add_argument("--end-date", help="last game date as YYYY-MM-DD (default: today)")
+  export.add_argument("--lookback-days", type=int, help="days before the newest exported game to re-read")
+  export.set_defaults(handler=run_export)
+
+  queue = subparsers.add_parser("queue", help="scrape through the Postgres work queue, with any number of workers")
+  queue.add_argument("role", choices=["plan", "work"], help="enqueue the season's box scores, or scrape queued ones")
+  queue.add_argument("--season", help="season as YYYY-YY (plan)")
+  queue.add_argument("--start", help="first day as MM-DD (plan)")
+  queue.add_argument("--end", help="last day as MM-DD (plan)")
+  queue.add_argument("--worker-id", help="name recorded on claimed links (work; default: host-pid)")
+  queue.add_argument("--batch-size", type=int, help="links claimed at a time (work)")
+  queue.set_defaults(handler=run_queue)
+
+  compile_model = subparsers.add_parser(
+    "compile-model", help="compile a model version to NumPy node arrays for low-latency scoring"
+  )
+  compile_model.add_argument("--version", help="registered model version (default: active)")
+  compile_model.set_defaults(handler=run_compile_model)
+
+  return parser
+
+
+def main() -> int:
+  started = time.perf_counter()
+  args = build_parser().parse_args()
+  set_env(PIPELINE_PROFILE=args.profile)
+  try:
+    return args.handler(args)
+  except SystemExit as e:
+    return e.code if isinstance(e.code, int) else 1
+  finally:
+    if args.import_report:
+      print_import_report(started)
+
+
+if __name__ == "__main__":
+  sys.exit(main())
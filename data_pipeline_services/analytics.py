@@ -0,0 +1,121 @@
+from typing import List, Optional
+
+import pandas as pd
+from psycopg2.extensions import connection
+
+from data_pipeline_services.data_processing.aggregates import AGGREGATE_STATS
+
+# PlayerStats columns returned as-is in game logs
+STAT_COLUMNS = [
+  "mp", "fg", "fga", "fg_percent", "three_p", "three_pa", "three_p_percent", "ft", "fta", "ft_percent", "orb",
+  "drb", "trb", "ast", "stl", "blk", "tov", "pf", "pts", "gmsc", "plus_minus", "fpts_fanduel", "fpts_draftkings",
+  "fpts_yahoo",
+]  # fmt: skip
+GAME_LOG_COLUMNS = ["game_date", "game_id", "player_id", "player_name", "team", "opponent", "home"] + STAT_COLUMNS
+_GAME_LOG_SELECT = (
+  "ps.game_date, ps.game_id, ps.player_id, p.player_name, ps.team, ps.opponent, "
+  "CASE WHEN ps.team = g.home_team THEN 1 ELSE 0 END, " + ", ".join(f"ps.{column}" for column in STAT_COLUMNS)
+)
+
+SEASON_AVERAGE_COLUMNS = [
+  "player_id", "player_name", "season", "games", "first_game_date", "last_game_date", "fg_percent",
+  "three_p_percent", "ft_percent",
+] + AGGREGATE_STATS  # fmt: skip
+
+
+def _frame(connection: connection, query: str, params: tuple, columns: List[str]) -> pd.DataFrame:
+  cursor = connection.cursor()
+  cursor.execute(query, params)
+  rows = cursor.fetchall()
+  cursor.close()
+  return pd.DataFrame(rows, columns=columns)
+
+
+def player_game_log(
+  connection: connection,
+  player_id: int,
+  start_date: Optional[str] = None,
+  end_date: Optional[str] = None,
+  limit: Optional[int] = None,
+) -> pd.DataFrame:
+  """
+  A player's games, most recent first, optionally between YYYY-MM-DD dates and capped at `limit`.
+  Served by the (player_id, game_date) index; date bounds also skip the other seasons' partitions.
+  """
+  return _frame(
+    connection,
+    f"""
+    SELECT {_GAME_LOG_SELECT}
+    FROM playerstats ps
+    JOIN games g ON g.game_id = ps.game_id
+    JOIN players p ON p.player_id = ps.player_id
+    WHERE ps.player_id = %s
+      AND (%s::date IS NULL OR ps.game_date >= %s::date)
+      AND (%s::date IS NULL OR ps.game_date <= %s::date)
+    ORDER BY ps.game_date DESC
+    LIMIT %s;
+    """,
+    (player_id, start_date, start_date, end_date, end_date, limit),
+    GAME_LOG_COLUMNS,
+  )
+
+
+def team_game_logs(connection: connection, team: str, start_date: str, end_date: str) -> pd.DataFrame:
+  """
+  Every player line for a team (abbreviation) between YYYY-MM-DD dates, by date then minutes played.
+  """
+  return _frame(
+    connection,
+    f"""
+    SELECT {_GAME_LOG_SELECT}
+    FROM playerstats ps
+    JOIN games g ON g.game_id = ps.game_id
+    JOIN players p ON p.player_id = ps.player_id
+    WHERE ps.team = %s AND ps.game_date BETWEEN %s AND %s
+    ORDER BY ps.game_date, ps.mp DESC;
+    """,
+    (team, start_date, end_date),
+    GAME_LOG_COLUMNS,
+  )
+
+
+def player_season_averages(
+  connection: connection, season: str, player_ids: Optional[List[int]] = None
+) -> pd.DataFrame:
+  """
+  Per-game averages for a season ('YYYY-YY'), from the player_season_totals aggregate.
+  """
+  averages = ", ".join(f"t.{stat} / t.games" for stat in AGGREGATE_STATS)
+  return _frame(
+    connection,
+    f"""
+    SELECT t.player_id, p.player_name, t.season, t.games, t.first_game_date, t.last_game_date,
+      t.fg / NULLIF(t.fga, 0), t.three_p / NULLIF(t.three_pa, 0), t.ft / NULLIF(t.fta, 0), {averages}
+    FROM player_season_totals t
+    JOIN players p ON p.player_id = t.player_id
+    WHERE t.season = %s AND (%s::integer[] IS NULL OR t.player_id = ANY(%s::integer[]))
+    ORDER BY t.player_id;
+    """,
+    (season, player_ids, player_ids),
+    SEASON_AVERAGE_COLUMNS,
+  )
+
+
+def player_rolling_averages(connection: connection, player_ids: List[int], window: int = 10) -> pd.DataFrame:
+  """
+  Averages over each player's last `window` games (5 or 10), from the player_rolling_averages aggregate.
+  `games` is below `window` for players with fewer stored games.
+  """
+  columns = ", ".join(f"r.{stat}" for stat in AGGREGATE_STATS)
+  return _frame(
+    connection,
+    f"""
+    SELECT r.player_id, p.player_name, r.window_size, r.games, r.last_game_date, {columns}
+    FROM player_rolling_averages r
+    JOIN players p ON p.player_id = r.player_id
+    WHERE r.window_size = %s AND r.player_id = ANY(%s::integer[])
+    ORDER BY r.player_id;
+    """,
+    (window, list(player_ids)),
+    ["player_id", "player_name", "window_size", "games", "last_game_date"] + AGGREGATE_STATS,
+  )
@@ -0,0 +1,139 @@
+# Offline benchmarks for the scraping, cleaning, loading and feature hot paths:
+#   python -m data_pipeline_services.benchmarks [--seasons 1,10] [--update-baseline]
+# The default sizes fit a CI box (about 650 MB peak RSS); --seasons 1,10,100 adds the 100-season run, which needs
+# more than 2 GB.
+# The parse stage runs on box score pages recorded from the site (--record-fixtures downloads them), falling
+# back to synthetic pages until they are.
+# The load stage times the loaders' Python work against a stand-in connection; no SQL reaches a database.
+# Exits 1 when a stage regresses past --threshold against the stored baseline.
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+from datetime import datetime
+
+from data_pipeline_services.benchmarks.fixtures import (
+  FIXTURES_DIR,
+  SYNTHETIC_FIXTURES_DIR,
+  generate_raw_box_scores,
+  load_html_fixtures,
+  record_html_fixtures,
+)
+from data_pipeline_services.benchmarks.stages import (
+  bench_clean,
+  bench_features,
+  bench_load,
+  bench_parse,
+  compare_to_baseline,
+)
+from data_pipeline_services.data_processing.cleaning import clean_raw_data
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+STAGES = ["parse", "clean", "load", "features"]
+
+
+def run_benchmarks(seasons: list, repeats: int, stages: list, max_load_seasons: int) -> list:
+  results = []
+  if "parse" in stages:
+    pages, kind = load_html_fixtures(FIXTURES_DIR), "pages"
+    if not pages:
+      logger.warning(f"No recorded box scores in {FIXTURES_DIR} (see --record-fixtures); parsing synthetic pages")
+      pages, kind = load_html_fixtures(SYNTHETIC_FIXTURES_DIR), "synthetic pages"
+    if not pages:
+      raise FileNotFoundError(f"No HTML fixtures in {FIXTURES_DIR} or {SYNTHETIC_FIXTURES_DIR}")
+    results.append(bench_parse(pages, repeats, kind))
+    logger.info(f"parse: {results[-1]}")
+
+  for n_seasons in seasons:
+    size = f"{n_seasons} seasons"
+    raw = generate_raw_box_scores(n_seasons)
+    if "clean" in stages:
+      results.append(bench_clean(raw, size, repeats))
+      logger.info(f"clean: {results[-1]}")
+
+    cleaned = clean_raw_data(raw)
+    del raw
+    # The loader builds a dict per row, so very large frames need more memory than the rest of the suite
+    if "load" in stages and n_seasons <= max_load_seasons:
+      results.append(bench_load(cleaned, size, repeats))
+      logger.info(f"load: {results[-1]} (Python side only: statements go to a stand-in connection, not Postgres)")
+    elif "load" in stages:
+      logger.info(f"load: skipped for {size} (--max-load-seasons {max_load_seasons})")
+    if "features" in stages:
+      results.append(bench_features(cleaned, size, repeats))
+      logger.info(f"features: {results[-1]}")
+    del cleaned
+
+  return results
+
+
+def main():
+  parser = argparse.ArgumentParser(prog="python -m data_pipeline_services.benchmarks")
+  parser.add_argument(
+    "--seasons", default="1,10", help="comma-separated generated frame sizes, in seasons (100 needs over 2 GB)"
+  )
+  parser.add_argument(
+    "--repeats", type=int, default=5, help="timed samples per stage; the median is reported and gated on"
+  )
+  parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {STAGES}")
+  parser.add_argument("--max-load-seasons", type=int, default=10, help="largest frame the load stage is run on")
+  parser.add_argument("--output", default=os.path.join(BENCHMARKS_DIR, "results", "latest.json"))
+  parser.add_argument("--baseline", default=BASELINE_PATH)
+  parser.add_argument("--threshold", type=float, default=0.25, help="allowed fractional regression vs the baseline")
+  parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+  parser.add_argument(
+    "--record-fixtures", action="store_true", help="download the parse stage's box score pages, then exit"
+  )
+  args = parser.parse_args()
+
+  if args.record_fixtures:
+    paths = record_html_fixtures()
+    logger.info(f"Recorded {len(paths)} box score pages in {FIXTURES_DIR}")
+    return
+
+  # Stage logging would otherwise dominate the output
+  logging.getLogger().setLevel(logging.WARNING)
+  logger.setLevel(logging.INFO)
+
+  seasons = [int(n) for n in args.seasons.split(",") if n]
+  report = {
+    "created_at": datetime.now().isoformat(timespec="seconds"),
+    "python": platform.python_version(),
+    "machine": platform.machine(),
+    "results": run_benchmarks(seasons, args.repeats, args.stages.split(","), args.max_load_seasons),
+  }
+
+  os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+  with open(args.output, "w") as file:
+    json.dump(report, file, indent=2)
+  logger.info(f"Results written to {args.output}")
+
+  if args.update_baseline:
+    with open(args.baseline, "w") as file:
+      json.dump(report, file, indent=2)
+    logger.info(f"Baseline updated at {args.baseline}")
+    return
+
+  if not os.path.exists(args.baseline):
+    logger.warning(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+    return
+
+  with open(args.baseline, "r") as file:
+    baseline = json.load(file)["results"]
+
+  regressions = compare_to_baseline(report["results"], baseline, args.threshold)
+  for regression in regressions:
+    logger.error(f"Regression: {regression}")
+  if regressions:
+    exit(1)
+  logger.info("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+  main()
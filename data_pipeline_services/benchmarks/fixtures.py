@@ -0,0 +1,265 @@
+import glob
+import os
+import time
+from html import escape
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline_services.config.common.variables import BASE_URL, TEAM_ABBREVIATIONS
+from data_pipeline_services.data_ingestion.scraper import BOX_SCORE_COLUMNS, fetch_page
+
+# Box score pages recorded from the site by record_html_fixtures
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Pages rendered by write_html_fixtures, parsed only while no recorded pages are present
+SYNTHETIC_FIXTURES_DIR = os.path.join(FIXTURES_DIR, "synthetic")
+# One game per box score layout era, oldest first: no plus-minus column, the first play-by-play seasons,
+# the 2010s markup and the current one
+RECORDED_BOX_SCORES = [
+  f"{BASE_URL}/boxscores/198406120BOS.html",
+  f"{BASE_URL}/boxscores/199806140UTA.html",
+  f"{BASE_URL}/boxscores/201606190GSW.html",
+  f"{BASE_URL}/boxscores/202306120DEN.html",
+]
+# Pause between recorded requests, inside the site's limit of 20 requests a minute
+RECORD_DELAY_SECONDS = 3.5
+
+TEAMS = list(TEAM_ABBREVIATIONS)
+GAMES_PER_SEASON = 1230
+SEASON_DAYS = 173
+ROSTER_SIZE = 15
+LISTED_PER_TEAM = 13
+
+# Basic box score columns in page order, after the player name cell
+STAT_COLUMNS = BOX_SCORE_COLUMNS[4:-2]
+DATA_STATS = [
+  "mp", "fg", "fga", "fg_pct", "fg3", "fg3a", "fg3_pct", "ft", "fta", "ft_pct", "orb", "drb", "trb",
+  "ast", "stl", "blk", "tov", "pf", "pts", "game_score", "plus_minus",
+]  # fmt: skip
+
+# Every generated stat is a lookup into one of these, so millions of rows share a few thousand string objects
+_INTS = np.array([str(i) for i in range(200)], dtype=object)
+_PCTS = np.array([f"{i / 1000:.3f}".lstrip("0") if i < 1000 else "1.000" for i in range(1001)], dtype=object)
+_GAME_SCORES = np.array([f"{(i - 300) / 10:.1f}" for i in range(1101)], dtype=object)
+_PLUS_MINUS = np.array([f"{i - 60:+d}" if i != 60 else "0" for i in range(121)], dtype=object)
+_MINUTES = np.array([f"{i // 60}:{i % 60:02d}" for i in range(49 * 60)], dtype=object)
+
+
+def _percentages(made: np.ndarray, attempts: np.ndarray) -> np.ndarray:
+  # The scraper turns the empty cell of a 0-attempt percentage into "0"
+  ratio = np.divide(made, attempts, out=np.zeros(len(made)), where=attempts > 0)
+  return np.where(attempts > 0, _PCTS[np.rint(ratio * 1000).astype(int)], "0")
+
+
+def generate_raw_box_scores(
+  n_seasons: int,
+  seed: int = 0,
+  first_season: int = 2000,
+  games_per_season: int = GAMES_PER_SEASON,
+  roster_size: int = ROSTER_SIZE,
+) -> pd.DataFrame:
+  """
+  Box scores for `n_seasons` seasons in the scraper's output format (strings, 'DNP' rows, full team names).
+  About 32k rows per season at the default 1230 games and 15-man rosters.
+  """
+  pairs_per_day = len(TEAMS) // 2
+  if not 0 < games_per_season <= SEASON_DAYS * pairs_per_day:
+    raise ValueError(f"games_per_season must be between 1 and {SEASON_DAYS * pairs_per_day}")
+  listed_per_team = min(LISTED_PER_TEAM, roster_size)
+
+  rng = np.random.default_rng(seed)
+  n_games = n_seasons * games_per_season
+
+  # Each day pairs up a shuffled league; a season's games are a random subset of those pairings,
+  # so no team plays twice on one day (box score links stay unique)
+  shuffled = np.argsort(rng.random((n_seasons, SEASON_DAYS, len(TEAMS))), axis=2)
+  slots = np.sort(
+    np.argsort(rng.random((n_seasons, SEASON_DAYS * pairs_per_day)), axis=1)[:, :games_per_season], axis=1
+  )
+  season = np.repeat(np.arange(n_seasons), games_per_season)
+  days, pair = np.divmod(slots.ravel(), pairs_per_day)
+  home = shuffled[season, days, 2 * pair]
+  away = shuffled[season, days, 2 * pair + 1]
+  game_dates = pd.to_datetime([f"{first_season + s}-10-24" for s in range(n_seasons)])[season] + pd.to_timedelta(
+    days, unit="D"
+  )
+  date_strings = game_dates.strftime("%Y-%m-%d").to_numpy(dtype=object)
+  links = np.array(
+    [f"{BASE_URL}/boxscores/{day}0{TEAMS[team]}.html" for day, team in zip(game_dates.strftime("%Y%m%d"), home)],
+    dtype=object,
+  )
+
+  # One block of listed_per_team rows per team per game, home team first
+  game = np.repeat(np.arange(n_games), 2 * listed_per_team)
+  is_home = np.tile(np.repeat([1, 0], listed_per_team), n_games)
+  slot = np.tile(np.arange(listed_per_team), 2 * n_games)
+  team = np.where(is_home == 1, home[game], away[game])
+  opponent = np.where(is_home == 1, away[game], home[game])
+
+  roster_pick = np.argsort(rng.random((2 * n_games, roster_size)), axis=1)[:, :listed_per_team].ravel()
+  names = np.array(
+    [f"player {s}-{t}-{k}" for s in range(n_seasons) for t in range(len(TEAMS)) for k in range(roster_size)],
+    dtype=object,
+  )
+  name = names[(season[game] * len(TEAMS) + team) * roster_size + roster_pick]
+  team_names = np.array([TEAM_ABBREVIATIONS[code] for code in TEAMS], dtype=object)
+
+  n = len(game)
+  seconds = np.clip(rng.normal(36 - 2.4 * slot, 4) * 60, 60, 48 * 60 - 1).astype(int)
+  minutes = seconds / 60
+  fga = rng.poisson(minutes * 0.35)
+  fg = rng.binomial(fga, 0.47)
+  fg3a = rng.binomial(fga, 0.38)
+  fg3 = np.minimum(rng.binomial(fg3a, 0.36), fg)
+  fta = rng.poisson(minutes * 0.1)
+  ft = rng.binomial(fta, 0.78)
+  orb = rng.poisson(minutes * 0.04)
+  drb = rng.poisson(minutes * 0.13)
+  ast = rng.poisson(minutes * 0.09)
+  stl = rng.poisson(minutes * 0.03)
+  blk = rng.poisson(minutes * 0.02)
+  tov = rng.poisson(minutes * 0.05)
+  pf = np.minimum(rng.poisson(minutes * 0.07), 6)
+  pts = 2 * fg + fg3 + ft
+  game_score = (
+    pts + 0.4 * fg - 0.7 * fga - 0.4 * (fta - ft) + 0.7 * orb + 0.3 * drb + stl + 0.7 * ast + 0.7 * blk - 0.4 * pf - tov
+  )
+  plus_minus = rng.integers(-25, 26, n)
+
+  stats = {
+    "MP": _MINUTES[seconds],
+    "FG": _INTS[fg],
+    "FGA": _INTS[fga],
+    "FG%": _percentages(fg, fga),
+    "3P": _INTS[fg3],
+    "3PA": _INTS[fg3a],
+    "3P%": _percentages(fg3, fg3a),
+    "FT": _INTS[ft],
+    "FTA": _INTS[fta],
+    "FT%": _percentages(ft, fta),
+    "ORB": _INTS[orb],
+    "DRB": _INTS[drb],
+    "TRB": _INTS[orb + drb],
+    "AST": _INTS[ast],
+    "STL": _INTS[stl],
+    "BLK": _INTS[blk],
+    "TOV": _INTS[tov],
+    "PF": _INTS[pf],
+    "PTS": _INTS[pts],
+    "GmSc": _GAME_SCORES[np.rint((np.clip(game_score, -30, 80) + 30) * 10).astype(int)],
+    "+-": _PLUS_MINUS[plus_minus + 60],
+  }
+
+  # End-of-bench players often don't get in
+  dnp = (slot >= listed_per_team - 3) & (rng.random(n) < 0.6)
+  for column in STAT_COLUMNS:
+    stats[column] = np.where(dnp, "DNP", stats[column])
+
+  return pd.DataFrame(
+    {
+      "Date": date_strings[game],
+      "Name": name,
+      "Team": team_names[team],
+      "Opponent": team_names[opponent],
+      **stats,
+      "GameLink": links[game],
+      "Home": is_home,
+    },
+    columns=BOX_SCORE_COLUMNS,
+    dtype=object,
+  )
+
+
+def _table_html(table_id: str, caption: str, rows: pd.DataFrame) -> str:
+  body = []
+  for position, row in enumerate(rows.itertuples(index=False)):
+    if position == 5:
+      body.append('<tr class="thead"><th data-stat="player">Reserves</th></tr>')
+    cells = [f'<th scope="row" data-stat="player"><a href="/players/x.html">{escape(row.Name.title())}</a></th>']
+    if row.MP == "DNP":
+      cells.append('<td class="center" data-stat="reason" colspan="21">Did Not Play</td>')
+    else:
+      values = row[4:-2]
+      cells += [
+        f'<td class="right" data-stat="{stat}">{"" if value == "0" and stat.endswith("pct") else value}</td>'
+        for stat, value in zip(DATA_STATS, values)
+      ]
+    body.append(f"<tr>{''.join(cells)}</tr>")
+
+  header = "".join(f'<th data-stat="{stat}">{stat.upper()}</th>' for stat in DATA_STATS)
+  return (
+    f'<div class="table_container"><table class="sortable stats_table" id="{table_id}">'
+    f"<caption>{escape(caption)} Basic and Advanced Stats Table</caption>"
+    f'<thead><tr><th data-stat="player">Starters</th>{header}</tr></thead>'
+    f"<tbody>{''.join(body)}</tbody>"
+    f'<tfoot><tr><th data-stat="player">Team Totals</th></tr></tfoot></table></div>'
+  )
+
+
+def render_box_score_html(game_rows: pd.DataFrame) -> str:
+  """
+  A basketball-reference style box score page for one game's raw rows: the full-game basic table
+  the scraper reads plus the quarter, half and advanced tables it has to skip over.
+  """
+  sections = []
+  for team_name, rows in game_rows.groupby("Team", sort=False):
+    abbr = next(code for code, name in TEAM_ABBREVIATIONS.items() if name == team_name)
+    for period in ["game", "q1", "q2", "q3", "q4", "h1", "h2"]:
+      sections.append(_table_html(f"box-{abbr}-{period}-basic", team_name, rows))
+    sections.append(_table_html(f"box-{abbr}-game-advanced", team_name, rows).replace("Basic and Advanced", "Advanced"))
+
+  return (
+    "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Box Score</title></head>"
+    f"<body><div id='wrap'><div id='content'>{''.join(sections)}</div></div></body></html>"
+  )
+
+
+def write_html_fixtures(directory: str = SYNTHETIC_FIXTURES_DIR, n_pages: int = 3, seed: int = 0) -> List[str]:
+  """
+  Render the first `n_pages` games of a generated season to `<directory>/<box score id>.html`.
+  """
+  os.makedirs(directory, exist_ok=True)
+  raw = generate_raw_box_scores(1, seed)
+  paths = []
+  for link, game_rows in list(raw.groupby("GameLink", sort=False))[:n_pages]:
+    path = os.path.join(directory, link.split("/")[-1])
+    with open(path, "w", encoding="utf-8") as file:
+      file.write(render_box_score_html(game_rows))
+    paths.append(path)
+  return paths
+
+
+def record_html_fixtures(links: List[str] = RECORDED_BOX_SCORES, directory: str = FIXTURES_DIR) -> List[str]:
+  """
+  Download box score pages to `<directory>/<box score id>.html`, so parse_box_score is benchmarked on
+  the site's real markup. Pages already recorded are kept.
+  """
+  os.makedirs(directory, exist_ok=True)
+  paths = []
+  for position, link in enumerate(links):
+    path = os.path.join(directory, link.split("/")[-1])
+    if not os.path.exists(path):
+      if position:
+        time.sleep(RECORD_DELAY_SECONDS)
+      response = fetch_page(link, "box_score")
+      response.raise_for_status()
+      response.encoding = response.apparent_encoding
+      with open(path, "w", encoding="utf-8") as file:
+        file.write(response.text)
+    paths.append(path)
+  return paths
+
+
+def load_html_fixtures(directory: str = FIXTURES_DIR) -> List[Tuple[str, str, str]]:
+  """
+  Box score pages as (html, link, YYYY-MM-DD date); the date and home team come from the file name.
+  """
+  pages = []
+  for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+    file_name = os.path.basename(path)
+    with open(path, "r", encoding="utf-8") as file:
+      html = file.read()
+    game_date = f"{file_name[:4]}-{file_name[4:6]}-{file_name[6:8]}"
+    pages.append((html, f"{BASE_URL}/boxscores/{file_name}", game_date))
+  return pages
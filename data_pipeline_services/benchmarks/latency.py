@@ -0,0 +1,189 @@
+# End-to-end latency of PredictionService.predict_slate for a slate of players: the recent-stats query,
+# feature building, the micro-batcher and the model, with the prediction cache off.
+#   python -m data_pipeline_services.benchmarks.latency [--players 300] [--requests 500] [--database]
+# Without --database the query goes to a stand-in pool that hands back generated rows, so database time
+# is not included; with it, slates of real players are scored against the DB_* Postgres.
+# Exits 1 when p99 exceeds --target-ms.
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from data_pipeline_services.config.common.variables import PLAYER_STATS_DB_COLUMNS
+from data_pipeline_services.feature_generation.features import ROLLING_WINDOW
+from data_pipeline_services.prediction.model import MODEL_METADATA_PATH
+from data_pipeline_services.prediction.registry import ModelRegistry
+from data_pipeline_services.prediction.service import MicroBatcher, PredictionService, get_connection_pool
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+# The checkout's model, for runs outside the image where MODEL_METADATA_PATH's /app default doesn't exist
+REPO_MODEL_METADATA_PATH = os.path.join(
+  os.path.dirname(os.path.dirname(BENCHMARKS_DIR)), "config", "model_metadata.yaml"
+)
+# Stats that are whole numbers in PlayerStats; the rest are DOUBLE PRECISION
+INTEGER_STATS = {
+  "FG", "FGA", "3P", "3PA", "FT", "FTA", "ORB", "DRB", "TRB", "AST", "STL", "BLK", "TOV", "PF", "PTS", "+-",
+}  # fmt: skip
+
+
+class StandInLatencyCursor:
+  """
+  Answers fetch_recent_player_stats' query with each requested player's generated recent games.
+  """
+
+  def __init__(self, games: Dict[int, List[tuple]]):
+    self.games = games
+    self.rows: List[tuple] = []
+
+  def execute(self, query: str, params: tuple = ()) -> None:
+    player_ids, game_dates, _ = params
+    self.rows = [
+      (player_id, game_date, *stats)
+      for player_id, game_date in zip(player_ids, game_dates)
+      for stats in self.games.get(player_id, [])
+    ]
+
+  def fetchall(self) -> List[tuple]:
+    return self.rows
+
+  def close(self) -> None:
+    pass
+
+
+class StandInLatencyPool:
+  def __init__(self, games: Dict[int, List[tuple]]):
+    self.games = games
+
+  def getconn(self) -> "StandInLatencyPool":
+    return self
+
+  def putconn(self, connection: "StandInLatencyPool") -> None:
+    pass
+
+  def cursor(self) -> StandInLatencyCursor:
+    return StandInLatencyCursor(self.games)
+
+
+def stand_in_slate(n_players: int, seed: int = 0) -> Tuple[List[dict], Dict[int, List[tuple]]]:
+  """
+  A slate of n_players for tomorrow, and ROLLING_WINDOW generated recent games for each of them.
+  """
+  rng = np.random.default_rng(seed)
+  game_date = (date.today() + timedelta(days=1)).isoformat()
+  games = {}
+  for player_id in range(1, n_players + 1):
+    games[player_id] = [
+      tuple(
+        int(rng.integers(0, 30)) if stat in INTEGER_STATS else round(float(rng.uniform(0, 40)), 3)
+        for stat in PLAYER_STATS_DB_COLUMNS
+      )
+      for _ in range(ROLLING_WINDOW)
+    ]
+  slate = [{"player_id": player_id, "game_date": game_date, "home": player_id % 2} for player_id in games]
+  return slate, games
+
+
+def database_slate(pool, n_players: int) -> List[dict]:
+  """
+  The n_players with the most recent games that have a full rolling window, each predicted for the day
+  after their last game.
+  """
+  connection = pool.getconn()
+  try:
+    cursor = connection.cursor()
+    cursor.execute(
+      """
+      SELECT player_id, (max(game_date) + 1)::text FROM playerstats
+      GROUP BY player_id HAVING count(*) >= %s
+      ORDER BY max(game_date) DESC, player_id
+      LIMIT %s;
+      """,
+      (ROLLING_WINDOW, n_players),
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+  finally:
+    pool.putconn(connection)
+  return [{"player_id": player_id, "game_date": game_date} for player_id, game_date in rows]
+
+
+def measure_latency(service: PredictionService, slate: List[dict], requests: int, concurrency: int) -> np.ndarray:
+  """
+  Wall time in ms of each of `requests` predict_slate calls, `concurrency` of them in flight at once.
+  """
+
+  def timed(_: int) -> float:
+    started = time.perf_counter()
+    service.predict_slate(slate)
+    return (time.perf_counter() - started) * 1000
+
+  with ThreadPoolExecutor(max_workers=concurrency) as executor:
+    return np.array(list(executor.map(timed, range(requests))))
+
+
+def model_metadata_path() -> str:
+  if "MODEL_METADATA_PATH" in os.environ or os.path.exists(MODEL_METADATA_PATH):
+    return MODEL_METADATA_PATH
+  return REPO_MODEL_METADATA_PATH
+
+
+def main():
+  parser = argparse.ArgumentParser(prog="python -m data_pipeline_services.benchmarks.latency")
+  parser.add_argument("--players", type=int, default=300, help="slate size")
+  parser.add_argument("--requests", type=int, default=500, help="timed predict_slate calls")
+  parser.add_argument("--warmup", type=int, default=20, help="untimed calls first")
+  parser.add_argument("--concurrency", type=int, default=1, help="calls in flight at once")
+  parser.add_argument("--max-wait-ms", type=float, default=2.0, help="longest a micro-batch waits for requests")
+  parser.add_argument("--database", action="store_true", help="query the DB_* Postgres instead of a stand-in")
+  parser.add_argument("--target-ms", type=float, default=10.0, help="p99 above this fails the run")
+  parser.add_argument("--output", default=os.path.join(BENCHMARKS_DIR, "results", "latency.json"))
+  args = parser.parse_args()
+
+  registry = ModelRegistry(model_metadata_path())
+  batcher = MicroBatcher(registry, max_wait_ms=args.max_wait_ms)
+  if args.database:
+    pool = get_connection_pool(max(args.concurrency, 1))
+    slate = database_slate(pool, args.players)
+  else:
+    slate, games = stand_in_slate(args.players)
+    pool = StandInLatencyPool(games)
+    logger.warning("Database time not included: the recent-stats query goes to a stand-in pool (see --database)")
+  service = PredictionService(registry, pool, batcher)
+
+  measure_latency(service, slate, args.warmup, args.concurrency)
+  latencies = measure_latency(service, slate, args.requests, args.concurrency)
+
+  report = {
+    "players": len(slate),
+    "requests": args.requests,
+    "concurrency": args.concurrency,
+    "model_version": registry.active_version,
+    "database": "postgres" if args.database else "stand-in",
+    "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+    "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    "mean_ms": round(float(latencies.mean()), 3),
+    "max_ms": round(float(latencies.max()), 3),
+  }
+  logger.info(f"predict_slate latency: {report}")
+
+  os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+  with open(args.output, "w") as file:
+    json.dump(report, file, indent=2)
+
+  if report["p99_ms"] > args.target_ms:
+    logger.error(f"p99 {report['p99_ms']} ms is over the {args.target_ms} ms target")
+    exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,251 @@
+# Local stand-in for the basketball-reference pages the scraper reads, backed by generated seasons:
+#   python -m data_pipeline_services.benchmarks.site --seasons 2 --port 8765
+#   SCRAPER_BASE_URL=http://127.0.0.1:8765 SCRAPE_DELAY_SCALE=0 python -m data_pipeline_services backfill \
+#     --start-date 2000-10-01 --end-date 2001-06-30
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from data_pipeline_services.benchmarks.fixtures import (
+  GAMES_PER_SEASON,
+  ROSTER_SIZE,
+  generate_raw_box_scores,
+  render_box_score_html,
+)
+from data_pipeline_services.config.common.variables import TEAM_ABBREVIATIONS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+MONTH_NAMES = ["october", "november", "december", "january", "february", "march", "april", "may", "june"]
+TEAM_CODES = {name: code for code, name in TEAM_ABBREVIATIONS.items()}
+
+# (game date, box score path, visitor name, home name)
+ScheduleEntry = Tuple[date, str, str, str]
+
+
+def _page(title: str, content: str) -> str:
+  return (
+    f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{escape(title)}</title></head>"
+    f"<body><div id='wrap'><div id='content'>{content}</div></div></body></html>"
+  )
+
+
+class SyntheticSite:
+  """
+  Season, month schedule and box score pages for a raw frame from generate_raw_box_scores, laid out
+  like the real site so get_month_links, get_box_score_links and extract_player_data parse them unchanged.
+  Pages are rendered on request, so only the frame itself is held in memory.
+  """
+
+  def __init__(self, raw: pd.DataFrame):
+    self.raw = raw
+    self.game_rows = {urlsplit(link).path: rows for link, rows in raw.groupby("GameLink", sort=False).indices.items()}
+
+    home = raw[raw["Home"] == 1].drop_duplicates("GameLink")
+    self.schedule: Dict[int, Dict[str, List[ScheduleEntry]]] = defaultdict(lambda: defaultdict(list))
+    for game_date, link, home_name, visitor_name in zip(
+      pd.to_datetime(home["Date"]), home["GameLink"], home["Team"], home["Opponent"]
+    ):
+      # Seasons are named by the year they end in, which is also the year in the schedule URLs
+      end_year = game_date.year + 1 if game_date.month >= 9 else game_date.year
+      month = game_date.strftime("%B").lower()
+      self.schedule[end_year][month].append((game_date.date(), urlsplit(link).path, visitor_name, home_name))
+
+  def season_page(self, end_year: int) -> Optional[str]:
+    months = self.schedule.get(end_year)
+    if not months:
+      return None
+    links = "".join(
+      f'<div><a href="/leagues/NBA_{end_year}_games-{month}.html">{month.title()}</a></div>'
+      for month in MONTH_NAMES
+      if month in months
+    )
+    return _page(f"{end_year - 1}-{str(end_year)[2:]} NBA Schedule", f'<div class="filter">{links}</div>')
+
+  def month_page(self, end_year: int, month: str) -> Optional[str]:
+    games = self.schedule.get(end_year, {}).get(month)
+    if not games:
+      return None
+    rows = []
+    for game_date, path, visitor_name, home_name in sorted(games):
+      csk = f"{game_date:%Y%m%d}0{TEAM_CODES[home_name]}"
+      rows.append(
+        f'<tr><th scope="row" class="left" data-stat="date_game" csk="{csk}">'
+        f'<a href="/boxscores/index.fcgi">{game_date:%a, %b} {game_date.day}, {game_date.year}</a></th>'
+        f'<td class="left" data-stat="visitor_team_name">{escape(visitor_name)}</td>'
+        f'<td class="left" data-stat="home_team_name">{escape(home_name)}</td>'
+        f'<td class="center" data-stat="box_score_text"><a href="{path}">Box Score</a></td></tr>'
+      )
+    table = (
+      '<table class="suppress_glossary sortable stats_table" id="schedule">'
+      '<thead><tr><th data-stat="date_game">Date</th><th data-stat="visitor_team_name">Visitor</th>'
+      '<th data-stat="home_team_name">Home</th><th data-stat="box_score_text"></th></tr></thead>'
+      f"<tbody>{''.join(rows)}</tbody></table>"
+    )
+    return _page(f"{month.title()} Schedule", table)
+
+  def box_score_page(self, path: str) -> Optional[str]:
+    rows = self.game_rows.get(path)
+    if rows is None:
+      return None
+    return render_box_score_html(self.raw.iloc[rows])
+
+  def page(self, path: str) -> Optional[str]:
+    """
+    The page at a URL path, or None for a 404.
+    """
+    name = path.rsplit("/", 1)[-1]
+    if path.startswith("/boxscores/"):
+      return self.box_score_page(path)
+    if path.startswith("/leagues/NBA_") and name.endswith(".html"):
+      parts = name[len("NBA_") : -len(".html")].split("_games")
+      if len(parts) != 2 or not parts[0].isdigit():
+        return None
+      end_year, month = int(parts[0]), parts[1].lstrip("-")
+      return self.month_page(end_year, month) if month else self.season_page(end_year)
+    return None
+
+
+class SiteRequestHandler(BaseHTTPRequestHandler):
+  site: SyntheticSite
+  latency: float = 0.0
+  # Every n-th request gets a 429 with Retry-After, to exercise the scraper's rate-limit handling
+  throttle_every: int = 0
+  requests_served = 0
+  lock = threading.Lock()
+
+  def do_GET(self) -> None:
+    with self.lock:
+      SiteRequestHandler.requests_served += 1
+      served = SiteRequestHandler.requests_served
+    if self.latency:
+      time.sleep(self.latency)
+
+    if self.throttle_every and served % self.throttle_every == 0:
+      self.send_response(429)
+      self.send_header("Retry-After", "1")
+      self.end_headers()
+      return
+
+    html = self.site.page(urlsplit(self.path).path)
+    if html is None:
+      self.send_error(404)
+      return
+
+    body = html.encode("utf-8")
+    # Pages are regenerated from the frame, so a content hash is a stable validator for conditional GETs
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    if self.headers.get("If-None-Match") == etag:
+      self.send_response(304)
+      self.send_header("ETag", etag)
+      self.end_headers()
+      return
+
+    self.send_response(200)
+    self.send_header("Content-Type", "text/html; charset=utf-8")
+    self.send_header("ETag", etag)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format: str, *args) -> None:
+    logger.debug(format % args)
+
+
+def start_site(
+  site: SyntheticSite, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, throttle_every: int = 0
+) -> ThreadingHTTPServer:
+  """
+  Serve the site from a daemon thread; port 0 picks a free port (see server.server_address).
+  Call shutdown() on the returned server to stop it.
+  """
+  handler = type(
+    "BoundSiteRequestHandler",
+    (SiteRequestHandler,),
+    {"site": site, "latency": latency, "throttle_every": throttle_every},
+  )
+  server = ThreadingHTTPServer((host, port), handler)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+
+def write_raw_frames(raw: pd.DataFrame, directory: str, file_format: str) -> List[str]:
+  """
+  One raw file per season, named like the ingestion stage's MinIO objects.
+  """
+  os.makedirs(directory, exist_ok=True)
+  paths = []
+  dates = pd.to_datetime(raw["Date"])
+  start_years = dates.dt.year.where(dates.dt.month >= 9, dates.dt.year - 1)
+  for start_year, season_rows in raw.groupby(start_years.to_numpy()):
+    season = f"{start_year}-{str(start_year + 1)[2:]}"
+    first, last = season_rows["Date"].min(), season_rows["Date"].max()
+    path = os.path.join(directory, f"nba_player_stats_{season}_{first}_to_{last}_synthetic.{file_format}")
+    if file_format == "parquet":
+      season_rows.to_parquet(path, index=False)
+    else:
+      season_rows.to_csv(path, index=False)
+    paths.append(path)
+  return paths
+
+
+def main():
+  parser = argparse.ArgumentParser(prog="python -m data_pipeline_services.benchmarks.site")
+  parser.add_argument("--seasons", type=int, default=1)
+  parser.add_argument("--first-season", type=int, default=2000, help="start year of the first generated season")
+  parser.add_argument("--games-per-season", type=int, default=GAMES_PER_SEASON)
+  parser.add_argument("--roster-size", type=int, default=ROSTER_SIZE, help="players per team per season")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8765)
+  parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+  parser.add_argument("--throttle-every", type=int, default=0, help="answer every n-th request with a 429")
+  parser.add_argument("--write-frames", metavar="DIR", help="also write the raw frames, one file per season")
+  parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="format for --write-frames")
+  parser.add_argument("--no-serve", action="store_true", help="only write frames")
+  args = parser.parse_args()
+
+  try:
+    raw = generate_raw_box_scores(
+      args.seasons, args.seed, args.first_season, games_per_season=args.games_per_season, roster_size=args.roster_size
+    )
+    logger.info(f"Generated {len(raw)} box score rows over {raw['GameLink'].nunique()} games")
+
+    if args.write_frames:
+      for path in write_raw_frames(raw, args.write_frames, args.format):
+        logger.info(f"Wrote {path}")
+    if args.no_serve:
+      exit(0)
+
+    server = start_site(SyntheticSite(raw), args.host, args.port, args.latency_ms / 1000, args.throttle_every)
+    host, port = server.server_address[:2]
+    logger.info(f"Serving {args.seasons} season(s) from {args.first_season} at http://{host}:{port}")
+    logger.info(f"Point the scraper at it with SCRAPER_BASE_URL=http://{host}:{port} SCRAPE_DELAY_SCALE=0")
+    while True:
+      time.sleep(3600)
+
+  except KeyboardInterrupt:
+    exit(0)
+  except ImportError as e:
+    logger.error(f"Parquet output needs pyarrow or fastparquet: {e}")
+    exit(1)
+  except Exception as e:
+    logger.error(f"Error in synthetic site: {str(e)}")
+    exit(1)
+
+
+if __name__ == "__main__":
+  main()
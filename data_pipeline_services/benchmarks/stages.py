@@ -0,0 +1,158 @@
+import gc
+import logging
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from data_pipeline_services.data_ingestion.scraper import parse_box_score
+from data_pipeline_services.data_processing.cleaning import (
+  assign_game_ids,
+  assign_player_ids,
+  clean_and_prepare_player_stats,
+  clean_raw_data,
+)
+from data_pipeline_services.feature_generation.features import calculate_rolling_averages
+
+# Shortest timed sample; faster stages are looped within a sample until it lasts this long
+MIN_SAMPLE_SECONDS = 1.0
+
+
+class StandInCursor:
+  """
+  Accepts the statements the loaders issue and hands out sequential IDs for RETURNING clauses,
+  so the Python side of a load can be timed without a database server. Nothing is executed, so the
+  load stage can't catch a regression in the SQL or in the database's insert cost.
+  """
+
+  def __init__(self, connection: "StandInConnection"):
+    self.connection = connection
+
+  def execute(self, query: str, params: tuple = ()) -> None:
+    self.connection.statements += 1
+
+  def fetchone(self) -> Tuple[int]:
+    self.connection.next_id += 1
+    return (self.connection.next_id,)
+
+  def close(self) -> None:
+    pass
+
+
+class StandInConnection:
+  def __init__(self):
+    self.statements = 0
+    self.next_id = 0
+
+  def cursor(self) -> StandInCursor:
+    return StandInCursor(self)
+
+  def commit(self) -> None:
+    pass
+
+  def close(self) -> None:
+    pass
+
+
+def measure(
+  run: Callable[[], object], repeats: int, min_sample_seconds: float = MIN_SAMPLE_SECONDS
+) -> Tuple[float, float]:
+  """
+  Median wall time per run over `repeats` samples, then peak traced memory (MB) of one more run.
+
+  A first, untimed run warms caches and sets how many runs each sample loops over, so that a sample of
+  a fast stage lasts at least min_sample_seconds instead of being dominated by timer and scheduler noise.
+  Memory is traced separately because tracemalloc slows allocation-heavy code down.
+  """
+  started = time.perf_counter()
+  run()
+  loops = max(1, math.ceil(min_sample_seconds / max(time.perf_counter() - started, 1e-9)))
+
+  samples = []
+  for _ in range(repeats):
+    started = time.perf_counter()
+    for _ in range(loops):
+      run()
+    samples.append((time.perf_counter() - started) / loops)
+
+  # Cyclic garbage from the timed runs (parse trees) would otherwise be freed at a random point of the traced one
+  gc.collect()
+  tracemalloc.start()
+  try:
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return statistics.median(samples), peak / 1e6
+
+
+def result(stage: str, size: str, items: int, unit: str, seconds: float, peak_mb: float) -> Dict[str, object]:
+  return {
+    "stage": stage,
+    "size": size,
+    "items": items,
+    "unit": unit,
+    "seconds": round(seconds, 6),
+    "throughput": round(items / seconds, 2) if seconds > 0 else None,
+    "peak_mb": round(peak_mb, 2),
+  }
+
+
+def bench_parse(pages: List[Tuple[str, str, str]], repeats: int, kind: str = "pages") -> Dict[str, object]:
+  def run() -> int:
+    return sum(len(parse_box_score(html, link, date)) for html, link, date in pages)
+
+  seconds, peak_mb = measure(run, repeats)
+  return result("parse", f"{len(pages)} {kind}", len(pages), "pages/s", seconds, peak_mb)
+
+
+def bench_clean(raw: pd.DataFrame, size: str, repeats: int) -> Dict[str, object]:
+  seconds, peak_mb = measure(lambda: clean_raw_data(raw), repeats)
+  return result("clean", size, len(raw), "rows/s", seconds, peak_mb)
+
+
+def bench_load(cleaned: pd.DataFrame, size: str, repeats: int) -> Dict[str, object]:
+  def run() -> None:
+    connection = StandInConnection()
+    player_id_map = assign_player_ids(cleaned, connection)
+    game_id_map = assign_game_ids(cleaned, connection)
+    clean_and_prepare_player_stats(cleaned, player_id_map, game_id_map, connection)
+
+  seconds, peak_mb = measure(run, repeats)
+  return {**result("load", size, len(cleaned), "rows/s", seconds, peak_mb), "database": "stand-in"}
+
+
+def bench_features(cleaned: pd.DataFrame, size: str, repeats: int) -> Dict[str, object]:
+  stats = cleaned.assign(player_id=pd.factorize(cleaned["Name"])[0], Date=pd.to_datetime(cleaned["Date"]))
+  seconds, peak_mb = measure(lambda: calculate_rolling_averages(stats), repeats)
+  return result("features", size, len(stats), "rows/s", seconds, peak_mb)
+
+
+def compare_to_baseline(
+  results: List[Dict[str, object]], baseline: List[Dict[str, object]], threshold: float
+) -> List[str]:
+  """
+  Regressions of more than `threshold` (a fraction) in throughput or peak memory against the baseline run.
+  Stages or sizes missing from the baseline are not compared.
+  """
+  expected = {(entry["stage"], entry["size"]): entry for entry in baseline}
+  regressions = []
+  for entry in results:
+    reference = expected.get((entry["stage"], entry["size"]))
+    if reference is None:
+      logging.info(f"No baseline for {entry['stage']} ({entry['size']}); skipping comparison.")
+      continue
+
+    if entry["throughput"] < reference["throughput"] * (1 - threshold):
+      regressions.append(
+        f"{entry['stage']} ({entry['size']}): {entry['throughput']:.1f} {entry['unit']} "
+        f"vs baseline {reference['throughput']:.1f}"
+      )
+    if entry["peak_mb"] > reference["peak_mb"] * (1 + threshold):
+      regressions.append(
+        f"{entry['stage']} ({entry['size']}): peak {entry['peak_mb']:.1f} MB vs baseline {reference['peak_mb']:.1f} MB"
+      )
+  return regressions
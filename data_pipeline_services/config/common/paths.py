@@ -0,0 +1,8 @@
+import os
+
+# Stage configs live next to this package unless PIPELINE_CONFIG_DIR points elsewhere (e.g. local runs outside /app)
+CONFIG_DIR = os.getenv("PIPELINE_CONFIG_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def config_path(stage: str, file_name: str) -> str:
+  return os.path.join(CONFIG_DIR, stage, file_name)
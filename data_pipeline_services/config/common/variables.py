@@ -1,4 +1,10 @@
-BASE_URL = "https://www.basketball-reference.com"
+import os
+
+# Overridable so the scraper can be pointed at the local stand-in (python -m data_pipeline_services.benchmarks.site)
+BASE_URL = os.getenv("SCRAPER_BASE_URL", "https://www.basketball-reference.com").rstrip("/")
+
+# Multiplies the scraper's politeness delays; 0 disables them against a local stand-in
+SCRAPE_DELAY_SCALE = float(os.getenv("SCRAPE_DELAY_SCALE", "1"))
 
 
 TEAM_ABBREVIATIONS = {
@@ -48,3 +54,52 @@ MONTH_START_END_DATES = {
   "november": ("11-01", "11-30"),
   "december": ("12-01", "12-31"),
 }
+
+# Box-score columns used by the fantasy scoring engine, in weight-matrix row order
+FANTASY_STAT_COLUMNS = ["PTS", "3P", "TRB", "AST", "STL", "BLK", "TOV"]
+
+# Categories counted towards double-doubles and triple-doubles
+DOUBLE_DIGIT_CATEGORIES = ["PTS", "TRB", "AST", "STL", "BLK"]
+
+SCORING_PLATFORMS = {
+  "fanduel": {
+    "weights": {"PTS": 1.0, "TRB": 1.2, "AST": 1.5, "STL": 3.0, "BLK": 3.0, "TOV": -1.0},
+    "bonuses": {},
+  },
+  "draftkings": {
+    "weights": {"PTS": 1.0, "3P": 0.5, "TRB": 1.25, "AST": 1.5, "STL": 2.0, "BLK": 2.0, "TOV": -0.5},
+    "bonuses": {"double_double": 1.5, "triple_double": 3.0},
+  },
+  "yahoo": {
+    "weights": {"PTS": 1.0, "3P": 0.5, "TRB": 1.2, "AST": 1.5, "STL": 3.0, "BLK": 3.0, "TOV": -1.0},
+    "bonuses": {},
+  },
+}
+
+# Box-score stat name -> PlayerStats column
+PLAYER_STATS_DB_COLUMNS = {
+  "MP": "mp",
+  "FG": "fg",
+  "FGA": "fga",
+  "FG%": "fg_percent",
+  "3P": "three_p",
+  "3PA": "three_pa",
+  "3P%": "three_p_percent",
+  "FT": "ft",
+  "FTA": "fta",
+  "FT%": "ft_percent",
+  "ORB": "orb",
+  "DRB": "drb",
+  "TRB": "trb",
+  "AST": "ast",
+  "STL": "stl",
+  "BLK": "blk",
+  "TOV": "tov",
+  "PF": "pf",
+  "PTS": "pts",
+  "GmSc": "gmsc",
+  "+-": "plus_minus",
+  "fpts_fanduel": "fpts_fanduel",
+  "fpts_draftkings": "fpts_draftkings",
+  "fpts_yahoo": "fpts_yahoo",
+}
@@ -2,33 +2,104 @@
 import logging
 import os
 import sys
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
+import pandas as pd
 import yaml
 
-from data_pipeline_services.data_ingestion.scraper import extract_player_data, get_box_score_links, get_month_links
-from data_pipeline_services.data_ingestion.utils import adjust_dates_based_on_season
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.data_ingestion.scraper import (
+  BOX_SCORE_COLUMNS,
+  extract_player_data,
+  get_box_score_links,
+  get_month_links,
+)
+from data_pipeline_services.data_ingestion.recheck import (
+  load_manifest,
+  manifest_entries,
+  recheck_box_scores,
+  save_manifest,
+)
+from data_pipeline_services.data_ingestion.utils import (
+  adjust_dates_based_on_season,
+  scrape_window,
+  split_range_by_season,
+)
+from data_pipeline_services.metrics import publish_run_metrics
 from data_pipeline_services.minio_operations import get_minio_client, upload_to_minio
+from data_pipeline_services.profiling import profiled
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
 logger = logging.getLogger(__name__)
 
 
+def recheck_recent_games(config: dict, days: int, minio_client, bucket_name: str) -> str:
+  """
+  Corrections run: re-fetch the box scores of the last `days` days and upload only the games whose
+  content changed since they were last scraped, for processing to upsert. The file is written even
+  when nothing changed so downstream tasks always have an input. Returns its object name.
+  """
+  defaults = config["default_nba_dates"]
+  end = date.today()
+  start = end - timedelta(days=days - 1)
+
+  changed = []
+  for season, chunk_start, chunk_end in split_range_by_season(start, end):
+    if scrape_window(season, chunk_start, chunk_end, defaults["start"], defaults["end"]) is None:
+      continue
+
+    result = get_month_links(season)
+    if result is None:
+      raise RuntimeError(f"Error getting month links for {season}")
+    month_links, start_year, end_year = result
+    start_date, end_date = adjust_dates_based_on_season(start_year, end_year, chunk_start, chunk_end)
+
+    box_score_links, all_dates = get_box_score_links(month_links, start_date, end_date, start_year, end_year)
+    if box_score_links is None or all_dates is None:
+      raise RuntimeError(f"Error getting box score links for {season}")
+
+    manifest = load_manifest(minio_client, bucket_name, season)
+    season_changed, entries = recheck_box_scores(box_score_links, all_dates, manifest)
+    logger.info(f"{season}: {season_changed['GameLink'].nunique()} of {len(entries)} rechecked games changed")
+    changed.append(season_changed)
+    save_manifest(minio_client, bucket_name, season, entries)
+
+  df = pd.concat(changed, ignore_index=True) if changed else pd.DataFrame(columns=BOX_SCORE_COLUMNS)
+  output_dir = f"{config['minio']['output_dir']}/corrections"
+  current_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+  object_name = os.getenv(
+    "OUTPUT_OBJECT_NAME", f"{output_dir}/nba_player_stats_corrections_{start}_to_{end}_{current_timestamp}.csv"
+  )
+  upload_to_minio(minio_client, df, bucket_name, object_name)
+  return object_name
+
+
+@profiled("ingestion")
 def main():
+  minio_client = bucket_name = object_name = None
   try:
-    yaml_file = "/app/data_pipeline_services/config/data_ingestion/scraping_config.yml"
+    yaml_file = config_path("data_ingestion", "scraping_config.yml")
 
     with open(yaml_file, "r") as file:
       config = yaml.safe_load(file)
 
+    # Orchestrated runs (one Airflow shard per task) override the configured job through the environment
     scraper = config["scraping_job"]
-    season = scraper["season"]
-    input_start_date = scraper["start_date"]
-    input_end_date = scraper["end_date"]
+    season = os.getenv("SCRAPE_SEASON", scraper["season"])
+    input_start_date = os.getenv("SCRAPE_START_DATE", scraper["start_date"])
+    input_end_date = os.getenv("SCRAPE_END_DATE", scraper["end_date"])
 
     default_start = config["default_nba_dates"]["start"]
     default_end = config["default_nba_dates"]["end"]
 
+    recheck_days = int(os.getenv("RECHECK_DAYS", "0"))
+    if recheck_days > 0:
+      minio_client = get_minio_client()
+      bucket_name = os.getenv("MINIO_BUCKET_NAME")
+      object_name = recheck_recent_games(config, recheck_days, minio_client, bucket_name)
+      logger.info(f"Corrections for the last {recheck_days} days uploaded to MinIO as '{object_name}'")
+      exit(0)
+
     result = get_month_links(season)
     if result is None:
       logger.error("Error getting month links. Exiting...")
@@ -46,7 +117,8 @@ def main():
       logger.error("Error getting box score links. Exiting...")
       exit(1)
 
-    df = extract_player_data(box_score_links, all_dates)
+    validators = {}
+    df = extract_player_data(box_score_links, all_dates, validators)
     if df.empty:
       logger.error("No data extracted. DataFrame is empty. Exiting...")
       exit(1)
@@ -57,20 +129,31 @@ def main():
     base_output_dir = minio_config["output_dir"]
     output_dir = f"{base_output_dir}/{season}"
     current_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    object_name = f"{output_dir}/nba_player_stats_{season}_{start_date}_to_{end_date}_{current_timestamp}.csv"
+    object_name = os.getenv(
+      "OUTPUT_OBJECT_NAME",
+      f"{output_dir}/nba_player_stats_{season}_{start_date}_to_{end_date}_{current_timestamp}.csv",
+    )
 
     try:
       minio_client = get_minio_client()
       upload_to_minio(minio_client, df, bucket_name, object_name)
       logger.info(f"Data successfully uploaded to MinIO bucket '{bucket_name}' as '{object_name}'")
-      exit(0)
     except Exception as e:
       logger.error(f"Error uploading data to MinIO: {e}")
       exit(1)
 
+    # Content hashes let later corrections runs (RECHECK_DAYS) tell which games changed
+    try:
+      save_manifest(minio_client, bucket_name, season, manifest_entries(df, validators))
+    except Exception as e:
+      logger.warning(f"Error saving the box score manifest: {e}")
+    exit(0)
+
   except Exception as e:
     logger.error(f"Error in data ingestion: {str(e)}")
     exit(1)
+  finally:
+    publish_run_metrics("ingestion", object_name, minio_client, bucket_name)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+# Entry point to queue-based scraping, for spreading one large scrape over many workers:
+#   QUEUE_ROLE=plan  enqueues the configured season and dates' box score links in Postgres
+#   QUEUE_ROLE=work  claims batches of links and scrapes them until the queue is drained
+# Workers share the site's rate limit through the scrape_rate_limits table. Their uploads are recorded
+# in scrape_outputs for the processing stage to pick up (PROCESSING_FROM_QUEUE=true).
+import logging
+import os
+import sys
+
+import yaml
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.data_ingestion.scraper import get_box_score_links, get_month_links
+from data_pipeline_services.data_ingestion.utils import adjust_dates_based_on_season
+from data_pipeline_services.data_ingestion.work_queue import (
+  DEFAULT_BATCH_SIZE,
+  DEFAULT_LEASE_SECONDS,
+  DEFAULT_MAX_ATTEMPTS,
+  enqueue_box_scores,
+  queue_status,
+  run_worker,
+  set_rate_limit,
+)
+from data_pipeline_services.data_processing.cleaning import connect_db
+from data_pipeline_services.metrics import publish_run_metrics
+from data_pipeline_services.migrations.runner import apply_migrations
+from data_pipeline_services.minio_operations import get_minio_client
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+def plan(connection, config: dict) -> int:
+  scraper = config["scraping_job"]
+  season = os.getenv("SCRAPE_SEASON", scraper["season"])
+  input_start_date = os.getenv("SCRAPE_START_DATE", scraper["start_date"]) or config["default_nba_dates"]["start"]
+  input_end_date = os.getenv("SCRAPE_END_DATE", scraper["end_date"]) or config["default_nba_dates"]["end"]
+
+  result = get_month_links(season)
+  if result is None:
+    raise RuntimeError("Error getting month links")
+  month_links, start_year, end_year = result
+  start_date, end_date = adjust_dates_based_on_season(start_year, end_year, input_start_date, input_end_date)
+
+  box_score_links, all_dates = get_box_score_links(month_links, start_date, end_date, start_year, end_year)
+  if box_score_links is None or all_dates is None:
+    raise RuntimeError("Error getting box score links")
+
+  requests_per_minute = os.getenv("SCRAPE_REQUESTS_PER_MINUTE")
+  if requests_per_minute:
+    set_rate_limit(connection, float(requests_per_minute), float(os.getenv("SCRAPE_BURST", "1")))
+
+  requeue = os.getenv("QUEUE_REQUEUE", "false").lower() == "true"
+  queued = enqueue_box_scores(connection, season, box_score_links, all_dates, requeue)
+  logger.info(f"Queued {queued} {season} box scores from {start_date} to {end_date}")
+  return queued
+
+
+def main():
+  connection = None
+  role = os.getenv("QUEUE_ROLE", "work")
+  try:
+    connection = connect_db()
+    if not connection:
+      logger.error("Database connection failed. Exiting...")
+      exit(1)
+    apply_migrations(connection)
+
+    with open(config_path("data_ingestion", "scraping_config.yml"), "r") as file:
+      config = yaml.safe_load(file)
+
+    if role == "plan":
+      plan(connection, config)
+    elif role == "work":
+      minio_client = get_minio_client()
+      bucket_name = os.getenv("MINIO_BUCKET_NAME")
+      scraped = run_worker(
+        connection,
+        minio_client,
+        bucket_name,
+        config["minio"]["output_dir"],
+        os.getenv("WORKER_ID"),
+        int(os.getenv("QUEUE_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+        int(os.getenv("QUEUE_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)),
+        int(os.getenv("QUEUE_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+      )
+      logger.info(f"Queue drained; this worker scraped {scraped} box scores")
+    else:
+      logger.error(f"Unknown QUEUE_ROLE '{role}'. Exiting...")
+      exit(1)
+
+    logger.info(f"Scrape queue: {queue_status(connection)}")
+    exit(0)
+
+  except Exception as e:
+    logger.error(f"Error in queue {role}: {str(e)}")
+    exit(1)
+  finally:
+    if connection:
+      connection.close()
+    publish_run_metrics("ingestion")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,133 @@
+import hashlib
+import io
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from data_pipeline_services.config.common.variables import SCRAPE_DELAY_SCALE
+from data_pipeline_services.data_ingestion.scraper import (
+  BOX_SCORE_COLUMNS,
+  fetch_page,
+  parse_box_score,
+  response_validators,
+)
+from data_pipeline_services.data_ingestion.utils import handle_general_error, handle_http_error
+from data_pipeline_services.metrics import METRICS
+
+MANIFEST_PREFIX = "manifests/box_scores"
+
+# link -> {"hash", "date", "checked_at"[, "etag", "last_modified"]}
+Manifest = Dict[str, Dict[str, str]]
+
+
+def manifest_object_name(season: str) -> str:
+  return f"{MANIFEST_PREFIX}/{season}.json"
+
+
+def box_score_hash(rows: List[list]) -> str:
+  """
+  Content hash of one game's parsed rows. Hashing what parse_box_score extracts rather than the page
+  means ads, timestamps and layout changes elsewhere on the page don't count as corrections.
+  """
+  return hashlib.sha256(json.dumps(rows, separators=(",", ":"), default=str).encode()).hexdigest()
+
+
+def box_score_hashes(df: pd.DataFrame) -> Dict[str, str]:
+  """
+  box_score_hash per GameLink of a freshly scraped frame (rows in parse order).
+  """
+  return {
+    link: box_score_hash(game_rows.to_numpy().tolist())
+    for link, game_rows in df[BOX_SCORE_COLUMNS].groupby("GameLink", sort=False)
+  }
+
+
+def manifest_entries(
+  df: pd.DataFrame, validators: Dict[str, Dict[str, str]], hashes: Optional[Dict[str, str]] = None
+) -> Manifest:
+  checked_at = datetime.now().isoformat(timespec="seconds")
+  dates = df.drop_duplicates("GameLink").set_index("GameLink")["Date"]
+  hashes = hashes if hashes is not None else box_score_hashes(df)
+  return {
+    link: {"hash": digest, "date": dates[link], "checked_at": checked_at, **validators.get(link, {})}
+    for link, digest in hashes.items()
+  }
+
+
+def load_manifest(minio_client, bucket_name: str, season: str) -> Manifest:
+  from data_pipeline_services.minio_operations import download_bytes_from_minio
+
+  payload = download_bytes_from_minio(minio_client, bucket_name, manifest_object_name(season))
+  return json.loads(payload) if payload else {}
+
+
+def save_manifest(minio_client, bucket_name: str, season: str, entries: Manifest) -> None:
+  """
+  Merge entries into the season's stored manifest. Re-reading right before writing keeps entries
+  that parallel shards wrote in the meantime.
+  """
+  from data_pipeline_services.minio_operations import upload_to_minio
+
+  if not entries:
+    return
+  manifest = load_manifest(minio_client, bucket_name, season)
+  manifest.update(entries)
+  payload = io.BytesIO(json.dumps(manifest, indent=0, sort_keys=True).encode())
+  upload_to_minio(minio_client, payload, bucket_name, manifest_object_name(season), content_type="application/json")
+
+
+def recheck_box_scores(
+  box_links: List[List[str]], all_dates: List[List[str]], manifest: Manifest
+) -> Tuple[pd.DataFrame, Manifest]:
+  """
+  Re-fetch box scores and keep only games whose parsed content differs from the manifest.
+
+  Pages are requested conditionally with the stored ETag / Last-Modified, so an unchanged page can come
+  back as a bodiless 304 without being parsed. Games missing from the manifest count as changed.
+  Returns the changed games' rows and the manifest entries to store (every game that was checked).
+  """
+  rows = []
+  entries: Manifest = {}
+  checked_at = datetime.now().isoformat(timespec="seconds")
+
+  for links, dates in zip(box_links, all_dates):
+    for link, date in zip(links, dates):
+      known = manifest.get(link, {})
+      headers = {}
+      if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+      if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+
+      try:
+        response = fetch_page(link, "box_score_recheck", headers or None)
+        if response.status_code == 304:
+          entries[link] = {**known, "checked_at": checked_at}
+          METRICS.inc("box_scores_rechecked_total", result="not_modified")
+        else:
+          response.raise_for_status()
+          response.encoding = response.apparent_encoding
+          page_rows = parse_box_score(response.text, link, date)
+          digest = box_score_hash(page_rows)
+          entries[link] = {"hash": digest, "date": date, "checked_at": checked_at, **response_validators(response)}
+
+          if page_rows and digest != known.get("hash"):
+            print(f"Box score changed: {link}")
+            rows.extend(page_rows)
+            METRICS.inc("box_scores_rechecked_total", result="changed")
+          else:
+            METRICS.inc("box_scores_rechecked_total", result="unchanged")
+
+      except requests.exceptions.HTTPError:
+        handle_http_error(response)
+      except Exception as e:
+        handle_general_error(e, link)
+
+      time.sleep(random.uniform(3, 7) * SCRAPE_DELAY_SCALE)
+
+  return pd.DataFrame(rows, columns=BOX_SCORE_COLUMNS, dtype=object), entries
@@ -1,19 +1,36 @@
 import random
 import time
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
-from data_pipeline_services.config.common.variables import BASE_URL, TEAM_ABBREVIATIONS
+from data_pipeline_services.config.common.variables import BASE_URL, SCRAPE_DELAY_SCALE, TEAM_ABBREVIATIONS
 from data_pipeline_services.data_ingestion.utils import (
   filter_relevant_months,
   handle_general_error,
   handle_http_error,
   normalize_name,
 )
+from data_pipeline_services.metrics import METRICS
+
+
+def fetch_page(url: str, page_type: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+  """
+  GET a page, recording its latency and status code (429s included) under `page_type`.
+  """
+  started = time.perf_counter()
+  try:
+    response = requests.get(url, headers=headers)
+  except requests.exceptions.RequestException:
+    METRICS.inc("http_requests_total", page=page_type, status="error")
+    raise
+  finally:
+    METRICS.observe("http_request_seconds", time.perf_counter() - started, page=page_type)
+  METRICS.inc("http_requests_total", page=page_type, status=response.status_code)
+  return response
 
 
 def get_month_links(season: str) -> Optional[Tuple[List[Tuple[str, str]], int, int]]:
@@ -47,7 +64,7 @@ def get_month_links(season: str) -> Optional[Tuple[List[Tuple[str, str]], int, i
 
   month_link_list = []
   try:
-    response = requests.get(start_url)
+    response = fetch_page(start_url, "season")
     response.raise_for_status()
 
     soup = BeautifulSoup(response.text, "html.parser")
@@ -111,7 +128,7 @@ def get_box_score_links(
       page_link_list = []
       page_date_list = []
       try:
-        response = requests.get(page)
+        response = fetch_page(page, "schedule")
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "html.parser")
 
@@ -134,7 +151,7 @@ def get_box_score_links(
         if page_link_list:
           box_link_array.append(page_link_list)
           all_dates.append(page_date_list)
-        time.sleep(random.uniform(0.5, 2))
+        time.sleep(random.uniform(0.5, 2) * SCRAPE_DELAY_SCALE)
 
       except requests.exceptions.HTTPError:
         handle_http_error(response)
@@ -156,48 +173,114 @@ def get_box_score_links(
 
 
 # from https://medium.com/@HeeebsInc/using-machine-learning-to-predict-daily-fantasy-basketball-scores-part-i-811de3c54a98
-def extract_player_data(box_links: List[List[str]], all_dates: List[List[str]]) -> pd.DataFrame:
+BOX_SCORE_COLUMNS = [
+  "Date",
+  "Name",
+  "Team",
+  "Opponent",
+  "MP",
+  "FG",
+  "FGA",
+  "FG%",
+  "3P",
+  "3PA",
+  "3P%",
+  "FT",
+  "FTA",
+  "FT%",
+  "ORB",
+  "DRB",
+  "TRB",
+  "AST",
+  "STL",
+  "BLK",
+  "TOV",
+  "PF",
+  "PTS",
+  "GmSc",
+  "+-",
+  "GameLink",
+  "Home",
+]
+
+
+def parse_box_score(html: str, link: str, date: str) -> List[list]:
+  """
+  Parse the basic stats tables of one box score page into rows ordered like BOX_SCORE_COLUMNS.
+
+  Inputs:
+    html (str): The box score page.
+    link (str): The page URL; its last three letters before '.html' are the home team's abbreviation.
+    date (str): The game date (YYYY-MM-DD).
+
+  Returns:
+    rows (list of lists): One row per player listed in either team's table.
+  """
+  soup = BeautifulSoup(html, "html.parser")
+
+  # e.g. https://www.basketball-reference.com/boxscores/202310240DEN.html
+  home_team_abbr = link.split("/")[-1].split(".")[0][-3:]
+  home_team = TEAM_ABBREVIATIONS.get(home_team_abbr, None)
+
+  tables = soup.find_all("table", id=lambda x: x and x.endswith("-game-basic"))
+  team_names = [table.find("caption").text.split(" Basic and Advanced Stats Table")[0].strip() for table in tables]
+
+  rows = []
+  for table, team_name in zip(tables, team_names):
+    opponent_name = team_names[1] if team_names[0] == team_name else team_names[0]
+    is_home = 1 if team_name == home_team else 0
+
+    for row in table.find("tbody").find_all("tr"):
+      if row.find("th").text in ["Team Totals", "Reserves"]:
+        continue
+      player_name = normalize_name(row.find("th").text.strip())
+
+      stats = [date, player_name, team_name, opponent_name]
+
+      dnp = row.find("td", {"data-stat": "reason"})
+      if dnp and "Did Not Play" in dnp.text:
+        stats += ["DNP"] * (len(BOX_SCORE_COLUMNS) - 6)
+      else:
+        for td in row.find_all("td"):
+          stats.append(td.text.strip() or "0")
+
+      stats.append(link)
+      stats.append(is_home)
+
+      if len(stats) == len(BOX_SCORE_COLUMNS):
+        rows.append(stats)
+      else:
+        print(f"Skipping incomplete data for {player_name}")
+
+  return rows
+
+
+def response_validators(response: requests.Response) -> Dict[str, str]:
+  """
+  The ETag / Last-Modified headers a later conditional GET of the same page can send back.
+  """
+  return {
+    name: response.headers[header]
+    for name, header in [("etag", "ETag"), ("last_modified", "Last-Modified")]
+    if response.headers.get(header)
+  }
+
+
+def extract_player_data(
+  box_links: List[List[str]], all_dates: List[List[str]], validators: Optional[Dict[str, Dict[str, str]]] = None
+) -> pd.DataFrame:
   """
   Extract player statistics from each box score link and save the data to a DataFrame.
 
   Inputs:
     box_links (list of lists): A list containing lists of URLs to box score pages.
     all_dates (list of lists): A list containing lists of dates corresponding to the box scores.
+    validators (dict, optional): Filled with each fetched page's response_validators, keyed by link.
 
   Returns:
     stat_df (pd.DataFrame): A DataFrame containing the extracted player statistics.
   """
-  df_columns = [
-    "Date",
-    "Name",
-    "Team",
-    "Opponent",
-    "MP",
-    "FG",
-    "FGA",
-    "FG%",
-    "3P",
-    "3PA",
-    "3P%",
-    "FT",
-    "FTA",
-    "FT%",
-    "ORB",
-    "DRB",
-    "TRB",
-    "AST",
-    "STL",
-    "BLK",
-    "TOV",
-    "PF",
-    "PTS",
-    "GmSc",
-    "+-",
-    "GameLink",
-    "Home",
-  ]
-
-  stat_df = pd.DataFrame(columns=df_columns)
+  rows = []
 
   for i, (links, dates) in enumerate(zip(box_links, all_dates)):
     print(f"Processing batch {i+1}/{len(box_links)}")
@@ -206,55 +289,22 @@ def extract_player_data(box_links: List[List[str]], all_dates: List[List[str]])
       print(f"Scraping box score: {link} for game date {date}")
 
       try:
-        response = requests.get(link)
+        response = fetch_page(link, "box_score")
         response.raise_for_status()
         response.encoding = response.apparent_encoding
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        home_team_abbr = link.split("/")[-1].split(".")[0][
-          -3:
-        ]  # e.g. https://www.basketball-reference.com/boxscores/202310240DEN.html
-        home_team = TEAM_ABBREVIATIONS.get(home_team_abbr, None)
-
-        tables = soup.find_all("table", id=lambda x: x and x.endswith("-game-basic"))
-        team_names = [
-          table.find("caption").text.split(" Basic and Advanced Stats Table")[0].strip() for table in tables
-        ]
-        for table in tables:
-          team_name = table.find("caption").text.split(" Basic and Advanced Stats Table")[0].strip()
-          opponent_name = team_names[1] if team_names[0] == team_name else team_names[0]
-          rows = table.find("tbody").find_all("tr")
-
-          is_home = 1 if team_name == home_team else 0
-
-          for row in rows:
-            if row.find("th").text in ["Team Totals", "Reserves"]:
-              continue
-            player_name = normalize_name(row.find("th").text.strip())
-
-            stats = [date, player_name, team_name, opponent_name]
-
-            dnp = row.find("td", {"data-stat": "reason"})
-            if dnp and "Did Not Play" in dnp.text:
-              stats += ["DNP"] * (len(df_columns) - 6)
-            else:
-              for td in row.find_all("td"):
-                stats.append(td.text.strip() or "0")
-
-            stats.append(link)
-            stats.append(is_home)
-
-            if len(stats) == len(df_columns):
-              new_row = pd.DataFrame([stats], columns=df_columns)
-              stat_df = pd.concat([stat_df, new_row], ignore_index=True)
-            else:
-              print(f"Skipping incomplete data for {player_name}")
+        with METRICS.timer("parse_seconds"):
+          page_rows = parse_box_score(response.text, link, date)
+        METRICS.inc("rows_scraped_total", len(page_rows))
+        rows.extend(page_rows)
+        if validators is not None:
+          validators[link] = response_validators(response)
 
       except requests.exceptions.HTTPError:
         handle_http_error(response)
       except Exception as e:
         handle_general_error(e, link)
 
-      time.sleep(random.uniform(3, 7))
+      time.sleep(random.uniform(3, 7) * SCRAPE_DELAY_SCALE)
 
-  return stat_df
+  # Built once from all rows; appending row by row re-copies the frame for every player
+  return pd.DataFrame(rows, columns=BOX_SCORE_COLUMNS, dtype=object)
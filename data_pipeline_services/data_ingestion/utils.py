@@ -1,8 +1,8 @@
 import calendar
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import unicodedata
 import time
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from data_pipeline_services.config.common.variables import MONTH_START_END_DATES
 
 
@@ -95,4 +95,53 @@ def adjust_dates_based_on_season(start_year_full: int, end_year_full: int, start
   else:
     adjusted_end_date = f"{end_year_full}-{end_date}"
   
-  return adjusted_start_date, adjusted_end_date
\ No newline at end of file
+  return adjusted_start_date, adjusted_end_date
+
+def season_years(season: str) -> Tuple[int, int]:
+  """
+  Start and end years of a season given as 'YYYY-YY'.
+  """
+  start_year, end_year = season.split("-")
+  start_year_full = int(start_year)
+  end_year_full = start_year_full + 1 if end_year == "00" else int(str(start_year_full)[:2] + end_year)
+  return start_year_full, end_year_full
+
+
+def season_for_date(game_date: date) -> str:
+  """
+  Season ('YYYY-YY') a calendar day is scraped under; October onwards starts the next season.
+  """
+  start_year = game_date.year if game_date.month >= 10 else game_date.year - 1
+  return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def scrape_window(season: str, start_date: str, end_date: str, default_start: str, default_end: str,
+                  today: Optional[date] = None) -> Optional[Tuple[str, str]]:
+  """
+  The YYYY-MM-DD range a scrape of MM-DD dates would cover, clipped to the season's game window
+  and to today. None when nothing in the range can have been played yet.
+  """
+  start_year, end_year = season_years(season)
+  season_start, season_end = adjust_dates_based_on_season(start_year, end_year, default_start, default_end)
+  if not start_date or not end_date:
+    start_date, end_date = default_start, default_end
+  start_date, end_date = adjust_dates_based_on_season(start_year, end_year, start_date, end_date)
+
+  start_date = max(start_date, season_start)
+  end_date = min(end_date, season_end, (today or date.today()).isoformat())
+  return (start_date, end_date) if start_date <= end_date else None
+
+
+def split_range_by_season(start_date: date, end_date: date) -> List[Tuple[str, str, str]]:
+  """
+  Split an inclusive YYYY-MM-DD range into (season, MM-DD start, MM-DD end) chunks, one per season.
+  """
+  chunks = []
+  chunk_start = start_date
+  while chunk_start <= end_date:
+    season = season_for_date(chunk_start)
+    next_season_start = date(season_years(season)[0] + 1, 10, 1)
+    chunk_end = min(end_date, next_season_start - timedelta(days=1))
+    chunks.append((season, chunk_start.strftime("%m-%d"), chunk_end.strftime("%m-%d")))
+    chunk_start = next_season_start
+  return chunks
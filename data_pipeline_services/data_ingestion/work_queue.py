@@ -0,0 +1,373 @@
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from psycopg2.extensions import connection
+
+from data_pipeline_services.metrics import METRICS
+
+RATE_LIMIT_NAME = os.getenv("SCRAPE_RATE_LIMIT", "basketball_reference")
+DEFAULT_BATCH_SIZE = 20
+# A worker renews its lease after every page, so this only needs to cover one slow request
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Longest single sleep while waiting for a rate limit token or for other workers' leases
+MAX_POLL_SECONDS = 5.0
+
+# The scraper (requests, bs4) is imported by the worker functions only, so the processing stage can use
+# the scrape_outputs helpers without it
+
+# (link, game date as YYYY-MM-DD, season)
+QueueItem = Tuple[str, str, str]
+
+
+def default_worker_id() -> str:
+  return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def enqueue_box_scores(
+  connection: connection, season: str, box_links: List[List[str]], all_dates: List[List[str]], requeue: bool = False
+) -> int:
+  """
+  Add box score links (as returned by get_box_score_links) to the queue. Links already queued are
+  left alone unless `requeue` resets them to pending. Returns the number of links added or reset.
+  """
+  links = [link for batch in box_links for link in batch]
+  dates = [date for batch in all_dates for date in batch]
+  on_conflict = "DO NOTHING"
+  if requeue:
+    on_conflict = """DO UPDATE SET status = 'pending', attempts = 0, claimed_by = NULL, lease_expires_at = NULL,
+      last_error = NULL, updated_at = now()"""
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    INSERT INTO scrape_queue (link, game_date, season)
+    SELECT link, game_date, %s FROM unnest(%s::text[], %s::date[]) AS q(link, game_date)
+    ON CONFLICT (link) {on_conflict};
+    """,
+    (season, links, dates),
+  )
+  queued = cursor.rowcount
+  connection.commit()
+  cursor.close()
+  return queued
+
+
+def claim_batch(
+  connection: connection,
+  worker_id: str,
+  batch_size: int = DEFAULT_BATCH_SIZE,
+  lease_seconds: int = DEFAULT_LEASE_SECONDS,
+  max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> List[QueueItem]:
+  """
+  Claim up to batch_size pending links, or links whose lease expired, oldest game first. SKIP LOCKED
+  lets concurrent workers claim disjoint batches without waiting on each other. Expired links that have
+  used all their attempts (their worker died on the last one) are marked failed instead.
+  """
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    UPDATE scrape_queue
+    SET status = 'failed', claimed_by = NULL, lease_expires_at = NULL, updated_at = now(),
+      last_error = COALESCE(last_error, 'lease expired')
+    WHERE status = 'in_progress' AND lease_expires_at < now() AND attempts >= %s;
+    """,
+    (max_attempts,),
+  )
+  cursor.execute(
+    """
+    UPDATE scrape_queue q
+    SET status = 'in_progress', claimed_by = %s, attempts = q.attempts + 1,
+      lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+    FROM (
+      SELECT link FROM scrape_queue
+      WHERE (status = 'pending' OR (status = 'in_progress' AND lease_expires_at < now())) AND attempts < %s
+      ORDER BY game_date, link
+      LIMIT %s
+      FOR UPDATE SKIP LOCKED
+    ) claimed
+    WHERE q.link = claimed.link
+    RETURNING q.link, q.game_date::text, q.season;
+    """,
+    (worker_id, lease_seconds, max_attempts, batch_size),
+  )
+  items = sorted(cursor.fetchall(), key=lambda item: (item[1], item[0]))
+  connection.commit()
+  cursor.close()
+  return items
+
+
+def extend_lease(connection: connection, worker_id: str, links: List[str], lease_seconds: int) -> None:
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    UPDATE scrape_queue SET lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+    WHERE link = ANY(%s::text[]) AND claimed_by = %s AND status = 'in_progress';
+    """,
+    (lease_seconds, links, worker_id),
+  )
+  connection.commit()
+  cursor.close()
+
+
+def release_link(
+  connection: connection, worker_id: str, link: str, error: str, max_attempts: int, count_attempt: bool = True
+) -> None:
+  """
+  Hand a link back after a failed fetch: pending again, or failed once it has used max_attempts.
+  Rate-limited fetches don't count as attempts.
+  """
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    UPDATE scrape_queue
+    SET attempts = attempts - %s, last_error = %s, claimed_by = NULL, lease_expires_at = NULL, updated_at = now(),
+      status = CASE WHEN attempts - %s >= %s THEN 'failed' ELSE 'pending' END
+    WHERE link = %s AND claimed_by = %s;
+    """,
+    (0 if count_attempt else 1, error[:500], 0 if count_attempt else 1, max_attempts, link, worker_id),
+  )
+  connection.commit()
+  cursor.close()
+
+
+def complete_batch(connection: connection, worker_id: str, links_by_object: Dict[str, List[str]], rows: Dict[str, int]):
+  """
+  Record uploaded objects and mark their links done, in one transaction. Links this worker lost to
+  another after its lease expired are left to that worker.
+  """
+  cursor = connection.cursor()
+  for object_name, links in links_by_object.items():
+    if object_name:
+      cursor.execute(
+        "INSERT INTO scrape_outputs (object_name, rows) VALUES (%s, %s) ON CONFLICT (object_name) DO NOTHING;",
+        (object_name, rows[object_name]),
+      )
+    cursor.execute(
+      """
+      UPDATE scrape_queue
+      SET status = 'done', object_name = %s, lease_expires_at = NULL, last_error = NULL, updated_at = now()
+      WHERE link = ANY(%s::text[]) AND claimed_by = %s AND status = 'in_progress';
+      """,
+      (object_name or None, links, worker_id),
+    )
+  connection.commit()
+  cursor.close()
+
+
+def acquire_token(connection: connection, name: str = RATE_LIMIT_NAME) -> None:
+  """
+  Block until the shared token bucket grants a request. The conditional UPDATE takes the bucket's row
+  lock, so workers on any node draw from it one at a time. A missing bucket means no limit.
+  """
+  refill = """LEAST(capacity, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * refill_per_second)"""
+  cursor = connection.cursor()
+  try:
+    while True:
+      cursor.execute(
+        f"""
+        UPDATE scrape_rate_limits SET tokens = {refill} - 1, updated_at = clock_timestamp()
+        WHERE name = %s AND {refill} >= 1
+        RETURNING tokens;
+        """,
+        (name,),
+      )
+      granted = cursor.fetchone()
+      connection.commit()
+      if granted:
+        return
+
+      cursor.execute(f"SELECT (1 - {refill}) / refill_per_second FROM scrape_rate_limits WHERE name = %s;", (name,))
+      wait = cursor.fetchone()
+      connection.commit()
+      if wait is None:
+        return
+      METRICS.inc("rate_limit_waits_total")
+      time.sleep(min(max(float(wait[0]), 0.05), MAX_POLL_SECONDS))
+  finally:
+    cursor.close()
+
+
+def back_off(connection: connection, seconds: float, name: str = RATE_LIMIT_NAME) -> None:
+  """
+  Drain the shared bucket so that no worker sends a request for `seconds` (after a 429's Retry-After).
+  """
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    UPDATE scrape_rate_limits
+    SET tokens = LEAST(tokens, 0) - %s * refill_per_second, updated_at = clock_timestamp()
+    WHERE name = %s;
+    """,
+    (seconds, name),
+  )
+  connection.commit()
+  cursor.close()
+
+
+def set_rate_limit(connection: connection, requests_per_minute: float, burst: float = 1, name: str = RATE_LIMIT_NAME):
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    INSERT INTO scrape_rate_limits (name, tokens, capacity, refill_per_second) VALUES (%s, %s, %s, %s)
+    ON CONFLICT (name) DO UPDATE SET capacity = EXCLUDED.capacity, refill_per_second = EXCLUDED.refill_per_second;
+    """,
+    (name, burst, burst, requests_per_minute / 60),
+  )
+  connection.commit()
+  cursor.close()
+
+
+def queue_status(connection: connection) -> Dict[str, int]:
+  """
+  Link counts by status, plus 'leased': in-progress links whose lease hasn't expired.
+  """
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    SELECT status, count(*), count(*) FILTER (WHERE lease_expires_at >= now()) FROM scrape_queue GROUP BY status;
+    """
+  )
+  rows = cursor.fetchall()
+  connection.commit()
+  cursor.close()
+  counts = {status: count for status, count, _ in rows}
+  counts["leased"] = sum(leased for status, _, leased in rows if status == "in_progress")
+  return counts
+
+
+def unprocessed_outputs(connection: connection) -> List[str]:
+  cursor = connection.cursor()
+  cursor.execute("SELECT object_name FROM scrape_outputs WHERE processed_at IS NULL ORDER BY created_at;")
+  object_names = [row[0] for row in cursor.fetchall()]
+  cursor.close()
+  return object_names
+
+
+def mark_processed(connection: connection, object_names: List[str]) -> None:
+  cursor = connection.cursor()
+  cursor.execute(
+    "UPDATE scrape_outputs SET processed_at = now() WHERE object_name = ANY(%s::text[]);", (list(object_names),)
+  )
+  connection.commit()
+  cursor.close()
+
+
+def scrape_batch(
+  connection: connection, worker_id: str, items: List[QueueItem], lease_seconds: int, max_attempts: int
+) -> Tuple[List[list], Dict[str, Dict[str, str]], List[str]]:
+  """
+  Fetch and parse a claimed batch under the shared rate limit. Returns the parsed rows, each page's
+  validators and the links that were scraped; failed links are handed back to the queue.
+  """
+  from requests.exceptions import HTTPError
+
+  from data_pipeline_services.data_ingestion.scraper import fetch_page, parse_box_score, response_validators
+
+  rows, validators, scraped = [], {}, []
+  for position, (link, date, _) in enumerate(items):
+    # Waiting on the shared rate limit can outlast a lease, so renew the batch's open links before each page
+    if position:
+      extend_lease(connection, worker_id, scraped + [item[0] for item in items[position:]], lease_seconds)
+    acquire_token(connection)
+    response = None
+    try:
+      response = fetch_page(link, "box_score")
+      if response.status_code == 429:
+        retry_after = float(response.headers.get("Retry-After") or 60)
+        back_off(connection, retry_after)
+        release_link(connection, worker_id, link, "rate limited", max_attempts, count_attempt=False)
+        continue
+
+      response.raise_for_status()
+      response.encoding = response.apparent_encoding
+      with METRICS.timer("parse_seconds"):
+        page_rows = parse_box_score(response.text, link, date)
+      METRICS.inc("rows_scraped_total", len(page_rows))
+      rows.extend(page_rows)
+      validators[link] = response_validators(response)
+      scraped.append(link)
+
+    except Exception as e:
+      error = f"HTTP {response.status_code}" if isinstance(e, HTTPError) else str(e)
+      logging.warning(f"Error scraping {link}: {error}")
+      release_link(connection, worker_id, link, error, max_attempts)
+      METRICS.inc("queue_links_total", result="failed")
+  return rows, validators, scraped
+
+
+def run_worker(
+  connection: connection,
+  minio_client,
+  bucket_name: str,
+  output_dir: str,
+  worker_id: Optional[str] = None,
+  batch_size: int = DEFAULT_BATCH_SIZE,
+  lease_seconds: int = DEFAULT_LEASE_SECONDS,
+  max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> int:
+  """
+  Claim, scrape and upload batches until the queue is drained. Each batch is uploaded as one raw
+  object per season, named like the ingestion stage's, and recorded in scrape_outputs for processing.
+  While other workers still hold leases the worker waits, so it takes over their links if they crash.
+  Returns the number of links scraped.
+  """
+  from data_pipeline_services.data_ingestion.recheck import manifest_entries, save_manifest
+  from data_pipeline_services.data_ingestion.scraper import BOX_SCORE_COLUMNS
+  from data_pipeline_services.minio_operations import upload_to_minio
+
+  worker_id = worker_id or default_worker_id()
+  scraped_total = 0
+  while True:
+    items = claim_batch(connection, worker_id, batch_size, lease_seconds, max_attempts)
+    if not items:
+      status = queue_status(connection)
+      # Expired in-progress links are claimable (or just failed), so only live leases are worth waiting for
+      if not status.get("pending") and not status["leased"]:
+        return scraped_total
+      time.sleep(MAX_POLL_SECONDS)
+      continue
+
+    logging.info(f"Worker {worker_id} claimed {len(items)} links ({items[0][1]} to {items[-1][1]})")
+    rows, validators, scraped = scrape_batch(connection, worker_id, items, lease_seconds, max_attempts)
+    df = pd.DataFrame(rows, columns=BOX_SCORE_COLUMNS, dtype=object)
+    season_of = {link: season for link, _, season in items}
+
+    links_by_object, rows_by_object = {}, {}
+    current_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    for season in sorted({season_of[link] for link in scraped}):
+      links = [link for link in scraped if season_of[link] == season]
+      season_df = df[df["GameLink"].isin(links)]
+      if season_df.empty:
+        links_by_object.setdefault("", []).extend(links)
+        continue
+      object_name = (
+        f"{output_dir}/{season}/nba_player_stats_{season}_{season_df['Date'].min()}_to_{season_df['Date'].max()}_"
+        f"{worker_id}_{current_timestamp}.csv"
+      )
+      try:
+        upload_to_minio(minio_client, season_df, bucket_name, object_name)
+      except Exception as e:
+        # Only this season's links go back to the queue; the rest of the batch is still completed
+        logging.warning(f"Error uploading {object_name}: {e}")
+        for link in links:
+          release_link(connection, worker_id, link, f"upload failed: {e}", max_attempts)
+        METRICS.inc("queue_links_total", len(links), result="failed")
+        scraped = [link for link in scraped if link not in links]
+        continue
+      links_by_object[object_name] = links
+      rows_by_object[object_name] = len(season_df)
+      try:
+        save_manifest(minio_client, bucket_name, season, manifest_entries(season_df, validators))
+      except Exception as e:
+        logging.warning(f"Error saving the box score manifest: {e}")
+
+    complete_batch(connection, worker_id, links_by_object, rows_by_object)
+    METRICS.inc("queue_links_total", len(scraped), result="done")
+    scraped_total += len(scraped)
@@ -0,0 +1,98 @@
+from typing import List
+
+import pandas as pd
+from psycopg2.extensions import connection
+
+# Columns summed into player_season_totals and averaged into player_rolling_averages
+AGGREGATE_STATS = [
+  "mp", "fg", "fga", "three_p", "three_pa", "ft", "fta", "orb", "drb", "trb", "ast", "stl", "blk",
+  "tov", "pf", "pts", "plus_minus", "fpts_fanduel", "fpts_draftkings", "fpts_yahoo",
+]  # fmt: skip
+ROLLING_WINDOWS = [5, 10]
+
+
+def season_starts(dates: pd.Series) -> pd.Series:
+  """
+  October 1 of each date's season, as YYYY-MM-DD.
+  """
+  dates = pd.to_datetime(dates)
+  start_years = dates.dt.year.where(dates.dt.month >= 10, dates.dt.year - 1)
+  return start_years.astype(str) + "-10-01"
+
+
+def refresh_season_totals(connection: connection, player_ids: List[int], season_start_dates: List[str]) -> None:
+  """
+  Recompute player_season_totals for the given (player, season start) pairs from PlayerStats.
+  Each pair reads one partition through the (player_id, game_date) index.
+  """
+  columns = ", ".join(AGGREGATE_STATS)
+  sums = ", ".join(f"sum(ps.{stat})" for stat in AGGREGATE_STATS)
+  updated = ["games", "first_game_date", "last_game_date"] + AGGREGATE_STATS
+  updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in updated)
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    INSERT INTO player_season_totals (player_id, season, games, first_game_date, last_game_date, {columns})
+    SELECT ps.player_id, playerstats_season(t.season_start), count(*), min(ps.game_date), max(ps.game_date), {sums}
+    FROM unnest(%s::integer[], %s::date[]) AS t(player_id, season_start)
+    JOIN playerstats ps
+      ON ps.player_id = t.player_id
+      AND ps.game_date >= t.season_start
+      AND ps.game_date < (t.season_start + INTERVAL '1 year')::date
+    GROUP BY ps.player_id, t.season_start
+    ORDER BY ps.player_id, t.season_start
+    ON CONFLICT (player_id, season) DO UPDATE SET {updates}, updated_at = now();
+    """,
+    (list(player_ids), list(season_start_dates)),
+  )
+  cursor.close()
+
+
+def refresh_rolling_averages(
+  connection: connection, player_ids: List[int], windows: List[int] = ROLLING_WINDOWS
+) -> None:
+  """
+  Recompute each player's averages over their last `window` stored games.
+  """
+  columns = ", ".join(AGGREGATE_STATS)
+  averages = ", ".join(f"avg(r.{stat})" for stat in AGGREGATE_STATS)
+  updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in ["games", "last_game_date"] + AGGREGATE_STATS)
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    INSERT INTO player_rolling_averages (player_id, window_size, games, last_game_date, {columns})
+    SELECT p.player_id, w.window_size, count(*), max(r.game_date), {averages}
+    FROM unnest(%s::integer[]) AS p(player_id)
+    CROSS JOIN unnest(%s::integer[]) AS w(window_size)
+    CROSS JOIN LATERAL (
+      SELECT ps.*
+      FROM playerstats ps
+      WHERE ps.player_id = p.player_id
+      ORDER BY ps.game_date DESC
+      LIMIT w.window_size
+    ) r
+    GROUP BY p.player_id, w.window_size
+    ORDER BY p.player_id, w.window_size
+    ON CONFLICT (player_id, window_size) DO UPDATE SET {updates}, updated_at = now();
+    """,
+    (list(player_ids), list(windows)),
+  )
+  cursor.close()
+
+
+def refresh_player_aggregates(connection: connection, stored: pd.DataFrame) -> None:
+  """
+  Bring the aggregate tables up to date for the players and seasons in a just-stored frame
+  (player_id and Date columns). Recomputing the touched keys keeps reloads and overlaps idempotent.
+  Rows are written in key order, so concurrent shards sharing players lock them in the same order.
+  """
+  if stored.empty:
+    return
+
+  pairs = pd.DataFrame({"player_id": stored["player_id"].astype(int), "season_start": season_starts(stored["Date"])})
+  pairs = pairs.drop_duplicates()
+  refresh_season_totals(connection, pairs["player_id"].tolist(), pairs["season_start"].tolist())
+  refresh_rolling_averages(connection, pairs["player_id"].unique().tolist())
+  connection.commit()
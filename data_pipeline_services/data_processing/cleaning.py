@@ -2,6 +2,8 @@ import hashlib
 import logging
 import os
 import sys
+import time
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -10,11 +12,31 @@ from dotenv import load_dotenv
 from psycopg2.extensions import connection
 
 from data_pipeline_services.config.common.variables import TEAM_ABBREVIATIONS
+from data_pipeline_services.data_processing.aggregates import refresh_player_aggregates
+from data_pipeline_services.data_processing.dedup_index import (
+  LoadedKeyIndex,
+  drop_loaded_rows,
+  load_key_index,
+  row_keys,
+  save_key_index,
+)
+from data_pipeline_services.data_processing.player_resolution import player_keys
+from data_pipeline_services.data_processing.scoring import add_fantasy_points
+from data_pipeline_services.data_processing.stats_changes import record_player_stats_changes
 from data_pipeline_services.data_processing.validate import validate_cleaned_data
+from data_pipeline_services.migrations.runner import apply_migrations
+from data_pipeline_services.metrics import METRICS
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
 
+# PlayerStats columns a corrected box score may change; rewritten when upserting
+PLAYER_STATS_UPDATE_COLUMNS = [
+  "team", "opponent", "mp", "fg", "fga", "fg_percent", "three_p", "three_pa", "three_p_percent", "ft", "fta",
+  "ft_percent", "orb", "drb", "trb", "ast", "stl", "blk", "tov", "pf", "pts", "gmsc", "plus_minus", "fpts_fanduel",
+  "fpts_draftkings", "fpts_yahoo",
+]  # fmt: skip
+
 
 def connect_db() -> connection | None:
   try:
@@ -136,25 +158,39 @@ def generate_game_id(game_date: str, team: str, opponent: str) -> str:
 def assign_player_ids(df: pd.DataFrame, connection: connection) -> dict:
   """
   Assign unique player IDs to each player in the dataset and populate the Players table.
+  Box score names are matched exactly; new players are stored with their name key as a canonical alias
+  so names from other sources can be resolved to them (see player_resolution).
+
+  Names are inserted in sorted order, so shards processed concurrently take the row locks of the players
+  they share in the same order and wait on each other instead of deadlocking.
   """
-  players = df["Name"].drop_duplicates()
+  players = df["Name"].drop_duplicates().sort_values()
+  name_keys = player_keys(players)
   player_id_map = {}
 
   cursor = connection.cursor()
 
-  for player_name in players:
+  for player_name, name_key in zip(players, name_keys):
     cursor.execute(
       """
-      INSERT INTO Players (player_name)
-      VALUES (%s)
+      INSERT INTO Players (player_name, name_key)
+      VALUES (%s, %s)
       ON CONFLICT (player_name) DO NOTHING
       RETURNING player_id;
       """,
-      (player_name,),
+      (player_name, name_key),
     )
     result = cursor.fetchone()
     if result:
       player_id_map[player_name] = result[0]
+      cursor.execute(
+        """
+        INSERT INTO player_aliases (alias_key, player_id, source)
+        VALUES (%s, %s, 'canonical')
+        ON CONFLICT (alias_key, player_id) DO NOTHING;
+        """,
+        (name_key, result[0]),
+      )
     else:
       cursor.execute(
         """
@@ -172,8 +208,9 @@ def assign_player_ids(df: pd.DataFrame, connection: connection) -> dict:
 def assign_game_ids(df: pd.DataFrame, connection: connection) -> dict:
   """
   Assign unique game IDs to each game and populate the Games table.
+  Games are inserted in game link order, for the same reason as in assign_player_ids.
   """
-  games = df[["Date", "Team", "Opponent", "Home", "GameLink"]].drop_duplicates()
+  games = df[["Date", "Team", "Opponent", "Home", "GameLink"]].drop_duplicates().sort_values("GameLink")
   game_id_map = {}
 
   cursor = connection.cursor()
@@ -208,13 +245,29 @@ def assign_game_ids(df: pd.DataFrame, connection: connection) -> dict:
 
 # Prepare Player Stats
 def clean_and_prepare_player_stats(
-  df: pd.DataFrame, player_id_map: dict, game_id_map: dict, connection: connection
+  df: pd.DataFrame, player_id_map: dict, game_id_map: dict, connection: connection, upsert: bool = False
 ) -> None:
   """
   Insert the cleaned player stats into the PlayerStats table in the database.
+  Existing rows are left alone unless `upsert` is set, in which case their stats are overwritten.
   """
+  on_conflict = "DO NOTHING"
+  if upsert:
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in PLAYER_STATS_UPDATE_COLUMNS)
+    on_conflict = f"DO UPDATE SET {updates}"
   cursor = connection.cursor()
 
+  # PlayerStats is partitioned by season; make sure every season in the frame has its partition
+  cursor.execute(
+    """
+    SELECT ensure_playerstats_partition(season_start)
+    FROM (SELECT DISTINCT playerstats_season_start(d) AS season_start FROM unnest(%s::date[]) AS d) seasons;
+    """,
+    (df["Date"].unique().tolist(),),
+  )
+  # Creating a partition locks the parent table, so don't hold that for the whole load
+  connection.commit()
+
   for row in df.to_dict("records"):
     game_date = row["Date"]
     team = row["Team"]
@@ -233,16 +286,18 @@ def clean_and_prepare_player_stats(
 
     if player_id and game_id:
       cursor.execute(
-        """
+        f"""
         INSERT INTO PlayerStats (
-        game_id, player_id, team, opponent, mp, fg, fga, fg_percent, three_p, three_pa, 
+        game_id, player_id, game_date, team, opponent, mp, fg, fga, fg_percent, three_p, three_pa, 
         three_p_percent, ft, fta, ft_percent, orb, drb, trb, ast, stl, blk, 
-        tov, pf, pts, gmsc, plus_minus
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+        tov, pf, pts, gmsc, plus_minus, fpts_fanduel, fpts_draftkings, fpts_yahoo
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (game_id, player_id, game_date) {on_conflict};
         """,
         (
           game_id,
           player_id,
+          game_date,
           row["Team"],
           row["Opponent"],
           row["MP"],
@@ -266,49 +321,193 @@ def clean_and_prepare_player_stats(
           row["PTS"],
           row["GmSc"],
           row["+-"],
+          row["fpts_fanduel"],
+          row["fpts_draftkings"],
+          row["fpts_yahoo"],
         ),
       )
 
   connection.commit()
 
 
-# Process Raw Data
-def process_raw_data(df: pd.DataFrame) -> bool:
-  connection = None
-  try:
-    logging.info("Starting data processing...")
+def delete_stale_player_stats(connection: connection, stored: pd.DataFrame) -> pd.DataFrame:
+  """
+  For corrected games (every game_id in `stored`), delete the PlayerStats rows of players no longer in the
+  box score, features first. Returns the deleted rows' player_id and Date.
+  """
+  if stored.empty:
+    return pd.DataFrame(columns=["player_id", "Date"])
 
-    df = df.copy()
+  # The dates only narrow the scan to the partitions involved
+  stale = """
+    ps.game_id = ANY(%s::text[]) AND ps.game_date = ANY(%s::date[])
+    AND (ps.game_id, ps.player_id) NOT IN (SELECT * FROM unnest(%s::text[], %s::integer[]))
+  """
+  params = (
+    stored["game_id"].unique().tolist(),
+    stored["Date"].unique().tolist(),
+    stored["game_id"].tolist(),
+    stored["player_id"].tolist(),
+  )
 
-    # DB connection
-    connection = connect_db()
-    if not connection:
-      logging.error("Database connection failed.")
-      return False
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    DELETE FROM playerfeatures pf
+    USING playerstats ps
+    WHERE pf.game_id = ps.game_id AND pf.player_id = ps.player_id AND pf.game_date = ps.game_date AND {stale};
+    """,
+    params,
+  )
+  cursor.execute(f"DELETE FROM playerstats ps WHERE {stale} RETURNING ps.player_id, ps.game_date::text;", params)
+  deleted = cursor.fetchall()
+  cursor.close()
+  connection.commit()
+  return pd.DataFrame(deleted, columns=["player_id", "Date"])
 
-    logging.info("Database connected.")
 
-    # Data cleaning, preprocessing, and validate
-    logging.info("Cleaning and preprocessing data...")
+def attach_ids(df: pd.DataFrame, player_id_map: dict, game_id_map: dict) -> pd.DataFrame:
+  """
+  Add the player_id and game_id each row was stored under, dropping rows that couldn't be matched.
+  """
+  home_team = np.where(df["Home"] == 1, df["Team"], df["Opponent"])
+  away_team = np.where(df["Home"] == 1, df["Opponent"], df["Team"])
+  df = df.assign(
+    player_id=df["Name"].map(player_id_map),
+    game_id=[game_id_map.get(key) for key in zip(df["Date"], home_team, away_team)],
+  )
+  df = df.dropna(subset=["player_id", "game_id"])
+  return df.astype({"player_id": int})
+
+
+def clean_raw_data(
+  df: pd.DataFrame, key_index: Optional[LoadedKeyIndex] = None, connection: Optional[connection] = None
+) -> pd.DataFrame | None:
+  """
+  Clean, validate and score raw box scores. Returns None if validation fails.
+  Rows already in `key_index` (loaded by an earlier run) are dropped before any per-row work.
+  """
+  df = df.copy()
+  METRICS.inc("rows_received_total", len(df))
+
+  # Data cleaning, preprocessing, and validate
+  logging.info("Cleaning and preprocessing data...")
 
+  with METRICS.timer("clean_seconds"):
+    received = len(df)
     df = remove_duplicates(df)
+    METRICS.inc("rows_rejected_total", received - len(df), reason="duplicate")
     df = convert_team_names_to_abbreviations(df)
+
+    if key_index is not None:
+      received = len(df)
+      df = drop_loaded_rows(df, key_index, connection)
+      METRICS.inc("rows_rejected_total", received - len(df), reason="already_loaded")
+      if received and df.empty:
+        logging.info("Every row was loaded by an earlier run.")
+
+    received = len(df)
     df = remove_dnp_and_zero_minutes(df)
+    METRICS.inc("rows_rejected_total", received - len(df), reason="did_not_play")
+
+    received = len(df)
     df = convert_mp_to_minutes(df)
+    METRICS.inc("rows_rejected_total", received - len(df), reason="invalid_minutes")
     df = clean_numeric_columns(df)
 
     if not validate_cleaned_data(df):
+      METRICS.inc("rows_rejected_total", len(df), reason="validation")
       logging.error("Data validation failed.")
-      return False
+      return None
 
-    # assign unique IDs for players and games
-    logging.info("Assigning unique IDs for players and games...")
+  METRICS.inc("rows_cleaned_total", len(df))
+
+  # Score once here so fantasy points are stored with the stats
+  logging.info("Calculating fantasy points...")
+  return add_fantasy_points(df, ["fanduel", "draftkings", "yahoo"])
+
+
+# Process Raw Data
+def process_raw_frame(
+  df: pd.DataFrame, connection: connection, key_index: Optional[LoadedKeyIndex] = None, upsert: bool = False
+) -> pd.DataFrame | None:
+  """
+  Clean, validate, score and store raw box scores. Returns the stored rows with their player and
+  game IDs so later stages can use them without reading them back, or None if validation fails.
+  Stored rows are added to `key_index`; saving it is up to the caller.
+
+  With `upsert` the frame holds complete corrected games: stored rows are overwritten rather than
+  skipped, and players no longer in a game's box score are removed from it.
+  """
+  df = clean_raw_data(df, None if upsert else key_index, connection)
+  if df is None:
+    return None
+
+  # assign unique IDs for players and games
+  logging.info("Assigning unique IDs for players and games...")
+  with METRICS.timer("db_write_seconds", table="players"):
     player_id_map = assign_player_ids(df, connection)
+  with METRICS.timer("db_write_seconds", table="games"):
     game_id_map = assign_game_ids(df, connection)
 
-    # Insert cleaned player stats into database
-    logging.info("Inserting player stats into database...")
-    clean_and_prepare_player_stats(df, player_id_map, game_id_map, connection)
+  # Insert cleaned player stats into database
+  logging.info("Inserting player stats into database...")
+  started = time.perf_counter()
+  clean_and_prepare_player_stats(df, player_id_map, game_id_map, connection, upsert)
+  elapsed = time.perf_counter() - started
+
+  stored = attach_ids(df, player_id_map, game_id_map)
+  METRICS.observe("db_write_seconds", elapsed, table="playerstats")
+  METRICS.inc("db_rows_written_total", len(stored), table="playerstats")
+  METRICS.set("db_rows_per_second", len(stored) / elapsed if elapsed > 0 else 0.0, table="playerstats")
+
+  touched = stored
+  if upsert:
+    deleted = delete_stale_player_stats(connection, stored)
+    METRICS.inc("db_rows_deleted_total", len(deleted), table="playerstats")
+    if not deleted.empty:
+      logging.info(f"Removed {len(deleted)} player rows no longer in their corrected box scores.")
+      touched = pd.concat([stored[["player_id", "Date"]], deleted], ignore_index=True)
+  with METRICS.timer("db_write_seconds", table="player_aggregates"):
+    refresh_player_aggregates(connection, touched)
+  # Lets the prediction service drop cached predictions these rows make stale
+  record_player_stats_changes(connection, touched)
+  if key_index is not None:
+    key_index.add(row_keys(stored))
+  return stored
+
+
+def process_raw_data(
+  df: pd.DataFrame, minio_client=None, bucket_name: Optional[str] = None, upsert: bool = False
+) -> bool:
+  """
+  Process one raw frame. Given a MinIO client, rows loaded by earlier runs are skipped using the
+  dedup index stored in the bucket, which is updated afterwards. `upsert` is for corrections files
+  (see process_raw_frame).
+  """
+  connection = None
+  try:
+    if df.empty:
+      logging.info("No rows to process.")
+      return True
+
+    logging.info("Starting data processing...")
+
+    # DB connection
+    connection = connect_db()
+    if not connection:
+      logging.error("Database connection failed.")
+      return False
+
+    logging.info("Database connected.")
+    apply_migrations(connection)
+
+    key_index = load_key_index(minio_client, bucket_name, connection) if minio_client is not None else None
+    if process_raw_frame(df, connection, key_index, upsert) is None:
+      return False
+    if key_index is not None:
+      save_key_index(key_index, minio_client, bucket_name)
+
     logging.info("Data processing completed successfully.")
     return True
   except Exception as e:
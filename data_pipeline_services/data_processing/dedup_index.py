@@ -0,0 +1,126 @@
+import io
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from psycopg2.extensions import connection
+
+# Same key remove_duplicates uses within a file, applied after team names become abbreviations
+KEY_COLUMNS = ["Date", "Team", "Opponent", "Name"]
+DEDUP_INDEX_OBJECT = os.getenv("DEDUP_INDEX_OBJECT", "indexes/player_game_keys.npy")
+
+
+def row_keys(df: pd.DataFrame) -> np.ndarray:
+  """
+  64-bit hash of each row's (date, team, opponent, player) key. Values are compared as strings so
+  keys hashed from a CSV, an in-memory frame or a database query agree.
+  """
+  return pd.util.hash_pandas_object(df[KEY_COLUMNS].astype(str), index=False).to_numpy(dtype=np.uint64)
+
+
+class LoadedKeyIndex:
+  """
+  Sorted array of the row keys already stored in PlayerStats; 8 bytes per row, so a hundred seasons
+  fit in about 25 MB. Membership is a vectorized binary search.
+  """
+
+  def __init__(self, keys: Optional[np.ndarray] = None):
+    self.keys = np.unique(keys) if keys is not None else np.empty(0, dtype=np.uint64)
+
+  def __len__(self) -> int:
+    return len(self.keys)
+
+  def contains(self, hashes: np.ndarray) -> np.ndarray:
+    if not len(self.keys):
+      return np.zeros(len(hashes), dtype=bool)
+    positions = np.searchsorted(self.keys, hashes)
+    return self.keys[np.minimum(positions, len(self.keys) - 1)] == hashes
+
+  def add(self, hashes: np.ndarray) -> None:
+    self.keys = np.union1d(self.keys, hashes.astype(np.uint64))
+
+  def to_bytes(self) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, self.keys, allow_pickle=False)
+    return buffer.getvalue()
+
+  @classmethod
+  def from_bytes(cls, payload: bytes) -> "LoadedKeyIndex":
+    return cls(np.load(io.BytesIO(payload), allow_pickle=False).astype(np.uint64))
+
+
+def stored_row_keys(connection: connection, game_dates: Optional[list] = None) -> pd.DataFrame:
+  """
+  Keys of the PlayerStats rows already stored, optionally only for the given YYYY-MM-DD dates.
+  """
+  query = """
+    SELECT ps.game_date::text AS "Date", ps.team AS "Team", ps.opponent AS "Opponent", p.player_name AS "Name"
+    FROM playerstats ps
+    JOIN players p ON p.player_id = ps.player_id
+  """
+  params = ()
+  if game_dates is not None:
+    query += " WHERE ps.game_date = ANY(%s::date[])"
+    params = (list(game_dates),)
+
+  cursor = connection.cursor()
+  cursor.execute(query, params)
+  rows = cursor.fetchall()
+  cursor.close()
+  return pd.DataFrame(rows, columns=KEY_COLUMNS, dtype=object)
+
+
+def drop_loaded_rows(df: pd.DataFrame, index: LoadedKeyIndex, connection: Optional[connection] = None) -> pd.DataFrame:
+  """
+  Drop rows whose key is already in the index. With a connection, rows the index flags are checked
+  exactly against PlayerStats in one query (for the dates involved), so a hash collision can't drop new data.
+  """
+  if df.empty or not len(index):
+    return df
+
+  flagged = index.contains(row_keys(df))
+  if not flagged.any() or connection is None:
+    return df[~flagged]
+
+  candidates = df[flagged]
+  stored = stored_row_keys(connection, candidates["Date"].astype(str).unique().tolist())
+  confirmed = np.isin(row_keys(candidates), row_keys(stored))
+  if not confirmed.all():
+    logging.warning(f"{(~confirmed).sum()} rows matched the dedup index but not the database; keeping them.")
+
+  drop = flagged.copy()
+  drop[np.flatnonzero(flagged)[~confirmed]] = False
+  return df[~drop]
+
+
+def load_key_index(minio_client, bucket_name: str, connection: Optional[connection] = None) -> LoadedKeyIndex:
+  """
+  The index stored in MinIO; if there is none yet it is built from PlayerStats when a connection is given.
+  """
+  from data_pipeline_services.minio_operations import download_bytes_from_minio
+
+  payload = download_bytes_from_minio(minio_client, bucket_name, DEDUP_INDEX_OBJECT)
+  if payload is not None:
+    return LoadedKeyIndex.from_bytes(payload)
+
+  if connection is None:
+    return LoadedKeyIndex()
+  logging.info("No dedup index found; building it from stored player stats.")
+  return LoadedKeyIndex(row_keys(stored_row_keys(connection)))
+
+
+def save_key_index(index: LoadedKeyIndex, minio_client, bucket_name: str) -> None:
+  """
+  Merge with the stored copy before writing, so parallel shard runs don't drop each other's keys
+  (a key lost in a race only costs a skipped insert later, as inserts ignore existing rows).
+  """
+  from data_pipeline_services.minio_operations import download_bytes_from_minio, upload_to_minio
+
+  payload = download_bytes_from_minio(minio_client, bucket_name, DEDUP_INDEX_OBJECT)
+  if payload is not None:
+    index.add(LoadedKeyIndex.from_bytes(payload).keys)
+  upload_to_minio(
+    minio_client, io.BytesIO(index.to_bytes()), bucket_name, DEDUP_INDEX_OBJECT, content_type="application/octet-stream"
+  )
@@ -4,8 +4,10 @@ import sys
 
 import pandas as pd
 
-from data_pipeline_services.data_processing.cleaning import process_raw_data
+from data_pipeline_services.data_processing.cleaning import connect_db, process_raw_data
+from data_pipeline_services.metrics import publish_run_metrics
 from data_pipeline_services.minio_operations import download_csv_from_minio, get_minio_client, list_objects_in_bucket
+from data_pipeline_services.profiling import profiled
 
 pd.set_option("future.no_silent_downcasting", True)
 
@@ -13,23 +15,65 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def process_queue_outputs(minio_client, bucket_name: str) -> int:
+  """
+  Load every object the scrape queue's workers uploaded that no run has processed yet, in one pass.
+  Returns the number of objects processed.
+  """
+  from data_pipeline_services.data_ingestion.work_queue import mark_processed, unprocessed_outputs
+
+  connection = connect_db()
+  if not connection:
+    raise RuntimeError("Database connection failed")
+  try:
+    object_names = unprocessed_outputs(connection)
+    if not object_names:
+      return 0
+    frames = []
+    for object_name in object_names:
+      df = download_csv_from_minio(minio_client, bucket_name, object_name)
+      if df is None:
+        raise RuntimeError(f"Failed to download {object_name}")
+      frames.append(df)
+
+    if not process_raw_data(pd.concat(frames, ignore_index=True), minio_client, bucket_name):
+      raise RuntimeError("Data processing failed")
+    mark_processed(connection, object_names)
+    return len(object_names)
+  finally:
+    connection.close()
+
+
+@profiled("processing")
 def main():
+  minio_client = bucket_name = latest_file = None
   try:
     minio_client = get_minio_client()
     bucket_name = os.getenv("MINIO_BUCKET_NAME")
 
-    objects = list_objects_in_bucket(minio_client, bucket_name)
-    csv_files = [obj for obj in objects if obj.endswith(".csv")]
+    if os.getenv("PROCESSING_FROM_QUEUE", "false").lower() == "true":
+      processed = process_queue_outputs(minio_client, bucket_name)
+      logger.info(f"Processed {processed} objects from the scrape queue")
+      exit(0)
 
-    if not csv_files:
-      logger.error("No CSV files found in the bucket. Exiting...")
-      exit(1)
+    # A sharded run names the object its ingestion task wrote; otherwise pick the latest upload
+    latest_file = os.getenv("INPUT_OBJECT_NAME")
+    if not latest_file:
+      objects = list_objects_in_bucket(minio_client, bucket_name)
+      csv_files = [obj for obj in objects if obj.endswith(".csv")]
 
-    latest_file = max(csv_files, key=lambda x: x.split("_")[-1].split(".")[0])
+      if not csv_files:
+        logger.error("No CSV files found in the bucket. Exiting...")
+        exit(1)
+
+      latest_file = max(csv_files, key=lambda x: x.split("_")[-1].split(".")[0])
     df = download_csv_from_minio(minio_client, bucket_name, latest_file)
 
+    # Corrections runs re-emit whole games whose box scores changed; their stored rows get overwritten
+    upsert = "/corrections/" in latest_file or os.getenv("PROCESSING_UPSERT", "false").lower() == "true"
+
     if df is not None:
-      success = process_raw_data(df)
+      success = process_raw_data(df, minio_client, bucket_name, upsert)
       if not success:
         logger.error("Data processing failed.")
         exit(1)
@@ -42,6 +86,8 @@ def main():
   except Exception as e:
     logger.error(f"An error occurred during data processing: {str(e)}")
     exit(1)
+  finally:
+    publish_run_metrics("processing", latest_file, minio_client, bucket_name)
 
 
 if __name__ == "__main__":
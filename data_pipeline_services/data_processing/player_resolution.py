@@ -0,0 +1,191 @@
+import logging
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+NAME_SUFFIX_PATTERN = r"(?:\s+(?:jr|sr|ii|iii|iv|v))+$"
+# Fuzzy matches need this trigram Jaccard similarity, and must beat the runner-up player by the margin
+FUZZY_THRESHOLD = 0.75
+FUZZY_MARGIN = 0.1
+RESOLVED_COLUMNS = ["name", "name_key", "player_id", "method", "score"]
+
+
+def player_keys(names: pd.Series) -> pd.Series:
+  """
+  Normalized identity key of each name: no diacritics, case, punctuation or generational suffix, with
+  initials joined, so 'Luka Dončić', 'A.J. Green', 'A. J. Green' and 'Gary Trent Jr.' become
+  'luka doncic', 'aj green', 'aj green' and 'gary trent'.
+  """
+  keys = names.astype(str).str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii").str.lower()
+  keys = keys.str.replace(r"[.'`]", "", regex=True).str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+  keys = keys.str.replace(NAME_SUFFIX_PATTERN, "", regex=True)
+  return keys.str.replace(r"\b([a-z]) (?=[a-z]\b)", r"\1", regex=True)
+
+
+def name_trigrams(key: str) -> Set[str]:
+  padded = f"  {key} "
+  return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerResolver:
+  """
+  Maps names to player IDs through their player_keys. Exact keys are one vectorized lookup; keys seen
+  for more than one player are ambiguous and never resolved. Unknown keys fall back to fuzzy matching
+  over a trigram inverted index, which only scores known keys sharing a trigram with the query.
+  """
+
+  def __init__(self, keys: pd.Series, player_ids: pd.Series):
+    pairs = pd.DataFrame({"name_key": keys.to_numpy(), "player_id": player_ids.to_numpy()}).drop_duplicates()
+    players_per_key = pairs.groupby("name_key")["player_id"].transform("nunique")
+    self.ambiguous = set(pairs.loc[players_per_key > 1, "name_key"])
+    unique = pairs[players_per_key == 1]
+    self.keys = pd.Index(unique["name_key"].to_numpy())
+    self.player_ids = unique["player_id"].to_numpy(dtype=np.int64)
+    self._postings: Optional[Dict[str, np.ndarray]] = None
+
+  def _build_trigram_index(self) -> None:
+    postings: Dict[str, List[int]] = {}
+    self.gram_counts = np.zeros(len(self.keys), dtype=np.int32)
+    for position, key in enumerate(self.keys):
+      grams = name_trigrams(key)
+      self.gram_counts[position] = len(grams)
+      for gram in grams:
+        postings.setdefault(gram, []).append(position)
+    self._postings = {gram: np.array(positions, dtype=np.int64) for gram, positions in postings.items()}
+
+  def fuzzy_match(self, key: str) -> Optional[tuple]:
+    """
+    (player_id, similarity) of the best fuzzy match for a key, or None if no known key is close enough
+    or the best two players are too close to call. A player scores as their closest key, so several
+    aliases of one player don't compete with each other.
+    """
+    if self._postings is None:
+      self._build_trigram_index()
+    grams = name_trigrams(key)
+    postings = [self._postings[gram] for gram in grams if gram in self._postings]
+    if not postings:
+      return None
+
+    shared = np.bincount(np.concatenate(postings), minlength=len(self.keys))
+    candidates = np.flatnonzero(shared)
+    scores = shared[candidates] / (len(grams) + self.gram_counts[candidates] - shared[candidates])
+    players, owners = np.unique(self.player_ids[candidates], return_inverse=True)
+    player_scores = np.zeros(len(players))
+    np.maximum.at(player_scores, owners, scores)
+    order = np.argsort(-player_scores)
+    best = player_scores[order[0]]
+    runner_up = player_scores[order[1]] if len(order) > 1 else 0.0
+    if best < FUZZY_THRESHOLD or best - runner_up < FUZZY_MARGIN:
+      return None
+    return int(players[order[0]]), float(best)
+
+  def resolve(self, names: pd.Series, fuzzy: bool = True) -> pd.DataFrame:
+    """
+    One row per distinct name: its key, player_id (missing when unresolved) and how it was resolved
+    ('exact' or 'fuzzy', with the fuzzy similarity as score).
+    """
+    resolved = pd.DataFrame({"name": names.drop_duplicates().to_numpy()})
+    resolved["name_key"] = player_keys(resolved["name"]).to_numpy()
+    positions = self.keys.get_indexer(resolved["name_key"])
+    found = positions >= 0
+    resolved["player_id"] = pd.array(np.where(found, self.player_ids[positions], 0), dtype="Int64")
+    resolved.loc[~found, "player_id"] = pd.NA
+    resolved["method"] = np.where(found, "exact", None)
+    resolved["score"] = np.where(found, 1.0, np.nan)
+
+    if fuzzy and len(self.keys):
+      rows, matches = [], []
+      for row, key in zip(np.flatnonzero(~found), resolved["name_key"].to_numpy()[~found]):
+        match = None if key in self.ambiguous else self.fuzzy_match(key)
+        if match is not None:
+          rows.append(row)
+          matches.append(match)
+      if rows:
+        player_ids, scores = zip(*matches)
+        resolved.loc[rows, "player_id"] = list(player_ids)
+        resolved.loc[rows, "method"] = "fuzzy"
+        resolved.loc[rows, "score"] = list(scores)
+    return resolved[RESOLVED_COLUMNS]
+
+
+# Database helpers take a psycopg2 connection; psycopg2 isn't imported so the lineup optimizer can match
+# names without it
+def load_resolver(connection) -> PlayerResolver:
+  """
+  Resolver over every stored player alias.
+  """
+  cursor = connection.cursor()
+  cursor.execute("SELECT alias_key, player_id FROM player_aliases;")
+  rows = cursor.fetchall()
+  cursor.close()
+  aliases = pd.DataFrame(rows, columns=["name_key", "player_id"])
+  return PlayerResolver(aliases["name_key"], aliases["player_id"])
+
+
+def backfill_player_keys(connection) -> int:
+  """
+  Key players stored before name keys existed and add their canonical aliases. Returns players keyed.
+  """
+  cursor = connection.cursor()
+  cursor.execute("SELECT player_id, player_name FROM players WHERE name_key IS NULL;")
+  rows = cursor.fetchall()
+  if rows:
+    players = pd.DataFrame(rows, columns=["player_id", "player_name"])
+    keys = player_keys(players["player_name"]).tolist()
+    ids = players["player_id"].tolist()
+    cursor.execute(
+      """
+      UPDATE players p SET name_key = k.name_key
+      FROM unnest(%s::integer[], %s::text[]) AS k(player_id, name_key)
+      WHERE p.player_id = k.player_id;
+      """,
+      (ids, keys),
+    )
+    cursor.execute(
+      """
+      INSERT INTO player_aliases (alias_key, player_id, source)
+      SELECT name_key, player_id, 'canonical' FROM unnest(%s::text[], %s::integer[]) AS k(name_key, player_id)
+      ON CONFLICT (alias_key, player_id) DO NOTHING;
+      """,
+      (keys, ids),
+    )
+  connection.commit()
+  cursor.close()
+  return len(rows)
+
+
+def save_aliases(connection, resolved: pd.DataFrame) -> int:
+  """
+  Persist the fuzzy resolutions in a resolve() result, so the next lookup of those names is exact.
+  """
+  fuzzy = resolved[resolved["method"] == "fuzzy"]
+  if fuzzy.empty:
+    return 0
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    INSERT INTO player_aliases (alias_key, player_id, source, score)
+    SELECT alias_key, player_id, 'fuzzy', score
+    FROM unnest(%s::text[], %s::integer[], %s::double precision[]) AS a(alias_key, player_id, score)
+    ON CONFLICT (alias_key, player_id) DO NOTHING;
+    """,
+    (fuzzy["name_key"].tolist(), fuzzy["player_id"].astype(int).tolist(), fuzzy["score"].astype(float).tolist()),
+  )
+  connection.commit()
+  cursor.close()
+  return len(fuzzy)
+
+
+def resolve_player_ids(connection, names: pd.Series, fuzzy: bool = True) -> pd.DataFrame:
+  """
+  Resolve names from outside the box scores (salary files, other stat sources) to stored players,
+  persisting fuzzy matches as aliases. See PlayerResolver.resolve for the result.
+  """
+  backfill_player_keys(connection)
+  resolved = load_resolver(connection).resolve(names, fuzzy)
+  saved = save_aliases(connection, resolved)
+  unresolved = resolved["player_id"].isna().sum()
+  if saved or unresolved:
+    logging.info(f"Resolved {len(resolved) - unresolved} of {len(resolved)} names ({saved} new fuzzy aliases).")
+  return resolved
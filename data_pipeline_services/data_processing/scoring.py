@@ -0,0 +1,82 @@
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline_services.config.common.variables import (
+  DOUBLE_DIGIT_CATEGORIES,
+  FANTASY_STAT_COLUMNS,
+  SCORING_PLATFORMS,
+)
+
+
+def _double_digit_counts(df: pd.DataFrame) -> np.ndarray:
+  stats = np.nan_to_num(df[DOUBLE_DIGIT_CATEGORIES].to_numpy(dtype=float))
+  return (stats >= 10).sum(axis=1)
+
+
+# Each bonus rule maps a frame to a 0/1 indicator per row
+BONUS_RULES: Dict[str, Callable[[pd.DataFrame], np.ndarray]] = {
+  "double_double": lambda df: (_double_digit_counts(df) >= 2).astype(float),
+  "triple_double": lambda df: (_double_digit_counts(df) >= 3).astype(float),
+}
+
+
+def register_platform(name: str, weights: Dict[str, float], bonuses: Optional[Dict[str, float]] = None) -> None:
+  """
+  Add or replace a scoring platform. Weights are keyed by box-score column, bonuses by BONUS_RULES name.
+  """
+  unknown_stats = set(weights) - set(FANTASY_STAT_COLUMNS)
+  if unknown_stats:
+    raise ValueError(f"Unknown stat columns for platform '{name}': {sorted(unknown_stats)}")
+
+  unknown_bonuses = set(bonuses or {}) - set(BONUS_RULES)
+  if unknown_bonuses:
+    raise ValueError(f"Unknown bonus rules for platform '{name}': {sorted(unknown_bonuses)}")
+
+  SCORING_PLATFORMS[name] = {"weights": dict(weights), "bonuses": dict(bonuses or {})}
+
+
+def build_weight_matrix(platforms: List[str]) -> np.ndarray:
+  """
+  Stack platform weights into a (stats + bonuses) x platforms matrix.
+  Rows follow FANTASY_STAT_COLUMNS, then BONUS_RULES in insertion order.
+  """
+  bonus_names = list(BONUS_RULES)
+  weights = np.zeros((len(FANTASY_STAT_COLUMNS) + len(bonus_names), len(platforms)))
+
+  for j, platform in enumerate(platforms):
+    config = SCORING_PLATFORMS[platform]
+    for stat, weight in config["weights"].items():
+      weights[FANTASY_STAT_COLUMNS.index(stat), j] = weight
+    for bonus, weight in config.get("bonuses", {}).items():
+      weights[len(FANTASY_STAT_COLUMNS) + bonus_names.index(bonus), j] = weight
+
+  return weights
+
+
+def calculate_fantasy_points(df: pd.DataFrame, platforms: Optional[List[str]] = None) -> pd.DataFrame:
+  """
+  Score every row for each platform with a single matrix product.
+  Returns a frame with one 'fpts_<platform>' column per platform, indexed like df.
+  Missing stats count as zero.
+  """
+  platforms = platforms or list(SCORING_PLATFORMS)
+
+  stats = np.nan_to_num(df[FANTASY_STAT_COLUMNS].to_numpy(dtype=float))
+  bonuses = np.column_stack([rule(df) for rule in BONUS_RULES.values()])
+  features = np.hstack([stats, bonuses])
+
+  scores = features @ build_weight_matrix(platforms)
+
+  return pd.DataFrame(scores, index=df.index, columns=[f"fpts_{platform}" for platform in platforms])
+
+
+def add_fantasy_points(df: pd.DataFrame, platforms: Optional[List[str]] = None) -> pd.DataFrame:
+  """
+  Append fantasy point columns for the given platforms (default: all registered) to a cleaned frame.
+  """
+  df = df.copy()
+  scores = calculate_fantasy_points(df, platforms)
+  df[scores.columns] = scores
+  return df
@@ -0,0 +1,63 @@
+import json
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+import pandas as pd
+from psycopg2.extensions import connection
+
+CHANNEL = "playerstats_changed"
+# NOTIFY payloads must stay under 8000 bytes; each player takes about 20
+PLAYERS_PER_NOTIFICATION = 300
+
+
+def record_player_stats_changes(connection: connection, stored: pd.DataFrame) -> None:
+  """
+  Record that the players in a just-stored frame (player_id and Date columns) have new or changed stats,
+  and announce it on CHANNEL as JSON {"changed_at": epoch seconds, "players": [[player_id, first date], ...]}.
+  Values derived from games after a player's first changed date are stale.
+  """
+  if stored.empty:
+    return
+
+  first_dates = pd.to_datetime(stored["Date"]).groupby(stored["player_id"].astype(int)).min().dt.strftime("%Y-%m-%d")
+  players = [[int(player_id), first_date] for player_id, first_date in first_dates.items()]
+
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    INSERT INTO player_stats_changes (player_id, changed_at)
+    SELECT player_id, clock_timestamp() FROM unnest(%s::integer[]) AS c(player_id)
+    ON CONFLICT (player_id) DO UPDATE SET changed_at = EXCLUDED.changed_at;
+    """,
+    (first_dates.index.tolist(),),
+  )
+  for start in range(0, len(players), PLAYERS_PER_NOTIFICATION):
+    cursor.execute(
+      """
+      SELECT pg_notify(
+        %s, json_build_object('changed_at', extract(epoch FROM clock_timestamp()), 'players', %s::json)::text
+      );
+      """,
+      (CHANNEL, json.dumps(players[start : start + PLAYERS_PER_NOTIFICATION])),
+    )
+  connection.commit()
+  cursor.close()
+
+
+def parse_notification(payload: str) -> Tuple[datetime, List[Tuple[int, str]]]:
+  message = json.loads(payload)
+  changed_at = datetime.fromtimestamp(float(message["changed_at"]), timezone.utc)
+  return changed_at, [(int(player), date) for player, date in message["players"]]
+
+
+def players_changed_since(connection: connection, since: datetime) -> Tuple[List[int], datetime]:
+  """
+  Players whose stats changed after `since`, and the database time to resume from.
+  """
+  cursor = connection.cursor()
+  cursor.execute("SELECT player_id FROM player_stats_changes WHERE changed_at > %s;", (since,))
+  player_ids = [row[0] for row in cursor.fetchall()]
+  cursor.execute("SELECT clock_timestamp();")
+  now = cursor.fetchone()[0]
+  cursor.close()
+  return player_ids, now
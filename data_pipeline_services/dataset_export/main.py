@@ -0,0 +1,44 @@
+# Entry point to the local training dataset snapshot (memory-mapped columns of PlayerStats and PlayerFeatures)
+import logging
+import os
+import sys
+
+from data_pipeline_services.data_processing.cleaning import connect_db
+from data_pipeline_services.dataset_export.snapshot import DEFAULT_LOOKBACK_DAYS, export_snapshot
+from data_pipeline_services.migrations.runner import apply_migrations
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+def main():
+  connection = None
+  try:
+    snapshot_dir = os.getenv("SNAPSHOT_DIR")
+    if not snapshot_dir:
+      logger.error("SNAPSHOT_DIR is not set. Exiting...")
+      exit(1)
+
+    connection = connect_db()
+    if not connection:
+      logger.error("Database connection failed. Exiting...")
+      exit(1)
+    apply_migrations(connection)
+
+    lookback_days = int(os.getenv("SNAPSHOT_LOOKBACK_DAYS", DEFAULT_LOOKBACK_DAYS))
+    read = export_snapshot(
+      connection, snapshot_dir, os.getenv("SNAPSHOT_START_DATE"), os.getenv("SNAPSHOT_END_DATE"), lookback_days
+    )
+    logger.info(f"Exported {read} player games to the snapshot at {snapshot_dir}")
+    exit(0)
+
+  except Exception as e:
+    logger.error(f"Error exporting the dataset snapshot: {str(e)}")
+    exit(1)
+  finally:
+    if connection:
+      connection.close()
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,290 @@
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from psycopg2.extensions import connection
+
+from data_pipeline_services.config.common.variables import PLAYER_STATS_DB_COLUMNS, TEAM_ABBREVIATIONS
+from data_pipeline_services.data_ingestion.utils import season_for_date, season_years
+from data_pipeline_services.feature_generation.features import ROLLING_STATS, feature_db_column
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+# Re-read window behind the newest exported game: picks up features computed after the stats were
+# exported and stat corrections, which are updated in place
+DEFAULT_LOOKBACK_DAYS = 7
+
+TEAM_CODES = sorted(TEAM_ABBREVIATIONS)
+STAT_COLUMNS = list(PLAYER_STATS_DB_COLUMNS.values())
+FEATURE_COLUMNS = [feature_db_column(stat) for stat in ROLLING_STATS]
+COLUMN_DTYPES: Dict[str, str] = {
+  "row_key": "uint64",
+  "live": "bool",
+  "player_id": "int32",
+  "game_date": "datetime64[D]",
+  "home": "int8",
+  "team": "int8",
+  "opponent": "int8",
+  **{column: "float64" for column in STAT_COLUMNS + FEATURE_COLUMNS},
+}
+# Columns rewritten when an exported row is read again
+UPDATED_COLUMNS = [column for column in COLUMN_DTYPES if column != "row_key"]
+
+
+def snapshot_row_keys(game_ids: pd.Series, player_ids: pd.Series) -> np.ndarray:
+  """
+  64-bit key of each (game_id, player_id) row.
+  """
+  keys = pd.DataFrame({"game_id": game_ids.astype(str), "player_id": player_ids.astype(str)})
+  return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+def column_path(root: str, season: str, column: str) -> str:
+  return os.path.join(root, season, f"{column}.bin")
+
+
+def read_manifest(root: str) -> dict:
+  """
+  The snapshot's manifest: column dtypes, rows per season and the newest exported game date.
+  Column files may hold more rows than the manifest after an interrupted export; readers ignore them.
+  """
+  path = os.path.join(root, MANIFEST_FILE)
+  if not os.path.exists(path):
+    return {"format": SNAPSHOT_FORMAT, "columns": COLUMN_DTYPES, "seasons": {}, "max_game_date": None}
+  with open(path, "r") as file:
+    return json.load(file)
+
+
+def write_manifest(root: str, manifest: dict) -> None:
+  # Replaced atomically, so readers see either the old or the new row counts
+  path = os.path.join(root, MANIFEST_FILE)
+  with open(f"{path}.tmp", "w") as file:
+    json.dump(manifest, file, indent=2, sort_keys=True)
+  os.replace(f"{path}.tmp", path)
+
+
+@contextmanager
+def export_lock(root: str) -> Iterator[None]:
+  """
+  Exclusive lock on the snapshot directory, held while exporting so concurrent runs append in turn.
+  """
+  os.makedirs(root, exist_ok=True)
+  with open(os.path.join(root, ".lock"), "w") as lock_file:
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    try:
+      yield
+    finally:
+      fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def open_season(root: str, season: str, columns: Optional[List[str]] = None, manifest: Optional[dict] = None):
+  """
+  Read-only memmaps of one season's columns, keyed by column name. Nothing is read until used.
+  team/opponent are codes into TEAM_CODES (-1 when unknown); rows with live False were deleted upstream.
+  """
+  manifest = manifest or read_manifest(root)
+  rows = manifest["seasons"].get(season, {}).get("rows", 0)
+  arrays = {}
+  for column in columns or list(manifest["columns"]):
+    dtype = np.dtype(manifest["columns"][column])
+    if rows:
+      arrays[column] = np.memmap(column_path(root, season, column), dtype=dtype, mode="r", shape=(rows,))
+    else:
+      arrays[column] = np.empty(0, dtype=dtype)
+  return arrays
+
+
+def load_snapshot(
+  root: str, seasons: Optional[List[str]] = None, columns: Optional[List[str]] = None, live_only: bool = True
+) -> pd.DataFrame:
+  """
+  Seasons ('YYYY-YY', default all) of the snapshot as one frame with decoded team abbreviations.
+  Columns come straight from the memmaps with their stored types, so the only cost is pandas copying
+  them into the frame; use open_season for zero-copy access to the columns themselves.
+  """
+  manifest = read_manifest(root)
+  seasons = seasons or sorted(manifest["seasons"])
+  columns = columns or [column for column in manifest["columns"] if column not in ("row_key", "live")]
+  needed = list(dict.fromkeys(columns + (["live"] if live_only else [])))
+
+  parts = []
+  for season in seasons:
+    arrays = open_season(root, season, needed, manifest)
+    if live_only and not arrays["live"].all():
+      arrays = {column: values[arrays["live"]] for column, values in arrays.items()}
+    parts.append(arrays)
+
+  data = {}
+  for column in columns:
+    if len(parts) == 1:
+      data[column] = parts[0][column]
+    elif parts:
+      data[column] = np.concatenate([part[column] for part in parts])
+    else:
+      data[column] = np.empty(0, dtype=manifest["columns"][column])
+
+  for column in ("team", "opponent"):
+    if column in data:
+      data[column] = pd.Categorical.from_codes(np.asarray(data[column]), categories=TEAM_CODES)
+  return pd.DataFrame(data, copy=False)
+
+
+def fetch_snapshot_rows(connection: connection, start_date: str, end_date: str) -> pd.DataFrame:
+  """
+  PlayerStats joined with their PlayerFeatures (NULL before features are generated) between dates.
+  """
+  stat_columns = ", ".join(f"ps.{column}" for column in STAT_COLUMNS)
+  feature_columns = ", ".join(f"pf.{column}" for column in FEATURE_COLUMNS)
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    SELECT ps.game_id, ps.player_id, ps.game_date, CASE WHEN ps.team = g.home_team THEN 1 ELSE 0 END,
+      ps.team, ps.opponent, {stat_columns}, {feature_columns}
+    FROM playerstats ps
+    JOIN games g ON g.game_id = ps.game_id
+    LEFT JOIN playerfeatures pf
+      ON pf.game_id = ps.game_id AND pf.player_id = ps.player_id AND pf.game_date = ps.game_date
+    WHERE ps.game_date BETWEEN %s AND %s
+    ORDER BY ps.game_date, ps.game_id, ps.player_id;
+    """,
+    (start_date, end_date),
+  )
+  rows = cursor.fetchall()
+  cursor.close()
+  return pd.DataFrame(
+    rows, columns=["game_id", "player_id", "game_date", "home", "team", "opponent"] + STAT_COLUMNS + FEATURE_COLUMNS
+  )
+
+
+def snapshot_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+  """
+  Fetched rows as typed column arrays in the snapshot's layout.
+  """
+  team_codes = pd.Categorical(df["team"], categories=TEAM_CODES).codes
+  opponent_codes = pd.Categorical(df["opponent"], categories=TEAM_CODES).codes
+  arrays = {
+    "row_key": snapshot_row_keys(df["game_id"], df["player_id"]),
+    "live": np.ones(len(df), dtype=bool),
+    "player_id": df["player_id"].to_numpy(dtype=np.int32),
+    "game_date": pd.to_datetime(df["game_date"]).to_numpy().astype("datetime64[D]"),
+    "home": df["home"].to_numpy(dtype=np.int8),
+    "team": team_codes.astype(np.int8),
+    "opponent": opponent_codes.astype(np.int8),
+  }
+  for column in STAT_COLUMNS + FEATURE_COLUMNS:
+    arrays[column] = pd.to_numeric(df[column]).to_numpy(dtype=np.float64, na_value=np.nan)
+  return arrays
+
+
+def merge_season(
+  root: str, season: str, rows: int, arrays: Dict[str, np.ndarray], since: Optional[str], until: str
+) -> int:
+  """
+  Merge freshly read rows into a season's column files: rows already exported are updated in place,
+  new rows are appended, and exported rows between `since` and `until` that were not read again are
+  marked not live. Returns the season's new row count; the caller records it in the manifest.
+  """
+  os.makedirs(os.path.join(root, season), exist_ok=True)
+  # Drop anything an interrupted export appended past the recorded row count
+  for column, dtype in COLUMN_DTYPES.items():
+    path = column_path(root, season, column)
+    with open(path, "ab"):
+      pass
+    if os.path.getsize(path) > rows * np.dtype(dtype).itemsize:
+      os.truncate(path, rows * np.dtype(dtype).itemsize)
+
+  found = np.zeros(len(arrays["row_key"]), dtype=bool)
+  if rows:
+    stored_keys = np.memmap(column_path(root, season, "row_key"), dtype=np.uint64, mode="r", shape=(rows,))
+    order = np.argsort(stored_keys, kind="stable")
+    sorted_keys = stored_keys[order]
+    positions = np.minimum(np.searchsorted(sorted_keys, arrays["row_key"]), rows - 1)
+    found = sorted_keys[positions] == arrays["row_key"]
+    targets = order[positions[found]]
+
+    stale = None
+    if since is not None:
+      game_dates = np.memmap(column_path(root, season, "game_date"), dtype="datetime64[D]", mode="r", shape=(rows,))
+      in_window = (game_dates >= np.datetime64(since)) & (game_dates <= np.datetime64(until))
+      stale = in_window & ~np.isin(stored_keys, arrays["row_key"])
+
+    for column in UPDATED_COLUMNS:
+      values = np.memmap(column_path(root, season, column), dtype=COLUMN_DTYPES[column], mode="r+", shape=(rows,))
+      if len(targets):
+        values[targets] = arrays[column][found]
+      if column == "live" and stale is not None and stale.any():
+        values[stale] = False
+        logging.info(f"{season}: {int(stale.sum())} exported rows no longer stored; marked not live.")
+      values.flush()
+      del values
+
+  appended = ~found
+  for column, dtype in COLUMN_DTYPES.items():
+    with open(column_path(root, season, column), "ab") as file:
+      file.write(np.ascontiguousarray(arrays[column][appended], dtype=dtype).tobytes())
+  return rows + int(appended.sum())
+
+
+def export_snapshot(
+  connection: connection,
+  root: str,
+  start_date: Optional[str] = None,
+  end_date: Optional[str] = None,
+  lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+) -> int:
+  """
+  Bring the snapshot at `root` up to date with PlayerStats and PlayerFeatures through `end_date`
+  (default today). The first export reads everything, a season at a time. Later ones re-read from
+  `start_date` when given (a range just stored, which may be older than the snapshot, as in a
+  backfill), otherwise from `lookback_days` before the newest exported game. Returns the rows read.
+  """
+  with export_lock(root):
+    manifest = read_manifest(root)
+    if manifest["columns"] != COLUMN_DTYPES:
+      raise ValueError(f"Snapshot at {root} was written with different columns; export to a new directory.")
+
+    end = date.fromisoformat(end_date) if end_date else date.today()
+    if manifest["max_game_date"]:
+      newest = date.fromisoformat(manifest["max_game_date"])
+      start = date.fromisoformat(start_date) if start_date else newest - timedelta(days=lookback_days)
+      since = start.isoformat()
+    else:
+      since = None
+      cursor = connection.cursor()
+      cursor.execute("SELECT min(game_date) FROM playerstats;")
+      start = cursor.fetchone()[0]
+      cursor.close()
+      if start is None:
+        return 0
+
+    read = 0
+    season = season_for_date(start)
+    while True:
+      season_start = date(season_years(season)[0], 10, 1)
+      chunk_start = max(start, season_start)
+      chunk_end = min(end, date(season_start.year + 1, 9, 30))
+      if chunk_start > end:
+        break
+
+      df = fetch_snapshot_rows(connection, chunk_start.isoformat(), chunk_end.isoformat())
+      info = manifest["seasons"].setdefault(season, {"rows": 0})
+      if not df.empty or info["rows"]:
+        info["rows"] = merge_season(root, season, info["rows"], snapshot_columns(df), since, chunk_end.isoformat())
+        if not df.empty:
+          newest = str(pd.to_datetime(df["game_date"]).max().date())
+          manifest["max_game_date"] = max(manifest["max_game_date"] or newest, newest)
+      if not info["rows"]:
+        del manifest["seasons"][season]
+      read += len(df)
+      season = season_for_date(date(season_start.year + 1, 10, 1))
+
+    manifest["exported_at"] = datetime.now().isoformat(timespec="seconds")
+    write_manifest(root, manifest)
+    return read
@@ -0,0 +1,286 @@
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from psycopg2.extensions import connection
+from psycopg2.extras import execute_values
+
+from data_pipeline_services.config.common.variables import PLAYER_STATS_DB_COLUMNS
+from data_pipeline_services.metrics import METRICS
+
+ROLLING_WINDOW = 2
+ROLLING_STATS = list(PLAYER_STATS_DB_COLUMNS) + ["PTS_per_FGA"]
+
+
+def rolling_feature_name(stat: str, window: int = ROLLING_WINDOW) -> str:
+  return f"{stat}_{window}game_avg"
+
+
+def feature_db_column(stat: str, window: int = ROLLING_WINDOW) -> str:
+  """
+  PlayerFeatures column holding the rolling average of a stat.
+  """
+  return f"{PLAYER_STATS_DB_COLUMNS.get(stat, stat.lower())}_{window}game_avg"
+
+
+def add_pts_per_fga(df: pd.DataFrame) -> pd.DataFrame:
+  """
+  Add per-game scoring efficiency. Games without a field goal attempt count as 0.
+  """
+  df = df.copy()
+  fga = df["FGA"].astype(float)
+  df["PTS_per_FGA"] = np.where(fga > 0, df["PTS"].astype(float) / fga.where(fga > 0, 1.0), 0.0)
+  return df
+
+
+def calculate_rolling_averages(
+  df: pd.DataFrame, group_col: str = "player_id", date_col: str = "Date", window: int = ROLLING_WINDOW
+) -> pd.DataFrame:
+  """
+  Average of each stat over a player's previous `window` games (the current game is excluded).
+  Rows without `window` prior games get NaN, matching the baseline notebook.
+  """
+  df = add_pts_per_fga(df).sort_values([group_col, date_col])
+  stats = [stat for stat in ROLLING_STATS if stat in df.columns]
+
+  rolling = (
+    df.groupby(group_col)[stats]
+    .rolling(window=window, min_periods=window)
+    .mean()
+    .reset_index(level=0, drop=True)
+  )
+  shifted = rolling.groupby(df[group_col]).shift(1)
+
+  for stat in stats:
+    df[rolling_feature_name(stat, window)] = shifted[stat]
+
+  return df
+
+
+def fetch_recent_player_stats(
+  connection: connection, player_ids: List[int], game_dates: List[str], window: int = ROLLING_WINDOW
+) -> pd.DataFrame:
+  """
+  Fetch each player's last `window` games before the requested date in a single query, each request's
+  games in consecutive rows.
+  """
+  stat_columns = ", ".join(f"ps.{column}" for column in PLAYER_STATS_DB_COLUMNS.values())
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    SELECT r.player_id, r.game_date, {stat_columns}
+    FROM unnest(%s::integer[], %s::date[]) WITH ORDINALITY AS r(player_id, game_date, position)
+    CROSS JOIN LATERAL (
+      SELECT ps.*
+      FROM playerstats ps
+      WHERE ps.player_id = r.player_id AND ps.game_date < r.game_date
+      ORDER BY ps.game_date DESC
+      LIMIT %s
+    ) ps
+    ORDER BY r.position;
+    """,
+    (list(player_ids), list(game_dates), window),
+  )
+  rows = cursor.fetchall()
+  cursor.close()
+
+  columns = ["player_id", "game_date"] + list(PLAYER_STATS_DB_COLUMNS)
+  recent = pd.DataFrame(rows, columns=columns)
+  recent["game_date"] = recent["game_date"].astype(str)
+  return recent
+
+
+def build_slate_features(
+  recent: pd.DataFrame, slate: pd.DataFrame, features: List[str], window: int = ROLLING_WINDOW
+) -> pd.DataFrame:
+  """
+  Turn recent games into one feature row per slate entry, in slate order.
+
+  recent holds each entry's games in consecutive rows, as fetch_recent_player_stats returns them, so the
+  averages are sums over those runs rather than a groupby. slate needs player_id and game_date; optional
+  'home' and 'mp' columns override Home and MP. Without a projected 'mp', MP falls back to the rolling
+  average of minutes.
+  """
+  stats = [stat for stat in PLAYER_STATS_DB_COLUMNS if stat in recent.columns]
+  names = [rolling_feature_name(stat, window) for stat in stats + ["PTS_per_FGA"]]
+
+  values = recent[stats].to_numpy(dtype=float)
+  pts, fga = values[:, stats.index("PTS")], values[:, stats.index("FGA")]
+  pts_per_fga = np.where(fga > 0, pts / np.where(fga > 0, fga, 1.0), 0.0)
+  values = np.column_stack([values, pts_per_fga])
+
+  player_ids = recent["player_id"].to_numpy()
+  game_dates = recent["game_date"].to_numpy()
+  new_run = (player_ids[1:] != player_ids[:-1]) | (game_dates[1:] != game_dates[:-1])
+  starts = np.flatnonzero(np.concatenate([[True], new_run])) if len(recent) else np.array([], dtype=int)
+  averages = np.full((len(starts) + 1, len(names)), np.nan)
+  if len(recent):
+    present = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+    counts = np.add.reduceat(present, starts, axis=0, dtype=int)
+    with np.errstate(invalid="ignore", divide="ignore"):
+      averages[:-1] = sums / counts
+    averages[:-1][np.diff(np.append(starts, len(recent))) < window] = np.nan
+
+  # Entries without recent games point at the trailing all-NaN row
+  run_keys = zip(player_ids[starts].tolist(), game_dates[starts].tolist())
+  runs = {(int(player_id), game_date): run for run, (player_id, game_date) in enumerate(run_keys)}
+  slate_keys = zip(slate["player_id"].tolist(), slate["game_date"].astype(str).tolist())
+  rows = [runs.get((int(player_id), game_date), -1) for player_id, game_date in slate_keys]
+  frame = pd.DataFrame(averages[rows], columns=names)
+
+  mp_average = frame[rolling_feature_name("MP", window)]
+  frame["MP"] = slate["mp"].astype(float).fillna(mp_average).to_numpy() if "mp" in slate else mp_average
+  frame["Home"] = slate["home"].fillna(0).astype(int).to_numpy() if "home" in slate else 0
+
+  return frame.reindex(columns=features)
+
+
+def _stat_rows_frame(rows: list) -> pd.DataFrame:
+  df = pd.DataFrame(rows, columns=["player_id", "game_id", "Date", "Home"] + list(PLAYER_STATS_DB_COLUMNS))
+  df[list(PLAYER_STATS_DB_COLUMNS)] = df[list(PLAYER_STATS_DB_COLUMNS)].astype(float)
+  return df
+
+
+def fetch_games_in_range(connection: connection, start_date: str, end_date: str) -> pd.DataFrame:
+  """
+  Stored player stats for games between start_date and end_date (inclusive).
+  """
+  stat_columns = ", ".join(f"ps.{column}" for column in PLAYER_STATS_DB_COLUMNS.values())
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    SELECT ps.player_id, ps.game_id, ps.game_date, CASE WHEN ps.team = g.home_team THEN 1 ELSE 0 END, {stat_columns}
+    FROM playerstats ps
+    JOIN games g ON g.game_id = ps.game_id
+    WHERE ps.game_date BETWEEN %s AND %s;
+    """,
+    (start_date, end_date),
+  )
+  rows = cursor.fetchall()
+  cursor.close()
+  return _stat_rows_frame(rows)
+
+
+def fetch_player_history(
+  connection: connection, player_ids: List[int], before_date: str, window: int = ROLLING_WINDOW
+) -> pd.DataFrame:
+  """
+  Each player's last `window` stored games before before_date, the history the first rolling averages of a range need.
+  """
+  stat_columns = ", ".join(f"ps.{column}" for column in PLAYER_STATS_DB_COLUMNS.values())
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    SELECT r.player_id, ps.game_id, ps.game_date, CASE WHEN ps.team = ps.home_team THEN 1 ELSE 0 END, {stat_columns}
+    FROM unnest(%s::integer[]) AS r(player_id)
+    CROSS JOIN LATERAL (
+      SELECT ps.*, g.home_team
+      FROM playerstats ps
+      JOIN games g ON g.game_id = ps.game_id
+      WHERE ps.player_id = r.player_id AND ps.game_date < %s
+      ORDER BY ps.game_date DESC
+      LIMIT %s
+    ) ps;
+    """,
+    (list(player_ids), before_date, window),
+  )
+  rows = cursor.fetchall()
+  cursor.close()
+  return _stat_rows_frame(rows)
+
+
+def build_player_features(
+  games: pd.DataFrame, history: pd.DataFrame, window: int = ROLLING_WINDOW
+) -> pd.DataFrame:
+  """
+  One PlayerFeatures row per game in `games`: the rolling averages over each player's previous `window`
+  games, looking back into `history` for the first games of the range.
+  """
+  stat_columns = list(PLAYER_STATS_DB_COLUMNS)
+  columns = ["player_id", "game_id", "Date", "Home"] + stat_columns
+  games = games[columns].assign(in_range=True)
+  history = history[columns].assign(in_range=False)
+  keys = pd.MultiIndex.from_frame(games[["player_id", "game_id"]])
+  history = history[~pd.MultiIndex.from_frame(history[["player_id", "game_id"]]).isin(keys)]
+
+  combined = pd.concat([history, games], ignore_index=True)
+  combined["Date"] = pd.to_datetime(combined["Date"])
+  combined[stat_columns] = combined[stat_columns].astype(float)
+
+  rolled = calculate_rolling_averages(combined, window=window)
+  rolled = rolled[rolled["in_range"]].sort_values(["Date", "player_id"], kind="stable")
+
+  stats = [stat for stat in ROLLING_STATS if stat in rolled.columns]
+  features = pd.DataFrame(
+    {
+      "game_id": rolled["game_id"].to_numpy(),
+      "player_id": rolled["player_id"].astype(int).to_numpy(),
+      "game_date": rolled["Date"].dt.date.to_numpy(),
+      "home": rolled["Home"].astype(int).to_numpy(),
+    }
+  )
+  for stat in stats:
+    features[feature_db_column(stat, window)] = rolled[rolling_feature_name(stat, window)].to_numpy()
+  return features
+
+
+def store_player_features(connection: connection, features: pd.DataFrame) -> int:
+  """
+  Upsert PlayerFeatures rows. Missing averages are stored as NULL.
+  """
+  if features.empty:
+    return 0
+
+  columns = list(features.columns)
+  updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column not in ("game_id", "player_id"))
+  rows = [
+    tuple(None if isinstance(value, float) and np.isnan(value) else value for value in row)
+    for row in features.astype(object).itertuples(index=False, name=None)
+  ]
+
+  started = time.perf_counter()
+  cursor = connection.cursor()
+  execute_values(
+    cursor,
+    f"""
+    INSERT INTO playerfeatures ({", ".join(columns)}) VALUES %s
+    ON CONFLICT (game_id, player_id) DO UPDATE SET {updates};
+    """,
+    rows,
+    page_size=1000,
+  )
+  connection.commit()
+  cursor.close()
+
+  elapsed = time.perf_counter() - started
+  METRICS.observe("db_write_seconds", elapsed, table="playerfeatures")
+  METRICS.inc("db_rows_written_total", len(rows), table="playerfeatures")
+  METRICS.set("db_rows_per_second", len(rows) / elapsed if elapsed > 0 else 0.0, table="playerfeatures")
+  return len(rows)
+
+
+def generate_player_features(
+  connection: connection,
+  start_date: str,
+  end_date: str,
+  games: Optional[pd.DataFrame] = None,
+  window: int = ROLLING_WINDOW,
+) -> int:
+  """
+  Compute and store PlayerFeatures for games between start_date and end_date.
+
+  `games` lets a caller that just processed the range pass its rows in memory; otherwise they are
+  read back from PlayerStats. Either way earlier games come from the database, so both give the same rows.
+  """
+  if games is None:
+    games = fetch_games_in_range(connection, start_date, end_date)
+  if games.empty:
+    return 0
+
+  history = fetch_player_history(connection, games["player_id"].unique().tolist(), start_date, window)
+  return store_player_features(connection, build_player_features(games, history, window))
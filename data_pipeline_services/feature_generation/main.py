@@ -0,0 +1,64 @@
+# Entry point to rolling feature generation for stored player stats
+import logging
+import os
+import sys
+from datetime import date, timedelta
+
+import yaml
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.data_processing.cleaning import connect_db
+from data_pipeline_services.feature_generation.features import generate_player_features
+from data_pipeline_services.metrics import publish_run_metrics
+from data_pipeline_services.migrations.runner import apply_migrations
+from data_pipeline_services.profiling import profiled
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+@profiled("feature_generation")
+def main():
+  connection = None
+  try:
+    yaml_file = config_path("feature_generation", "feature_config.yml")
+
+    with open(yaml_file, "r") as file:
+      config = yaml.safe_load(file)
+
+    job = config["feature_job"]
+    start_date = os.getenv("FEATURE_START_DATE", job["start_date"])
+    end_date = os.getenv("FEATURE_END_DATE", job["end_date"])
+    if not start_date or not end_date:
+      end_date = date.today().isoformat()
+      start_date = (date.today() - timedelta(days=job["lookback_days"])).isoformat()
+
+    connection = connect_db()
+    if not connection:
+      logger.error("Database connection failed. Exiting...")
+      exit(1)
+    apply_migrations(connection)
+
+    stored = generate_player_features(connection, start_date, end_date)
+    logger.info(f"Stored features for {stored} player games between {start_date} and {end_date}")
+
+    # Features are the last thing written for new games, so the local snapshot is appended to here
+    snapshot_dir = os.getenv("SNAPSHOT_DIR")
+    if snapshot_dir:
+      from data_pipeline_services.dataset_export.snapshot import export_snapshot
+
+      exported = export_snapshot(connection, snapshot_dir, start_date, end_date)
+      logger.info(f"Exported {exported} player games to the snapshot at {snapshot_dir}")
+    exit(0)
+
+  except Exception as e:
+    logger.error(f"Error in feature generation: {str(e)}")
+    exit(1)
+  finally:
+    if connection:
+      connection.close()
+    publish_run_metrics("feature_generation")
+
+
+if __name__ == "__main__":
+  main()
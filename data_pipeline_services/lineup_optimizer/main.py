@@ -0,0 +1,60 @@
+# Entry point to the DFS lineup optimization stage
+import logging
+import os
+import sys
+
+import pandas as pd
+import yaml
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.lineup_optimizer.optimizer import merge_projections, optimize_lineups, summarize_lineups
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+def main():
+  try:
+    yaml_file = config_path("lineup_optimizer", "roster_config.yml")
+
+    with open(yaml_file, "r") as file:
+      config = yaml.safe_load(file)
+
+    job = config["optimizer_job"]
+    platform = os.getenv("DFS_PLATFORM", job["platform"])
+    if platform not in config["platforms"]:
+      logger.error(f"No roster configuration for platform '{platform}'. Exiting...")
+      exit(1)
+
+    pool = merge_projections(pd.read_csv(job["salary_file"]), pd.read_csv(job["projections_file"]))
+    if pool.empty:
+      logger.error("No players with both a salary and a projection. Exiting...")
+      exit(1)
+    logger.info(f"Optimizing {job['num_lineups']} {platform} lineups over {len(pool)} players...")
+
+    lineups = optimize_lineups(
+      pool,
+      config["platforms"][platform],
+      job["num_lineups"],
+      job.get("min_unique_players", 1),
+      job.get("max_exposure", 1.0),
+    )
+    if lineups.empty:
+      logger.error("No valid lineup under the roster constraints. Exiting...")
+      exit(1)
+
+    lineups.to_csv(job["output_file"], index=False)
+    summary = summarize_lineups(lineups)
+    logger.info(
+      f"Wrote {len(summary)} lineups to {job['output_file']} "
+      f"(projections {summary['projection'].max():.2f} to {summary['projection'].min():.2f})"
+    )
+    exit(0)
+
+  except Exception as e:
+    logger.error(f"Error in lineup optimization: {str(e)}")
+    exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,264 @@
+import heapq
+import logging
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline_services.data_processing.player_resolution import PlayerResolver, player_keys
+
+# Salary multipliers the Lagrangian bound is evaluated at, as multiples of the one minimizing the root bound
+LAGRANGE_GRID = np.linspace(0, 2, 21)
+# Points per zoom step, and zoom steps, of the search for the root-minimizing multiplier
+LAGRANGE_SEARCH_POINTS = 33
+LAGRANGE_SEARCH_STEPS = 5
+# Search nodes a top_k call may visit before it stops and returns the best lineups found so far
+MAX_SEARCH_NODES = 2_000_000
+
+
+def merge_projections(salaries: pd.DataFrame, projections: pd.DataFrame) -> pd.DataFrame:
+  """
+  Attach model projections to the salary file, by player_id when both sides have it, otherwise by name
+  (exact name key, then fuzzy match; see PlayerResolver). Players without a projection are dropped.
+  """
+  if "player_id" in salaries.columns and "player_id" in projections.columns:
+    pool = salaries.merge(projections[["player_id", "projection"]], on="player_id", how="inner")
+  else:
+    projections = projections.reset_index(drop=True)
+    resolver = PlayerResolver(player_keys(projections["Name"]), projections.index.to_series())
+    rows = salaries["Name"].map(resolver.resolve(salaries["Name"]).set_index("name")["player_id"])
+    pool = salaries.assign(projection=projections["projection"].reindex(rows.to_numpy()).to_numpy())
+
+  pool = pool[pool["projection"].notna()].reset_index(drop=True)
+  pool["Positions"] = pool["Position"].str.split("/")
+  return pool
+
+
+class LineupSearch:
+  """
+  Exact k-best branch-and-bound over roster seats.
+
+  Seats are filled most-restrictive slot first; within a slot type players are picked in
+  increasing index order so the same seating is never enumerated twice. Each node is bounded
+  by a Lagrangian relaxation of the salary cap: for every multiplier lam,
+    lam * remaining_salary + sum over open seats of the best (projection - lam * salary)
+  is an upper bound, and the tightest one over a grid of lam values is used. The grid is centered
+  on the lam minimizing the root's bound, found afresh for every search since exclusions move it.
+  Per-seat sums are precomputed, so bounding all candidates of a node is a single NumPy expression.
+
+  A search stops after `max_nodes` nodes; its lineups are then the best found, not necessarily the best.
+  """
+
+  def __init__(self, pool: pd.DataFrame, platform_config: dict, max_nodes: int = MAX_SEARCH_NODES):
+    slots = platform_config["slots"]
+    self.salary_cap = float(platform_config["salary_cap"])
+    self.projections = pool["projection"].to_numpy(dtype=float)
+    self.salaries = pool["Salary"].to_numpy(dtype=float)
+    _, self.team_codes = np.unique(pool["Team"].to_numpy(), return_inverse=True)
+    self.n_teams = int(self.team_codes.max()) + 1 if len(pool) else 0
+
+    self.eligible = {
+      name: np.flatnonzero([bool(set(slot["positions"]).intersection(positions)) for positions in pool["Positions"]])
+      for name, slot in slots.items()
+    }
+    order = sorted(slots, key=lambda name: len(self.eligible[name]))
+    self.seats = [name for name in order for _ in range(slots[name]["count"])]
+    self.max_per_team = platform_config.get("max_players_per_team", len(self.seats))
+    self.candidates = {
+      name: players[np.argsort(-self.projections[players], kind="stable")] for name, players in self.eligible.items()
+    }
+
+    self.max_nodes = max_nodes
+
+  def _seat_bounds(self, excluded: np.ndarray, lambdas: np.ndarray) -> np.ndarray:
+    """
+    seat_bounds[:, k] is the best relaxed value of seats k.. for each lambda, over players not excluded.
+    """
+    values = self.projections[np.newaxis, :] - lambdas[:, np.newaxis] * self.salaries[np.newaxis, :]
+    seat_bounds = np.zeros((len(lambdas), len(self.seats) + 1))
+
+    for k in range(len(self.seats) - 1, -1, -1):
+      name = self.seats[k]
+      same_type_left = self.seats[k:].count(name)
+      players = self.eligible[name][~excluded[self.eligible[name]]]
+      if len(players) < same_type_left:
+        seat_bounds[:, k] = -np.inf
+        continue
+      ranked = -np.sort(-values[:, players], axis=1)
+      seat_bounds[:, k] = seat_bounds[:, k + 1] + ranked[:, same_type_left - 1]
+
+    return seat_bounds
+
+  def _root_multiplier(self, excluded: np.ndarray) -> float:
+    """
+    The lam minimizing the root bound. The bound is convex in lam, so the upper end of the range is doubled
+    while the bound still falls there, and the range is then narrowed to the neighbours of its best point.
+    """
+
+    def root_bounds(lambdas: np.ndarray) -> np.ndarray:
+      return lambdas * self.salary_cap + self._seat_bounds(excluded, lambdas)[:, 0]
+
+    ratio = self.projections / np.maximum(self.salaries, 1)
+    high = float(max(ratio.max(), 0)) if len(ratio) else 0.0
+    if high == 0:
+      return 0.0
+    for _ in range(30):
+      bounds = root_bounds(np.array([high, 2 * high]))
+      if not bounds[1] < bounds[0]:
+        break
+      high *= 2
+
+    low, high = 0.0, 2 * high
+    for _ in range(LAGRANGE_SEARCH_STEPS):
+      lambdas = np.linspace(low, high, LAGRANGE_SEARCH_POINTS)
+      best = int(np.argmin(root_bounds(lambdas)))
+      low, high = lambdas[max(best - 1, 0)], lambdas[min(best + 1, len(lambdas) - 1)]
+    return float(lambdas[best])
+
+  def top_k(self, k: int, excluded: np.ndarray, skip: Set[FrozenSet[int]]) -> List[Tuple[float, List[int], List[str]]]:
+    """
+    The k highest-projected distinct lineups that avoid `excluded` players and the lineups in `skip`,
+    best first, as (projection, player indices, seat names).
+    """
+    lambdas = LAGRANGE_GRID * self._root_multiplier(excluded)
+    seat_bounds = self._seat_bounds(excluded, lambdas)
+    heap: List[Tuple[float, int, FrozenSet[int], Tuple[int, ...]]] = []
+    found: Dict[FrozenSet[int], None] = {}
+    used = excluded.copy()
+    team_counts = np.zeros(self.n_teams, dtype=int)
+    chosen: List[int] = []
+    counter = [0]
+    nodes = [0]
+
+    def threshold() -> float:
+      return heap[0][0] if len(heap) == k else -np.inf
+
+    def search(seat: int, remaining: float, value: float, previous: int) -> None:
+      nodes[0] += 1
+      if seat == len(self.seats):
+        key = frozenset(chosen)
+        if key in found or key in skip:
+          return
+        counter[0] += 1
+        entry = (value, counter[0], key, tuple(chosen))
+        if len(heap) < k:
+          heapq.heappush(heap, entry)
+        else:
+          _, _, dropped, _ = heapq.heapreplace(heap, entry)
+          del found[dropped]
+        found[key] = None
+        return
+
+      candidates = self.candidates[self.seats[seat]]
+      if seat > 0 and self.seats[seat] == self.seats[seat - 1]:
+        candidates = candidates[candidates > previous]
+      candidates = candidates[(self.salaries[candidates] <= remaining) & ~used[candidates]]
+      if len(candidates) == 0:
+        return
+
+      bounds = value + self.projections[candidates]
+      bounds += np.min(
+        lambdas[:, np.newaxis] * (remaining - self.salaries[candidates])[np.newaxis, :]
+        + seat_bounds[:, seat + 1][:, np.newaxis],
+        axis=0,
+      )
+      best_first = np.argsort(-bounds, kind="stable")
+
+      for player, bound in zip(candidates[best_first], bounds[best_first]):
+        if bound <= threshold() + 1e-9 or nodes[0] >= self.max_nodes:
+          break
+        team = self.team_codes[player]
+        if team_counts[team] >= self.max_per_team:
+          continue
+        used[player] = True
+        team_counts[team] += 1
+        chosen.append(player)
+        search(seat + 1, remaining - self.salaries[player], value + self.projections[player], player)
+        chosen.pop()
+        team_counts[team] -= 1
+        used[player] = False
+
+    search(0, self.salary_cap, 0.0, -1)
+    if nodes[0] >= self.max_nodes:
+      logging.warning(f"Lineup search stopped after {nodes[0]} nodes; its lineups may not be the best ones.")
+
+    lineups = sorted(heap, key=lambda entry: (-entry[0], entry[1]))
+    return [(value, list(players), list(self.seats)) for value, _, _, players in lineups]
+
+
+def optimize_lineups(
+  pool: pd.DataFrame,
+  platform_config: dict,
+  num_lineups: int,
+  min_unique_players: int = 1,
+  max_exposure: float = 1.0,
+  max_nodes: int = MAX_SEARCH_NODES,
+) -> pd.DataFrame:
+  """
+  Pick up to `num_lineups` lineups in projection order under salary, roster, team, exposure
+  and uniqueness constraints. Returns one row per rostered player with lineup_id and Slot.
+
+  Ranked candidates come from LineupSearch; a candidate is accepted if it differs from every
+  accepted lineup by at least `min_unique_players` and keeps all players within
+  `max_exposure`. Players that hit their exposure cap are excluded and the search is re-run
+  when the candidate list runs out. Each search visits at most `max_nodes` nodes.
+  """
+  if pool.empty:
+    return pd.DataFrame()
+
+  search = LineupSearch(pool, platform_config, max_nodes)
+  roster_size = len(search.seats)
+  max_appearances = max(1, int(np.floor(max_exposure * num_lineups)))
+
+  appearances = np.zeros(len(pool), dtype=int)
+  excluded = np.zeros(len(pool), dtype=bool)
+  accepted: List[Tuple[List[int], List[str]]] = []
+  accepted_keys: Set[FrozenSet[int]] = set()
+  batch = num_lineups
+
+  while len(accepted) < num_lineups:
+    batch = max(batch, num_lineups - len(accepted))
+    candidates = search.top_k(batch, excluded, accepted_keys)
+    if not candidates:
+      break
+
+    newly_capped = False
+    for _, players, seats in candidates:
+      if len(accepted) == num_lineups:
+        break
+      if excluded[players].any():
+        continue
+      key = frozenset(players)
+      if any(len(key & other) > roster_size - min_unique_players for other in accepted_keys):
+        continue
+
+      accepted.append((players, seats))
+      accepted_keys.add(key)
+      appearances[players] += 1
+      capped = appearances >= max_appearances
+      newly_capped = newly_capped or bool((capped & ~excluded).any())
+      excluded |= capped
+
+    if newly_capped:
+      batch = num_lineups - len(accepted)
+    elif len(candidates) < batch:
+      break
+    else:
+      batch *= 2
+
+  if len(accepted) < num_lineups:
+    logging.info(f"Only {len(accepted)} of {num_lineups} lineups satisfy the constraints.")
+
+  lineups = [
+    pool.iloc[players].drop(columns="Positions").assign(lineup_id=lineup_id, Slot=seats)
+    for lineup_id, (players, seats) in enumerate(accepted)
+  ]
+  return pd.concat(lineups, ignore_index=True) if lineups else pd.DataFrame()
+
+
+def summarize_lineups(lineups: pd.DataFrame) -> pd.DataFrame:
+  return (
+    lineups.groupby("lineup_id")
+    .agg(salary=("Salary", "sum"), projection=("projection", "sum"), players=("Name", list))
+    .reset_index()
+  )
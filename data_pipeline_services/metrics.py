@@ -0,0 +1,222 @@
+import bisect
+import io
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+METRIC_PREFIX = "nba_pipeline"
+
+# Latency buckets in seconds, from a fast DB batch up to a slow rate-limited fetch
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+  return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+  """
+  Cumulative-bucket histogram in the Prometheus layout. observe() is a bisect and three additions.
+  """
+
+  def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+    self.buckets = buckets
+    self.counts = [0] * (len(buckets) + 1)
+    self.count = 0
+    self.sum = 0.0
+    self.max = 0.0
+
+  def observe(self, value: float) -> None:
+    self.counts[bisect.bisect_left(self.buckets, value)] += 1
+    self.count += 1
+    self.sum += value
+    if value > self.max:
+      self.max = value
+
+  def quantile(self, q: float) -> float:
+    """
+    Upper bound of the bucket holding the q-th observation (max for the overflow bucket).
+    """
+    if not self.count:
+      return 0.0
+    rank = q * self.count
+    seen = 0
+    for bound, count in zip(self.buckets, self.counts):
+      seen += count
+      if seen >= rank:
+        return bound
+    return self.max
+
+
+class MetricsRegistry:
+  """
+  Counters, gauges and histograms for one stage run, keyed by metric name and labels.
+  """
+
+  def __init__(self):
+    self.started_at = datetime.now()
+    self._started = time.perf_counter()
+    self.counters: Dict[Tuple[str, LabelKey], float] = {}
+    self.gauges: Dict[Tuple[str, LabelKey], float] = {}
+    self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+    self._lock = threading.Lock()
+
+  def inc(self, name: str, value: float = 1, **labels: object) -> None:
+    key = (name, _label_key(labels))
+    with self._lock:
+      self.counters[key] = self.counters.get(key, 0) + value
+
+  def set(self, name: str, value: float, **labels: object) -> None:
+    with self._lock:
+      self.gauges[(name, _label_key(labels))] = value
+
+  def observe(self, name: str, value: float, **labels: object) -> None:
+    key = (name, _label_key(labels))
+    with self._lock:
+      histogram = self.histograms.get(key)
+      if histogram is None:
+        histogram = self.histograms[key] = Histogram()
+      histogram.observe(value)
+
+  @contextmanager
+  def timer(self, name: str, **labels: object) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(name, time.perf_counter() - started, **labels)
+
+  def reset(self) -> None:
+    with self._lock:
+      self.counters.clear()
+      self.gauges.clear()
+      self.histograms.clear()
+    self.started_at = datetime.now()
+    self._started = time.perf_counter()
+
+  def to_prometheus(self, stage: str) -> str:
+    """
+    Text exposition format, every series labelled with the stage so several stages can share a textfile directory.
+    """
+
+    def series(name: str, labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+      pairs = (("stage", stage),) + labels + extra
+      rendered = ",".join(f'{key}="{value}"' for key, value in pairs)
+      return f"{METRIC_PREFIX}_{name}{{{rendered}}}"
+
+    lines: List[str] = []
+    with self._lock:
+      for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+        for name in sorted({name for name, _ in metrics}):
+          lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+          lines += [f"{series(name, labels)} {value}" for (metric, labels), value in metrics.items() if metric == name]
+
+      for name in sorted({name for name, _ in self.histograms}):
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} histogram")
+        for (metric, labels), histogram in self.histograms.items():
+          if metric != name:
+            continue
+          cumulative = 0
+          for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{series(name + '_bucket', labels, (('le', le),))} {cumulative}")
+          lines.append(f"{series(name + '_sum', labels)} {histogram.sum}")
+          lines.append(f"{series(name + '_count', labels)} {histogram.count}")
+
+    lines.append(f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge")
+    lines.append(f'{METRIC_PREFIX}_run_duration_seconds{{stage="{stage}"}} {time.perf_counter() - self._started}')
+    return "\n".join(lines) + "\n"
+
+  def summary(self, stage: str) -> dict:
+    with self._lock:
+      return {
+        "stage": stage,
+        "started_at": self.started_at.isoformat(timespec="seconds"),
+        "duration_seconds": round(time.perf_counter() - self._started, 3),
+        "counters": [
+          {"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self.counters.items()
+        ],
+        "gauges": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self.gauges.items()],
+        "histograms": [
+          {
+            "name": name,
+            "labels": dict(labels),
+            "count": histogram.count,
+            "sum": round(histogram.sum, 6),
+            "mean": round(histogram.sum / histogram.count, 6) if histogram.count else 0.0,
+            "p50": histogram.quantile(0.5),
+            "p95": histogram.quantile(0.95),
+            "max": round(histogram.max, 6),
+          }
+          for (name, labels), histogram in self.histograms.items()
+        ],
+      }
+
+
+# Shared by everything running in this process; each stage entry point publishes it once at the end
+METRICS = MetricsRegistry()
+
+
+def write_textfile(stage: str, directory: Optional[str] = None, registry: MetricsRegistry = METRICS) -> Optional[str]:
+  """
+  Write `<directory>/nba_pipeline_<stage>.prom` for the node_exporter textfile collector.
+  The directory defaults to METRICS_TEXTFILE_DIR; nothing is written when neither is set.
+  """
+  directory = directory or os.getenv("METRICS_TEXTFILE_DIR")
+  if not directory:
+    return None
+
+  os.makedirs(directory, exist_ok=True)
+  path = os.path.join(directory, f"{METRIC_PREFIX}_{stage}.prom")
+  tmp_path = f"{path}.tmp"
+  with open(tmp_path, "w") as file:
+    file.write(registry.to_prometheus(stage))
+  os.replace(tmp_path, path)
+  return path
+
+
+def summary_object_name(object_name: str, stage: str) -> str:
+  """
+  Where a stage's run summary goes: next to the object it wrote or read, e.g. x.csv -> x.ingestion.metrics.json.
+  """
+  base, _ = os.path.splitext(object_name)
+  return f"{base}.{stage}.metrics.json"
+
+
+def publish_run_metrics(
+  stage: str,
+  object_name: Optional[str] = None,
+  minio_client=None,
+  bucket_name: Optional[str] = None,
+  registry: MetricsRegistry = METRICS,
+) -> dict:
+  """
+  Write the Prometheus textfile and, given an object and a MinIO client, upload the JSON run summary next to it.
+  Failures are logged rather than raised so instrumentation never fails a run.
+  """
+  summary = registry.summary(stage)
+  try:
+    write_textfile(stage, registry=registry)
+  except OSError as e:
+    logging.warning(f"Could not write metrics textfile: {e}")
+
+  if object_name and minio_client is not None and bucket_name:
+    from data_pipeline_services.minio_operations import upload_to_minio
+
+    try:
+      payload = io.BytesIO(json.dumps(summary, indent=2).encode())
+      upload_to_minio(
+        minio_client, payload, bucket_name, summary_object_name(object_name, stage), content_type="application/json"
+      )
+    except Exception as e:
+      logging.warning(f"Could not upload run summary: {e}")
+
+  return summary
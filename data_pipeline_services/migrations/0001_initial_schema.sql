@@ -0,0 +1,84 @@
+CREATE TABLE IF NOT EXISTS games (
+  game_id VARCHAR PRIMARY KEY,
+  game_date DATE NOT NULL,
+  home_team VARCHAR(3),
+  away_team VARCHAR(3),
+  game_link TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS players (
+  player_id SERIAL PRIMARY KEY,
+  player_name VARCHAR(100) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS playerstats (
+  game_id VARCHAR NOT NULL,
+  player_id INTEGER NOT NULL,
+  team VARCHAR(3) NOT NULL,
+  opponent VARCHAR(3) NOT NULL,
+  mp DOUBLE PRECISION,
+  fg INTEGER,
+  fga INTEGER,
+  fg_percent DOUBLE PRECISION,
+  three_p INTEGER,
+  three_pa INTEGER,
+  three_p_percent DOUBLE PRECISION,
+  ft INTEGER,
+  fta INTEGER,
+  ft_percent DOUBLE PRECISION,
+  orb INTEGER,
+  drb INTEGER,
+  trb INTEGER,
+  ast INTEGER,
+  stl INTEGER,
+  blk INTEGER,
+  tov INTEGER,
+  pf INTEGER,
+  pts INTEGER,
+  gmsc DOUBLE PRECISION,
+  plus_minus INTEGER,
+  fpts_fanduel DOUBLE PRECISION,
+  fpts_draftkings DOUBLE PRECISION,
+  fpts_yahoo DOUBLE PRECISION,
+  PRIMARY KEY (game_id, player_id),
+  FOREIGN KEY (game_id) REFERENCES games(game_id),
+  FOREIGN KEY (player_id) REFERENCES players(player_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_playerstats_player_id ON playerstats (player_id);
+
+CREATE TABLE IF NOT EXISTS playerfeatures (
+  game_id VARCHAR NOT NULL,
+  player_id INTEGER NOT NULL,
+  game_date DATE NOT NULL,
+  home INTEGER,
+  mp_2game_avg DOUBLE PRECISION,
+  fg_2game_avg DOUBLE PRECISION,
+  fga_2game_avg DOUBLE PRECISION,
+  fg_percent_2game_avg DOUBLE PRECISION,
+  three_p_2game_avg DOUBLE PRECISION,
+  three_pa_2game_avg DOUBLE PRECISION,
+  three_p_percent_2game_avg DOUBLE PRECISION,
+  ft_2game_avg DOUBLE PRECISION,
+  fta_2game_avg DOUBLE PRECISION,
+  ft_percent_2game_avg DOUBLE PRECISION,
+  orb_2game_avg DOUBLE PRECISION,
+  drb_2game_avg DOUBLE PRECISION,
+  trb_2game_avg DOUBLE PRECISION,
+  ast_2game_avg DOUBLE PRECISION,
+  stl_2game_avg DOUBLE PRECISION,
+  blk_2game_avg DOUBLE PRECISION,
+  tov_2game_avg DOUBLE PRECISION,
+  pf_2game_avg DOUBLE PRECISION,
+  pts_2game_avg DOUBLE PRECISION,
+  gmsc_2game_avg DOUBLE PRECISION,
+  plus_minus_2game_avg DOUBLE PRECISION,
+  fpts_fanduel_2game_avg DOUBLE PRECISION,
+  fpts_draftkings_2game_avg DOUBLE PRECISION,
+  fpts_yahoo_2game_avg DOUBLE PRECISION,
+  pts_per_fga_2game_avg DOUBLE PRECISION,
+  PRIMARY KEY (game_id, player_id),
+  FOREIGN KEY (game_id, player_id) REFERENCES playerstats(game_id, player_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_playerfeatures_game_date ON playerfeatures (game_date);
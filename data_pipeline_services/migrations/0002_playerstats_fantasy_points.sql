@@ -0,0 +1,34 @@
+-- Fantasy point columns for databases created before processing scored box scores. 0001 only creates
+-- playerstats when it is missing, so on those databases the columns have to be added here, ahead of the
+-- partition copy that reads them.
+
+ALTER TABLE playerstats ADD COLUMN IF NOT EXISTS fpts_fanduel DOUBLE PRECISION;
+ALTER TABLE playerstats ADD COLUMN IF NOT EXISTS fpts_draftkings DOUBLE PRECISION;
+ALTER TABLE playerstats ADD COLUMN IF NOT EXISTS fpts_yahoo DOUBLE PRECISION;
+
+-- Score the rows stored before then from their box-score stats, with the weights and bonuses of
+-- config.common.variables.SCORING_PLATFORMS as data_processing.scoring applies them (missing stats count
+-- as zero). Rows that already have scores are left alone.
+UPDATE playerstats
+SET
+  fpts_fanduel = s.pts + 1.2 * s.trb + 1.5 * s.ast + 3.0 * s.stl + 3.0 * s.blk - 1.0 * s.tov,
+  fpts_draftkings = s.pts + 0.5 * s.three_p + 1.25 * s.trb + 1.5 * s.ast + 2.0 * s.stl + 2.0 * s.blk - 0.5 * s.tov
+    + CASE WHEN s.double_digits >= 2 THEN 1.5 ELSE 0 END + CASE WHEN s.double_digits >= 3 THEN 3.0 ELSE 0 END,
+  fpts_yahoo = s.pts + 0.5 * s.three_p + 1.2 * s.trb + 1.5 * s.ast + 3.0 * s.stl + 3.0 * s.blk - 1.0 * s.tov
+FROM (
+  SELECT
+    game_id,
+    player_id,
+    coalesce(pts, 0) AS pts,
+    coalesce(three_p, 0) AS three_p,
+    coalesce(trb, 0) AS trb,
+    coalesce(ast, 0) AS ast,
+    coalesce(stl, 0) AS stl,
+    coalesce(blk, 0) AS blk,
+    coalesce(tov, 0) AS tov,
+    (coalesce(pts, 0) >= 10)::int + (coalesce(trb, 0) >= 10)::int + (coalesce(ast, 0) >= 10)::int
+      + (coalesce(stl, 0) >= 10)::int + (coalesce(blk, 0) >= 10)::int AS double_digits
+  FROM playerstats
+  WHERE fpts_fanduel IS NULL OR fpts_draftkings IS NULL OR fpts_yahoo IS NULL
+) s
+WHERE playerstats.game_id = s.game_id AND playerstats.player_id = s.player_id;
@@ -0,0 +1,104 @@
+-- Partition playerstats by season on a denormalized game_date, so date-bounded reads only touch the
+-- seasons they need and a player's game log is an index range scan instead of a join through games.
+
+-- Seasons run from October 1 (see data_ingestion.utils.season_for_date)
+CREATE OR REPLACE FUNCTION playerstats_season_start(d DATE) RETURNS DATE AS $$
+  SELECT make_date(
+    CASE WHEN extract(month FROM d) >= 10 THEN extract(year FROM d)::int ELSE extract(year FROM d)::int - 1 END, 10, 1
+  );
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- 'YYYY-YY', the season label used across the pipeline
+CREATE OR REPLACE FUNCTION playerstats_season(d DATE) RETURNS VARCHAR AS $$
+  SELECT extract(year FROM playerstats_season_start(d))::int || '-'
+    || right((extract(year FROM playerstats_season_start(d))::int + 1)::text, 2);
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- Create the partition holding d's season if it doesn't exist yet. Loaders call this before inserting.
+CREATE OR REPLACE FUNCTION ensure_playerstats_partition(d DATE) RETURNS TEXT AS $$
+DECLARE
+  season_start DATE := playerstats_season_start(d);
+  partition_name TEXT := 'playerstats_' || replace(playerstats_season(d), '-', '_');
+BEGIN
+  -- Parallel shard loads may ask for the same season at once
+  PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+  IF to_regclass(partition_name) IS NULL THEN
+    EXECUTE format(
+      'CREATE TABLE %I PARTITION OF playerstats FOR VALUES FROM (%L) TO (%L)',
+      partition_name, season_start, (season_start + INTERVAL '1 year')::date
+    );
+  END IF;
+  RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE playerfeatures DROP CONSTRAINT IF EXISTS playerfeatures_game_id_player_id_fkey;
+ALTER TABLE playerstats RENAME TO playerstats_unpartitioned;
+ALTER INDEX playerstats_pkey RENAME TO playerstats_unpartitioned_pkey;
+DROP INDEX IF EXISTS idx_playerstats_player_id;
+
+-- Unique constraints on a partitioned table must include the partition key; game_id already implies the date
+CREATE TABLE playerstats (
+  game_id VARCHAR NOT NULL,
+  player_id INTEGER NOT NULL,
+  game_date DATE NOT NULL,
+  team VARCHAR(3) NOT NULL,
+  opponent VARCHAR(3) NOT NULL,
+  mp DOUBLE PRECISION,
+  fg INTEGER,
+  fga INTEGER,
+  fg_percent DOUBLE PRECISION,
+  three_p INTEGER,
+  three_pa INTEGER,
+  three_p_percent DOUBLE PRECISION,
+  ft INTEGER,
+  fta INTEGER,
+  ft_percent DOUBLE PRECISION,
+  orb INTEGER,
+  drb INTEGER,
+  trb INTEGER,
+  ast INTEGER,
+  stl INTEGER,
+  blk INTEGER,
+  tov INTEGER,
+  pf INTEGER,
+  pts INTEGER,
+  gmsc DOUBLE PRECISION,
+  plus_minus INTEGER,
+  fpts_fanduel DOUBLE PRECISION,
+  fpts_draftkings DOUBLE PRECISION,
+  fpts_yahoo DOUBLE PRECISION,
+  PRIMARY KEY (game_id, player_id, game_date),
+  FOREIGN KEY (game_id) REFERENCES games(game_id),
+  FOREIGN KEY (player_id) REFERENCES players(player_id)
+) PARTITION BY RANGE (game_date);
+
+SELECT ensure_playerstats_partition(season_start)
+FROM (
+  SELECT DISTINCT playerstats_season_start(g.game_date) AS season_start
+  FROM playerstats_unpartitioned ps
+  JOIN games g ON g.game_id = ps.game_id
+) seasons;
+
+INSERT INTO playerstats (
+  game_id, player_id, game_date, team, opponent, mp, fg, fga, fg_percent, three_p, three_pa,
+  three_p_percent, ft, fta, ft_percent, orb, drb, trb, ast, stl, blk,
+  tov, pf, pts, gmsc, plus_minus, fpts_fanduel, fpts_draftkings, fpts_yahoo
+)
+SELECT
+  ps.game_id, ps.player_id, g.game_date, ps.team, ps.opponent, ps.mp, ps.fg, ps.fga, ps.fg_percent, ps.three_p,
+  ps.three_pa, ps.three_p_percent, ps.ft, ps.fta, ps.ft_percent, ps.orb, ps.drb, ps.trb, ps.ast, ps.stl, ps.blk,
+  ps.tov, ps.pf, ps.pts, ps.gmsc, ps.plus_minus, ps.fpts_fanduel, ps.fpts_draftkings, ps.fpts_yahoo
+FROM playerstats_unpartitioned ps
+JOIN games g ON g.game_id = ps.game_id;
+
+DROP TABLE playerstats_unpartitioned;
+
+-- Built after the copy; each is created on every partition, current and future
+CREATE INDEX idx_playerstats_player_game_date ON playerstats (player_id, game_date);
+CREATE INDEX idx_playerstats_game_date ON playerstats (game_date);
+CREATE INDEX idx_playerstats_team_game_date ON playerstats (team, game_date);
+
+ALTER TABLE playerfeatures
+  ADD CONSTRAINT playerfeatures_playerstats_fkey
+  FOREIGN KEY (game_id, player_id, game_date) REFERENCES playerstats (game_id, player_id, game_date);
@@ -0,0 +1,98 @@
+-- Per-player season totals and last-N-game averages, kept current by data_processing.aggregates after
+-- each load (only the players and seasons a load touched are recomputed).
+
+CREATE TABLE IF NOT EXISTS player_season_totals (
+  player_id INTEGER NOT NULL REFERENCES players(player_id),
+  season VARCHAR(7) NOT NULL,
+  games INTEGER NOT NULL,
+  first_game_date DATE NOT NULL,
+  last_game_date DATE NOT NULL,
+  mp DOUBLE PRECISION,
+  fg DOUBLE PRECISION,
+  fga DOUBLE PRECISION,
+  three_p DOUBLE PRECISION,
+  three_pa DOUBLE PRECISION,
+  ft DOUBLE PRECISION,
+  fta DOUBLE PRECISION,
+  orb DOUBLE PRECISION,
+  drb DOUBLE PRECISION,
+  trb DOUBLE PRECISION,
+  ast DOUBLE PRECISION,
+  stl DOUBLE PRECISION,
+  blk DOUBLE PRECISION,
+  tov DOUBLE PRECISION,
+  pf DOUBLE PRECISION,
+  pts DOUBLE PRECISION,
+  plus_minus DOUBLE PRECISION,
+  fpts_fanduel DOUBLE PRECISION,
+  fpts_draftkings DOUBLE PRECISION,
+  fpts_yahoo DOUBLE PRECISION,
+  updated_at TIMESTAMP NOT NULL DEFAULT now(),
+  PRIMARY KEY (player_id, season)
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_season_totals_season ON player_season_totals (season);
+
+CREATE TABLE IF NOT EXISTS player_rolling_averages (
+  player_id INTEGER NOT NULL REFERENCES players(player_id),
+  window_size INTEGER NOT NULL,
+  games INTEGER NOT NULL,
+  last_game_date DATE NOT NULL,
+  mp DOUBLE PRECISION,
+  fg DOUBLE PRECISION,
+  fga DOUBLE PRECISION,
+  three_p DOUBLE PRECISION,
+  three_pa DOUBLE PRECISION,
+  ft DOUBLE PRECISION,
+  fta DOUBLE PRECISION,
+  orb DOUBLE PRECISION,
+  drb DOUBLE PRECISION,
+  trb DOUBLE PRECISION,
+  ast DOUBLE PRECISION,
+  stl DOUBLE PRECISION,
+  blk DOUBLE PRECISION,
+  tov DOUBLE PRECISION,
+  pf DOUBLE PRECISION,
+  pts DOUBLE PRECISION,
+  plus_minus DOUBLE PRECISION,
+  fpts_fanduel DOUBLE PRECISION,
+  fpts_draftkings DOUBLE PRECISION,
+  fpts_yahoo DOUBLE PRECISION,
+  updated_at TIMESTAMP NOT NULL DEFAULT now(),
+  PRIMARY KEY (player_id, window_size)
+);
+
+-- Fill both tables from the rows already stored
+INSERT INTO player_season_totals (
+  player_id, season, games, first_game_date, last_game_date,
+  mp, fg, fga, three_p, three_pa, ft, fta, orb, drb, trb, ast, stl, blk, tov, pf, pts, plus_minus,
+  fpts_fanduel, fpts_draftkings, fpts_yahoo
+)
+SELECT
+  player_id, playerstats_season(game_date), count(*), min(game_date), max(game_date),
+  sum(mp), sum(fg), sum(fga), sum(three_p), sum(three_pa), sum(ft), sum(fta), sum(orb), sum(drb),
+  sum(trb), sum(ast), sum(stl), sum(blk), sum(tov), sum(pf), sum(pts), sum(plus_minus),
+  sum(fpts_fanduel), sum(fpts_draftkings), sum(fpts_yahoo)
+FROM playerstats
+GROUP BY player_id, playerstats_season(game_date);
+
+INSERT INTO player_rolling_averages (
+  player_id, window_size, games, last_game_date,
+  mp, fg, fga, three_p, three_pa, ft, fta, orb, drb, trb, ast, stl, blk, tov, pf, pts, plus_minus,
+  fpts_fanduel, fpts_draftkings, fpts_yahoo
+)
+SELECT
+  p.player_id, w.window_size, count(*), max(r.game_date),
+  avg(r.mp), avg(r.fg), avg(r.fga), avg(r.three_p), avg(r.three_pa), avg(r.ft), avg(r.fta),
+  avg(r.orb), avg(r.drb), avg(r.trb), avg(r.ast), avg(r.stl), avg(r.blk), avg(r.tov), avg(r.pf),
+  avg(r.pts), avg(r.plus_minus), avg(r.fpts_fanduel), avg(r.fpts_draftkings), avg(r.fpts_yahoo)
+FROM players p
+CROSS JOIN (VALUES (5), (10)) AS w(window_size)
+CROSS JOIN LATERAL (
+  SELECT ps.*
+  FROM playerstats ps
+  WHERE ps.player_id = p.player_id
+  ORDER BY ps.game_date DESC
+  LIMIT w.window_size
+) r
+GROUP BY p.player_id, w.window_size;
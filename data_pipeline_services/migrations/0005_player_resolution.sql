@@ -0,0 +1,16 @@
+-- Player identity resolution: each player's normalized name key (see data_processing.player_resolution)
+-- and every key variant resolved to them. Players stored earlier are keyed on the first resolve_player_ids call.
+ALTER TABLE players ADD COLUMN IF NOT EXISTS name_key TEXT;
+CREATE INDEX IF NOT EXISTS idx_players_name_key ON players (name_key);
+
+-- source is 'canonical' (the player's own key), 'fuzzy' (matched by similarity, with score) or 'manual'.
+-- A key may belong to several players (e.g. a father and son); resolution treats such keys as ambiguous.
+CREATE TABLE IF NOT EXISTS player_aliases (
+  alias_key TEXT NOT NULL,
+  player_id INTEGER NOT NULL REFERENCES players(player_id),
+  source TEXT NOT NULL,
+  score DOUBLE PRECISION,
+  created_at TIMESTAMP NOT NULL DEFAULT now(),
+  PRIMARY KEY (alias_key, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_player_aliases_player_id ON player_aliases (player_id);
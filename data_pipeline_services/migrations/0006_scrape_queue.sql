@@ -0,0 +1,41 @@
+-- Work queue for distributed scraping (see data_ingestion.work_queue). A planner enqueues box score
+-- links; any number of workers claim batches with FOR UPDATE SKIP LOCKED under a lease, so a crashed
+-- worker's links become claimable again once its lease expires.
+CREATE TABLE IF NOT EXISTS scrape_queue (
+  link TEXT PRIMARY KEY,
+  game_date DATE NOT NULL,
+  season VARCHAR(7) NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'in_progress', 'done', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  claimed_by TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  object_name TEXT,
+  last_error TEXT,
+  enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+-- Claims scan only the unfinished links, oldest game first
+CREATE INDEX IF NOT EXISTS idx_scrape_queue_claimable
+  ON scrape_queue (game_date, link) WHERE status IN ('pending', 'in_progress');
+
+-- Raw objects the workers uploaded, until a processing run has loaded them
+CREATE TABLE IF NOT EXISTS scrape_outputs (
+  object_name TEXT PRIMARY KEY,
+  rows INTEGER NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  processed_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_outputs_unprocessed ON scrape_outputs (created_at) WHERE processed_at IS NULL;
+
+-- Token buckets shared by every worker: `tokens` refills at refill_per_second up to capacity, and each
+-- request takes one. The default matches one request every 5 seconds, the single scraper's average pace.
+CREATE TABLE IF NOT EXISTS scrape_rate_limits (
+  name TEXT PRIMARY KEY,
+  tokens DOUBLE PRECISION NOT NULL,
+  capacity DOUBLE PRECISION NOT NULL,
+  refill_per_second DOUBLE PRECISION NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+INSERT INTO scrape_rate_limits (name, tokens, capacity, refill_per_second)
+VALUES ('basketball_reference', 1, 1, 0.2)
+ON CONFLICT (name) DO NOTHING;
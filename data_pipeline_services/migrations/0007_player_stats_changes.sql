@@ -0,0 +1,9 @@
+-- When each player's PlayerStats rows last changed (see data_processing.stats_changes). Caches of values
+-- derived from a player's stats, such as the prediction service's, drop that player's entries when a
+-- load happens. Loads are also announced on the playerstats_changed NOTIFY channel; this table lets a
+-- listener that was down catch up on the loads it missed.
+CREATE TABLE IF NOT EXISTS player_stats_changes (
+  player_id INTEGER PRIMARY KEY REFERENCES players(player_id),
+  changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_player_stats_changes_changed_at ON player_stats_changes (changed_at);
@@ -0,0 +1,107 @@
+# Applies the numbered SQL files in this directory that the database hasn't seen yet:
+#   python -m data_pipeline_services.migrations.runner
+import glob
+import hashlib
+import logging
+import os
+import sys
+from typing import List, Tuple
+
+from psycopg2.extensions import connection
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Held for the whole run so stages starting together (e.g. parallel processing shards) apply each file once
+MIGRATION_LOCK_ID = 7_340_201
+
+
+def available_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+  """
+  (version, name, path) for every NNNN_name.sql file, in version order.
+  """
+  migrations = []
+  for path in glob.glob(os.path.join(directory, "[0-9][0-9][0-9][0-9]_*.sql")):
+    file_name = os.path.basename(path)
+    migrations.append((int(file_name[:4]), file_name[5:-4], path))
+  return sorted(migrations)
+
+
+def apply_migrations(connection: connection, directory: str = MIGRATIONS_DIR) -> List[str]:
+  """
+  Apply pending migrations, each in its own transaction, and record them in schema_migrations.
+  Returns the names applied. A file that changed after being applied is reported but not re-run.
+  """
+  cursor = connection.cursor()
+  cursor.execute(
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      version INTEGER PRIMARY KEY,
+      name TEXT NOT NULL,
+      checksum TEXT NOT NULL,
+      applied_at TIMESTAMP NOT NULL DEFAULT now()
+    );
+    """
+  )
+  connection.commit()
+
+  cursor.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+  applied_names = []
+  try:
+    cursor.execute("SELECT version, checksum FROM schema_migrations;")
+    applied = dict(cursor.fetchall())
+
+    for version, name, path in available_migrations(directory):
+      with open(path, "r") as file:
+        sql = file.read()
+      checksum = hashlib.sha256(sql.encode()).hexdigest()
+
+      if version in applied:
+        if applied[version] != checksum:
+          logger.warning(f"Migration {version:04d}_{name} changed after it was applied; not re-running it.")
+        continue
+
+      logger.info(f"Applying migration {version:04d}_{name}...")
+      try:
+        cursor.execute(sql)
+        cursor.execute(
+          "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s);", (version, name, checksum)
+        )
+        connection.commit()
+      except Exception:
+        connection.rollback()
+        raise
+      applied_names.append(f"{version:04d}_{name}")
+  finally:
+    cursor.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+    connection.commit()
+    cursor.close()
+
+  return applied_names
+
+
+def main():
+  from data_pipeline_services.data_processing.cleaning import connect_db
+
+  connection = None
+  try:
+    connection = connect_db()
+    if not connection:
+      logger.error("Database connection failed. Exiting...")
+      exit(1)
+
+    applied = apply_migrations(connection)
+    logger.info(f"Applied {len(applied)} migration(s): {', '.join(applied)}" if applied else "Schema is up to date.")
+    exit(0)
+
+  except Exception as e:
+    logger.error(f"Error applying migrations: {str(e)}")
+    exit(1)
+  finally:
+    if connection:
+      connection.close()
+
+
+if __name__ == "__main__":
+  main()
@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 
 from minio import Minio
 
+from data_pipeline_services.metrics import METRICS
+
 load_dotenv()
 
 
@@ -24,17 +26,39 @@ def list_objects_in_bucket(minio_client: Minio, bucket_name: str) -> list[str]:
   return [obj.object_name for obj in objects]
 
 
-def download_csv_from_minio(minio_client: Minio, bucket_name: str, object_name: str) -> pd.DataFrame | None:
+def download_bytes_from_minio(minio_client: Minio, bucket_name: str, object_name: str) -> bytes | None:
   try:
-    response = minio_client.get_object(bucket_name, object_name)
-    return pd.read_csv(io.BytesIO(response.read()))
+    with METRICS.timer("minio_transfer_seconds", direction="download"):
+      response = minio_client.get_object(bucket_name, object_name)
+      try:
+        body = response.read()
+      finally:
+        response.close()
+        response.release_conn()
+    METRICS.inc("minio_bytes_total", len(body), direction="download")
+    return body
   except Exception as e:
     print(f"Error downloading {object_name}: {e}")
     return None
 
 
+def download_csv_from_minio(minio_client: Minio, bucket_name: str, object_name: str) -> pd.DataFrame | None:
+  body = download_bytes_from_minio(minio_client, bucket_name, object_name)
+  if body is None:
+    return None
+  try:
+    return pd.read_csv(io.BytesIO(body))
+  except Exception as e:
+    print(f"Error reading {object_name}: {e}")
+    return None
+
+
 def upload_to_minio(
-  minio_client: Minio, data: Union[io.BytesIO, pd.DataFrame], bucket_name: str, object_name: str
+  minio_client: Minio,
+  data: Union[io.BytesIO, pd.DataFrame],
+  bucket_name: str,
+  object_name: str,
+  content_type: str = "text/csv",
 ) -> None:
   try:
     if not minio_client.bucket_exists(bucket_name):
@@ -48,7 +72,9 @@ def upload_to_minio(
       data = csv_buffer
 
     file_size = data.getbuffer().nbytes
-    minio_client.put_object(bucket_name, object_name, data, length=file_size, content_type="text/csv")
+    with METRICS.timer("minio_transfer_seconds", direction="upload"):
+      minio_client.put_object(bucket_name, object_name, data, length=file_size, content_type=content_type)
+    METRICS.inc("minio_bytes_total", file_size, direction="upload")
     print(f"File {object_name} successfully uploaded to bucket {bucket_name}")
   except Exception as e:
     print(f"Failed to upload {object_name}: {str(e)}")
@@ -0,0 +1,93 @@
+# Entry point to the CPU training and time-series cross-validation stage
+import logging
+import os
+import sys
+
+import yaml
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.data_processing.cleaning import connect_db
+from data_pipeline_services.model_training.training import (
+  build_training_frame,
+  check_target,
+  expand_param_grid,
+  load_player_stats,
+  load_player_stats_from_snapshot,
+  materialize_folds,
+  next_version,
+  search_hyperparameters,
+  train_final_model,
+)
+from data_pipeline_services.prediction.model import MODEL_METADATA_PATH
+from data_pipeline_services.prediction.registry import ModelRegistry
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+def main():
+  connection = None
+  try:
+    yaml_file = config_path("model_training", "training_config.yml")
+
+    with open(yaml_file, "r") as file:
+      config = yaml.safe_load(file)
+
+    job = config["training_job"]
+    model_config = config["model"]
+    registry = ModelRegistry(MODEL_METADATA_PATH)
+    features = registry.get().features
+
+    snapshot_dir = os.getenv("TRAINING_SNAPSHOT_DIR", job.get("snapshot_dir"))
+    if snapshot_dir:
+      df = load_player_stats_from_snapshot(snapshot_dir, job["seasons"])
+    else:
+      connection = connect_db()
+      if not connection:
+        logger.error("Database connection failed. Exiting...")
+        exit(1)
+      df = load_player_stats(connection, job["seasons"])
+
+    df = build_training_frame(df, features)
+    if df.empty:
+      logger.error("No training rows available. Exiting...")
+      exit(1)
+    logger.info(f"Built {len(df)} training rows for seasons {job['seasons']}")
+    check_target(df, model_config["objective"])
+
+    x_path, y_path, folds, test_start = materialize_folds(
+      df, features, job["fold_dir"], job["n_folds"], job["test_fraction"]
+    )
+
+    base_params = {"objective": model_config["objective"], "tree_method": model_config["tree_method"]}
+    candidates = expand_param_grid(base_params, model_config["param_grid"])
+    logger.info(f"Searching {len(candidates)} candidates over {len(folds)} walk-forward folds...")
+
+    best_params, cv_rmse = search_hyperparameters(
+      candidates, x_path, y_path, folds, job["workers"], job["threads_per_worker"]
+    )
+    logger.info(f"Best CV RMSE {cv_rmse:.4f} with {best_params}")
+
+    model, metrics = train_final_model(best_params, x_path, y_path, test_start, os.cpu_count() or 1)
+    metrics["cv_rmse"] = cv_rmse
+
+    version = registry.register(
+      model,
+      next_version(list(registry.versions())),
+      features,
+      metrics,
+      hyperparameters=best_params,
+    )
+    logger.info(f"Registered model version {version}: {metrics}")
+    exit(0)
+
+  except Exception as e:
+    logger.error(f"Error in model training: {str(e)}")
+    exit(1)
+  finally:
+    if connection:
+      connection.close()
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,195 @@
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from psycopg2.extensions import connection
+
+from data_pipeline_services.config.common.variables import PLAYER_STATS_DB_COLUMNS
+from data_pipeline_services.feature_generation.features import calculate_rolling_averages
+
+TARGET = "fpts_fanduel"
+# Objectives whose loss is only defined for nonnegative labels; fantasy points go negative through turnovers
+NONNEGATIVE_OBJECTIVES = {"reg:tweedie", "count:poisson", "reg:gamma"}
+
+
+def season_date_range(season: str) -> Tuple[str, str]:
+  """
+  First and last calendar day of an NBA season given as 'YYYY-YY'.
+  """
+  start_year = int(season.split("-")[0])
+  return f"{start_year}-09-01", f"{start_year + 1}-08-31"
+
+
+def load_player_stats(connection: connection, seasons: List[str]) -> pd.DataFrame:
+  """
+  Load PlayerStats with game dates and home flags for the given seasons.
+  """
+  stat_columns = ", ".join(f"ps.{column}" for column in PLAYER_STATS_DB_COLUMNS.values())
+  ranges = [season_date_range(season) for season in seasons]
+  conditions = " OR ".join(["ps.game_date BETWEEN %s AND %s"] * len(ranges))
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    SELECT ps.player_id, ps.game_date, CASE WHEN ps.team = g.home_team THEN 1 ELSE 0 END, {stat_columns}
+    FROM playerstats ps
+    JOIN games g ON g.game_id = ps.game_id
+    WHERE {conditions};
+    """,
+    [bound for date_range in ranges for bound in date_range],
+  )
+  rows = cursor.fetchall()
+  cursor.close()
+
+  df = pd.DataFrame(rows, columns=["player_id", "Date", "Home"] + list(PLAYER_STATS_DB_COLUMNS))
+  df["Date"] = pd.to_datetime(df["Date"])
+  df[list(PLAYER_STATS_DB_COLUMNS)] = df[list(PLAYER_STATS_DB_COLUMNS)].astype(float)
+  return df
+
+
+def load_player_stats_from_snapshot(snapshot_dir: str, seasons: List[str]) -> pd.DataFrame:
+  """
+  load_player_stats from the local memory-mapped snapshot (see dataset_export) instead of the database.
+  """
+  from data_pipeline_services.dataset_export.snapshot import load_snapshot
+
+  db_columns = list(PLAYER_STATS_DB_COLUMNS.values())
+  snapshot = load_snapshot(snapshot_dir, seasons, ["player_id", "game_date", "home"] + db_columns)
+  df = snapshot.rename(columns={db: name for name, db in PLAYER_STATS_DB_COLUMNS.items()})
+  df = df.rename(columns={"game_date": "Date", "home": "Home"})
+  df["Date"] = pd.to_datetime(df["Date"])
+  return df
+
+
+def build_training_frame(df: pd.DataFrame, features: List[str]) -> pd.DataFrame:
+  """
+  Compute the model features, drop rows the features can't be computed for, and sort by date.
+  """
+  df = calculate_rolling_averages(df)
+  df = df.dropna(subset=features + [TARGET])
+  return df.sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def check_target(df: pd.DataFrame, objective: str) -> None:
+  """
+  Raise ValueError if the objective can't be fit to the target, before any fold is trained.
+  """
+  negative = int((df[TARGET] < 0).sum())
+  if objective in NONNEGATIVE_OBJECTIVES and negative:
+    raise ValueError(f"Objective '{objective}' needs nonnegative labels, but {negative} rows have {TARGET} < 0")
+
+
+def materialize_folds(
+  df: pd.DataFrame, features: List[str], fold_dir: str, n_folds: int, test_fraction: float
+) -> Tuple[str, str, List[Tuple[int, int]], int]:
+  """
+  Write X/y once as .npy files and describe every split as row offsets into them.
+
+  Rows are sorted by date, so each walk-forward fold trains on rows [0, train_end) and
+  validates on [train_end, val_end); workers slice the memory-mapped arrays without copying.
+  Returns the X and y paths, the fold offsets and the first row of the held-out test period.
+  """
+  os.makedirs(fold_dir, exist_ok=True)
+  x_path = os.path.join(fold_dir, "X.npy")
+  y_path = os.path.join(fold_dir, "y.npy")
+  np.save(x_path, df[features].to_numpy(dtype=np.float32))
+  np.save(y_path, df[TARGET].to_numpy(dtype=np.float32))
+
+  dates = df["Date"].to_numpy()
+  unique_dates = np.unique(dates)
+  test_start_date = unique_dates[int(len(unique_dates) * (1 - test_fraction))]
+  test_start = int(np.searchsorted(dates, test_start_date))
+
+  # n_folds + 1 blocks of game dates: fold k trains on blocks 0..k and validates on block k + 1
+  train_dates = unique_dates[unique_dates < test_start_date]
+  block_edges = [train_dates[int(len(train_dates) * k / (n_folds + 1))] for k in range(1, n_folds + 1)]
+  offsets = [int(np.searchsorted(dates, edge)) for edge in block_edges] + [test_start]
+  folds = [(offsets[k], offsets[k + 1]) for k in range(n_folds)]
+
+  return x_path, y_path, folds, test_start
+
+
+def _evaluate_fold(task: Tuple[dict, str, str, int, int, int]) -> float:
+  params, x_path, y_path, train_end, val_end, threads = task
+  X = np.load(x_path, mmap_mode="r")
+  y = np.load(y_path, mmap_mode="r")
+
+  model = xgb.XGBRegressor(n_jobs=threads, **params)
+  model.fit(X[:train_end], y[:train_end])
+  predictions = model.predict(X[train_end:val_end])
+  return float(np.sqrt(np.mean((predictions - y[train_end:val_end]) ** 2)))
+
+
+def expand_param_grid(base_params: dict, param_grid: Dict[str, list]) -> List[dict]:
+  names = list(param_grid)
+  return [{**base_params, **dict(zip(names, values))} for values in itertools.product(*param_grid.values())]
+
+
+def search_hyperparameters(
+  candidates: List[dict],
+  x_path: str,
+  y_path: str,
+  folds: List[Tuple[int, int]],
+  workers: int,
+  threads_per_worker: int = 1,
+) -> Tuple[dict, float]:
+  """
+  Score every (candidate, fold) pair across a process pool. Returns the candidate with the lowest mean RMSE.
+  """
+  tasks = [
+    (params, x_path, y_path, train_end, val_end, threads_per_worker)
+    for params in candidates
+    for train_end, val_end in folds
+  ]
+
+  with ProcessPoolExecutor(max_workers=workers or None) as executor:
+    scores = list(executor.map(_evaluate_fold, tasks, chunksize=1))
+
+  fold_scores = np.array(scores).reshape(len(candidates), len(folds))
+  mean_scores = fold_scores.mean(axis=1)
+  for params, score in zip(candidates, mean_scores):
+    logging.info(f"CV RMSE {score:.4f} for {params}")
+
+  best = int(np.argmin(mean_scores))
+  return candidates[best], float(mean_scores[best])
+
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+  errors = y_pred - y_true
+  mse = float(np.mean(errors**2))
+  return {
+    "test_mae": float(np.mean(np.abs(errors))),
+    "test_mse": mse,
+    "test_rmse": float(np.sqrt(mse)),
+    "test_r2": float(1 - np.sum(errors**2) / np.sum((y_true - y_true.mean()) ** 2)),
+  }
+
+
+def train_final_model(
+  params: dict, x_path: str, y_path: str, test_start: int, threads: int
+) -> Tuple[xgb.XGBRegressor, Dict[str, float]]:
+  """
+  Refit the chosen parameters on every pre-test row and evaluate on the held-out period.
+  """
+  X = np.load(x_path, mmap_mode="r")
+  y = np.load(y_path, mmap_mode="r")
+
+  model = xgb.XGBRegressor(n_jobs=threads, **params)
+  model.fit(X[:test_start], y[:test_start])
+  metrics = regression_metrics(np.asarray(y[test_start:]), model.predict(X[test_start:]))
+  return model, metrics
+
+
+def next_version(versions: List[str]) -> str:
+  """
+  Bump the minor part of the highest 'major.minor' version.
+  """
+  if not versions:
+    return "1.0"
+  major, minor = max(tuple(int(part) for part in version.split(".")) for version in versions)
+  return f"{major}.{minor + 1}"
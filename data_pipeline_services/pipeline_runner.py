@@ -0,0 +1,155 @@
+# Single-process pipeline: ingestion, processing and feature generation without intermediate containers
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Optional, Tuple
+
+import pandas as pd
+import yaml
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.data_ingestion.scraper import extract_player_data, get_box_score_links, get_month_links
+from data_pipeline_services.data_ingestion.utils import adjust_dates_based_on_season
+from data_pipeline_services.data_processing.cleaning import connect_db, process_raw_frame
+from data_pipeline_services.feature_generation.features import generate_player_features
+from data_pipeline_services.metrics import publish_run_metrics
+from data_pipeline_services.migrations.runner import apply_migrations
+from data_pipeline_services.profiling import profiled
+
+pd.set_option("future.no_silent_downcasting", True)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+SCRAPING_CONFIG_PATH = config_path("data_ingestion", "scraping_config.yml")
+
+
+def scrape_box_scores(
+  season: str, start_date: str, end_date: str, default_start: str, default_end: str
+) -> Optional[Tuple[pd.DataFrame, str, str]]:
+  """
+  Scrape a season's box scores between MM-DD dates (the season defaults when either is empty).
+  Returns the raw frame with the resolved YYYY-MM-DD range, or None if the schedule couldn't be read.
+  """
+  result = get_month_links(season)
+  if result is None:
+    return None
+
+  month_links, start_year, end_year = result
+  if not start_date or not end_date:
+    start_date, end_date = default_start, default_end
+  start_date, end_date = adjust_dates_based_on_season(start_year, end_year, start_date, end_date)
+
+  box_score_links, all_dates = get_box_score_links(month_links, start_date, end_date, start_year, end_year)
+  if box_score_links is None or all_dates is None:
+    return pd.DataFrame(), start_date, end_date
+
+  return extract_player_data(box_score_links, all_dates), start_date, end_date
+
+
+def persist_raw_frame(df: pd.DataFrame, season: str, start_date: str, end_date: str, output_dir: str) -> str:
+  """
+  Upload the raw frame under the same object name the ingestion container uses.
+  """
+  from data_pipeline_services.minio_operations import get_minio_client, upload_to_minio
+
+  current_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+  object_name = f"{output_dir}/{season}/nba_player_stats_{season}_{start_date}_to_{end_date}_{current_timestamp}.csv"
+  upload_to_minio(get_minio_client(), df, os.getenv("MINIO_BUCKET_NAME"), object_name)
+  return object_name
+
+
+@profiled("backfill")
+def run_pipeline(
+  season: str,
+  start_date: str,
+  end_date: str,
+  default_dates: Tuple[str, str] = ("10-01", "06-30"),
+  persist_raw: bool = False,
+  output_dir: str = "player_box_scores",
+) -> bool:
+  """
+  Run ingestion, processing and feature generation for one season range in this process.
+
+  Frames go straight from the scraper to processing and on to feature generation, so nothing is
+  serialized unless `persist_raw` also archives the raw frame to MinIO (and then the MinIO dedup
+  index is used and updated too). Processing and feature generation are the same functions the
+  containers run, so the database ends up in the same state.
+  """
+  scraped = scrape_box_scores(season, start_date, end_date, *default_dates)
+  if scraped is None:
+    logger.error("Error getting month links.")
+    return False
+
+  raw, start_date, end_date = scraped
+  if raw.empty:
+    logger.error(f"No data extracted for {season} between {start_date} and {end_date}.")
+    return False
+  logger.info(f"Scraped {len(raw)} box score rows for {season} between {start_date} and {end_date}")
+
+  if persist_raw:
+    object_name = persist_raw_frame(raw, season, start_date, end_date, output_dir)
+    logger.info(f"Raw data archived to MinIO as '{object_name}'")
+
+  connection = connect_db()
+  if not connection:
+    logger.error("Database connection failed.")
+    return False
+
+  try:
+    apply_migrations(connection)
+    key_index = None
+    if persist_raw:
+      from data_pipeline_services.data_processing.dedup_index import load_key_index, save_key_index
+      from data_pipeline_services.minio_operations import get_minio_client
+
+      minio_client, bucket_name = get_minio_client(), os.getenv("MINIO_BUCKET_NAME")
+      key_index = load_key_index(minio_client, bucket_name, connection)
+
+    processed = process_raw_frame(raw, connection, key_index)
+    if processed is None:
+      return False
+    logger.info(f"Stored {len(processed)} player stat rows")
+    if key_index is not None:
+      save_key_index(key_index, minio_client, bucket_name)
+
+    stored = generate_player_features(connection, start_date, end_date, games=processed)
+    logger.info(f"Stored features for {stored} player games")
+
+    snapshot_dir = os.getenv("SNAPSHOT_DIR")
+    if snapshot_dir:
+      from data_pipeline_services.dataset_export.snapshot import export_snapshot
+
+      exported = export_snapshot(connection, snapshot_dir, start_date, end_date)
+      logger.info(f"Exported {exported} player games to the snapshot at {snapshot_dir}")
+    return True
+  finally:
+    connection.close()
+
+
+def main():
+  try:
+    with open(SCRAPING_CONFIG_PATH, "r") as file:
+      config = yaml.safe_load(file)
+
+    scraper = config["scraping_job"]
+    success = run_pipeline(
+      os.getenv("SCRAPE_SEASON", scraper["season"]),
+      os.getenv("SCRAPE_START_DATE", scraper["start_date"]),
+      os.getenv("SCRAPE_END_DATE", scraper["end_date"]),
+      (config["default_nba_dates"]["start"], config["default_nba_dates"]["end"]),
+      persist_raw=os.getenv("PERSIST_RAW_TO_MINIO", "false").lower() == "true",
+      output_dir=config["minio"]["output_dir"],
+    )
+    exit(0 if success else 1)
+
+  except Exception as e:
+    logger.error(f"Error in pipeline run: {str(e)}")
+    exit(1)
+  finally:
+    publish_run_metrics("pipeline_runner")
+
+
+if __name__ == "__main__":
+  main()
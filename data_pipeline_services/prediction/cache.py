@@ -0,0 +1,256 @@
+import hashlib
+import json
+import logging
+import os
+import select
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, connection
+
+from data_pipeline_services.data_processing.stats_changes import CHANNEL, parse_notification, players_changed_since
+
+# (model version, player_id, game_date as YYYY-MM-DD, feature fingerprint)
+CacheKey = Tuple[str, int, str, str]
+# Disk entries for games further in the past than this are pruned when the cache opens
+DISK_RETENTION_DAYS = 14
+# synced_at of a cache that has never been synced with the database
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# How far before synced_at a catch-up looks. changed_at is stamped before the loading transaction commits,
+# so a concurrent load can commit a change stamped earlier than one already applied
+CATCH_UP_MARGIN = timedelta(seconds=float(os.getenv("PREDICTION_CACHE_CATCH_UP_MARGIN_SECONDS", "600")))
+
+
+def feature_fingerprint(schema_hash: str, home: Optional[float], mp: Optional[float]) -> str:
+  """
+  Hash of a slate entry's inputs to its feature vector other than stored PlayerStats: the model's feature
+  schema and the entry's 'home' and projected 'mp' overrides. Stored stats are covered by invalidation,
+  so a cache hit needs neither a database read nor feature building.
+  """
+  payload = json.dumps([schema_hash, home, mp])
+  return hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+
+
+class PredictionCache:
+  """
+  Predictions keyed by CacheKey in an in-memory LRU, optionally backed by a SQLite file that survives
+  restarts. Entries are dropped per player when their stats change (see StatsChangeListener), so only
+  predictions for games after the first changed game are recomputed.
+
+  `live` is set while a listener is applying changes as they happen; callers must bypass the cache
+  otherwise, since a stale entry could not be noticed.
+  """
+
+  def __init__(self, capacity: int = 100_000, disk_path: Optional[str] = None):
+    self.capacity = capacity
+    self.hits = self.misses = 0
+    # Bumped by every invalidation; see put_many
+    self.generation = 0
+    self._entries: "OrderedDict[CacheKey, float]" = OrderedDict()
+    self._by_player: Dict[int, Set[CacheKey]] = {}
+    self._lock = threading.Lock()
+    self._disk: Optional[sqlite3.Connection] = None
+    self._synced_at = EPOCH
+    self.live = threading.Event()
+    if disk_path:
+      self._open_disk(disk_path)
+
+  def _open_disk(self, path: str) -> None:
+    self._disk = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    self._disk.execute("PRAGMA journal_mode=WAL;")
+    self._disk.execute(
+      """
+      CREATE TABLE IF NOT EXISTS predictions (
+        version TEXT, player_id INTEGER, game_date TEXT, fingerprint TEXT, prediction REAL,
+        PRIMARY KEY (version, player_id, game_date, fingerprint)
+      );
+      """
+    )
+    self._disk.execute("CREATE TABLE IF NOT EXISTS sync (id INTEGER PRIMARY KEY CHECK (id = 1), synced_at REAL);")
+    cutoff = (date.today() - timedelta(days=DISK_RETENTION_DAYS)).isoformat()
+    self._disk.execute("DELETE FROM predictions WHERE game_date < ?;", (cutoff,))
+    row = self._disk.execute("SELECT synced_at FROM sync;").fetchone()
+    if row:
+      self._synced_at = datetime.fromtimestamp(row[0], timezone.utc)
+
+  @property
+  def synced_at(self) -> datetime:
+    """
+    Database time up to which stats changes have been applied, EPOCH if never.
+    """
+    return self._synced_at
+
+  def mark_synced(self, synced_at: datetime) -> None:
+    with self._lock:
+      if synced_at <= self._synced_at:
+        return
+      self._synced_at = synced_at
+      if self._disk is not None:
+        self._disk.execute("INSERT OR REPLACE INTO sync (id, synced_at) VALUES (1, ?);", (synced_at.timestamp(),))
+
+  def get_many(self, keys: List[CacheKey]) -> List[Optional[float]]:
+    with self._lock:
+      values = []
+      for key in keys:
+        value = self._entries.get(key)
+        if value is None and self._disk is not None:
+          row = self._disk.execute(
+            """
+            SELECT prediction FROM predictions
+            WHERE version = ? AND player_id = ? AND game_date = ? AND fingerprint = ?;
+            """,
+            key,
+          ).fetchone()
+          if row:
+            value = row[0]
+            self._remember(key, value)
+        if value is None:
+          self.misses += 1
+        else:
+          self._entries.move_to_end(key)
+          self.hits += 1
+        values.append(value)
+      return values
+
+  def put_many(self, items: List[Tuple[CacheKey, float]], generation: Optional[int] = None) -> None:
+    """
+    Store predictions. Given the generation read before their inputs were, nothing is stored if an
+    invalidation happened since, as the predictions may have been computed from the replaced stats.
+    """
+    with self._lock:
+      if generation is not None and generation != self.generation:
+        return
+      for key, value in items:
+        self._remember(key, value)
+      if self._disk is not None:
+        self._disk.executemany(
+          "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?);", [(*key, value) for key, value in items]
+        )
+
+  def _remember(self, key: CacheKey, value: float) -> None:
+    self._entries[key] = value
+    self._entries.move_to_end(key)
+    self._by_player.setdefault(key[1], set()).add(key)
+    while len(self._entries) > self.capacity:
+      evicted, _ = self._entries.popitem(last=False)
+      self._forget(evicted)
+
+  def _forget(self, key: CacheKey) -> None:
+    keys = self._by_player.get(key[1])
+    if keys is not None:
+      keys.discard(key)
+      if not keys:
+        del self._by_player[key[1]]
+
+  def invalidate(self, player_id: int, after_date: Optional[str] = None) -> int:
+    """
+    Drop a player's predictions for games after after_date (all of them without one): features only use
+    games before the predicted one. Returns the number of in-memory entries dropped.
+    """
+    with self._lock:
+      self.generation += 1
+      stale = [key for key in self._by_player.get(player_id, ()) if after_date is None or key[2] > after_date]
+      for key in stale:
+        del self._entries[key]
+        self._forget(key)
+      if self._disk is not None:
+        self._disk.execute(
+          "DELETE FROM predictions WHERE player_id = ? AND game_date > ?;", (player_id, after_date or "")
+        )
+      return len(stale)
+
+  def clear(self) -> None:
+    with self._lock:
+      self.generation += 1
+      self._entries.clear()
+      self._by_player.clear()
+      if self._disk is not None:
+        self._disk.execute("DELETE FROM predictions;")
+
+  def stats(self) -> Dict[str, int]:
+    return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class StatsChangeListener:
+  """
+  Background thread that LISTENs for processing's PlayerStats changes and invalidates the cache.
+
+  After every (re)connect it first catches up from player_stats_changes on the players changed since
+  CATCH_UP_MARGIN before the cache's last sync, dropping all their entries, since the notifications sent
+  meanwhile were lost. The cache is live from then until the connection drops.
+  """
+
+  def __init__(self, cache: PredictionCache, connect: Callable[[], connection], poll_seconds: float = 5.0):
+    self.cache = cache
+    self.connect = connect
+    self.poll_seconds = poll_seconds
+    self._thread = threading.Thread(target=self._run, name="stats-change-listener", daemon=True)
+
+  def start(self) -> None:
+    self._thread.start()
+
+  def _run(self) -> None:
+    while True:
+      listen_connection = None
+      try:
+        listen_connection = self.connect()
+        listen_connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = listen_connection.cursor()
+        cursor.execute(f"LISTEN {CHANNEL};")
+        self._catch_up(listen_connection)
+        self.cache.live.set()
+        while True:
+          if select.select([listen_connection], [], [], self.poll_seconds)[0]:
+            listen_connection.poll()
+            while listen_connection.notifies:
+              self._apply(listen_connection.notifies.pop(0).payload)
+      except Exception as e:
+        logging.warning(f"Stats change listener disconnected, reconnecting: {e}")
+      finally:
+        self.cache.live.clear()
+        if listen_connection is not None:
+          listen_connection.close()
+      time.sleep(self.poll_seconds)
+
+  def _catch_up(self, listen_connection: connection) -> None:
+    since = self.cache.synced_at
+    player_ids, now = players_changed_since(listen_connection, since - CATCH_UP_MARGIN)
+    if since == EPOCH:
+      # A persistent tier from an earlier run that never synced can't be checked against the changes
+      self.cache.clear()
+    else:
+      for player_id in player_ids:
+        self.cache.invalidate(player_id)
+      if player_ids:
+        logging.info(f"Invalidated cached predictions of {len(player_ids)} players changed since {since}")
+    self.cache.mark_synced(now)
+
+  def _apply(self, payload: str) -> None:
+    changed_at, players = parse_notification(payload)
+    dropped = sum(self.cache.invalidate(player_id, first_date) for player_id, first_date in players)
+    self.cache.mark_synced(changed_at)
+    logging.debug(f"Stats changed for {len(players)} players; dropped {dropped} cached predictions")
+
+
+def _overrides(slate: pd.DataFrame, column: str) -> list:
+  if column not in slate:
+    return [None] * len(slate)
+  return [None if pd.isna(value) else float(value) for value in slate[column]]
+
+
+def slate_cache_keys(version: str, schema_hash: str, slate: pd.DataFrame) -> List[CacheKey]:
+  """
+  Cache keys of a slate frame's entries (player_id, game_date as YYYY-MM-DD, optional home and mp).
+  """
+  fingerprints = [
+    feature_fingerprint(schema_hash, home, mp) for home, mp in zip(_overrides(slate, "home"), _overrides(slate, "mp"))
+  ]
+  return [
+    (version, int(player_id), game_date, fingerprint)
+    for player_id, game_date, fingerprint in zip(slate["player_id"], slate["game_date"], fingerprints)
+  ]
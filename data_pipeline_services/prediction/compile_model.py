@@ -0,0 +1,27 @@
+# Compiles a registered model version (default: the active one) to memory-mapped NumPy node arrays, which
+# the prediction service then uses for small batches
+import logging
+import os
+import sys
+
+from data_pipeline_services.prediction.model import MODEL_METADATA_PATH
+from data_pipeline_services.prediction.registry import ModelRegistry
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+def main():
+  try:
+    registry = ModelRegistry(MODEL_METADATA_PATH)
+    version = os.getenv("MODEL_VERSION") or registry.active_version
+    compiled_path = registry.compile(version)
+    logger.info(f"Compiled model version {version} to {compiled_path}")
+    exit(0)
+  except Exception as e:
+    logger.error(f"Error compiling the model: {str(e)}")
+    exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,166 @@
+import json
+import os
+from typing import Dict
+
+import numpy as np
+import xgboost as xgb
+
+# Node arrays written by save_compiled, one .npy file each so they load memory-mapped
+NODE_ARRAYS = ["features", "thresholds", "left", "right", "default_left", "values"]
+COMPILED_META = "meta.json"
+# Inverse links from the summed margin to a prediction, by XGBoost objective
+OUTPUT_TRANSFORMS = {
+  "reg:squarederror": "identity",
+  "reg:absoluteerror": "identity",
+  "reg:pseudohubererror": "identity",
+  "reg:tweedie": "exp",
+  "count:poisson": "exp",
+  "reg:gamma": "exp",
+  "binary:logistic": "sigmoid",
+}
+
+
+class CompiledEnsemble:
+  """
+  A single-output tree ensemble as flat node arrays, evaluated for a whole batch with NumPy.
+
+  Nodes of every tree are concatenated; leaves point both children at themselves, so after max_depth
+  steps of "go to the chosen child" every (row, tree) pair sits on its leaf without any per-tree branching.
+  Splits follow XGBoost: a value below the threshold goes left, a missing one goes the default way.
+  """
+
+  def __init__(self, arrays: Dict[str, np.ndarray], meta: dict):
+    self.features = arrays["features"]
+    self.thresholds = arrays["thresholds"]
+    self.left = arrays["left"]
+    self.right = arrays["right"]
+    self.default_left = arrays["default_left"]
+    self.values = arrays["values"]
+    self.roots = np.asarray(meta["roots"], dtype=np.int32)
+    self.max_depth = int(meta["max_depth"])
+    self.num_feature = int(meta["num_feature"])
+    self.base_margin = np.float32(meta["base_margin"])
+    self.transform = meta["transform"]
+    self.meta = meta
+
+  def predict_margin(self, X: np.ndarray) -> np.ndarray:
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    cells = X.ravel()
+    row_offsets = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+    nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+    for _ in range(self.max_depth):
+      values = cells[row_offsets + self.features[nodes]]
+      go_left = np.where(np.isnan(values), self.default_left[nodes], values < self.thresholds[nodes])
+      nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+    return self.values[nodes].sum(axis=1, dtype=np.float32) + self.base_margin
+
+  def predict(self, X: np.ndarray) -> np.ndarray:
+    margin = self.predict_margin(X)
+    if self.transform == "exp":
+      return np.exp(margin)
+    if self.transform == "sigmoid":
+      return 1 / (1 + np.exp(-margin))
+    return margin
+
+
+def _base_margin(base_score: float, transform: str) -> float:
+  if transform == "exp":
+    return float(np.log(base_score))
+  if transform == "sigmoid":
+    return float(np.log(base_score / (1 - base_score)))
+  return base_score
+
+
+def compile_booster(booster: xgb.Booster) -> CompiledEnsemble:
+  """
+  Flatten a gbtree booster's JSON dump into node arrays. Raises ValueError for models the evaluator
+  can't reproduce: other boosters, multi-output or categorical splits, objectives without a known link.
+  """
+  model = json.loads(booster.save_raw("json").decode())["learner"]
+  objective = model["objective"]["name"]
+  learner_params = model["learner_model_param"]
+  booster_model = model["gradient_booster"]
+  if booster_model["name"] != "gbtree":
+    raise ValueError(f"Only gbtree models can be compiled, not {booster_model['name']}")
+  if objective not in OUTPUT_TRANSFORMS:
+    raise ValueError(f"No output transform for objective '{objective}'")
+  if int(learner_params.get("num_class", 0)) > 1 or int(learner_params.get("num_target", 1)) > 1:
+    raise ValueError("Only single-output models can be compiled")
+
+  columns: Dict[str, list] = {name: [] for name in NODE_ARRAYS}
+  roots, max_depth, offset = [], 0, 0
+  for tree in booster_model["model"]["trees"]:
+    if any(tree["split_type"]):
+      raise ValueError("Categorical splits can't be compiled")
+    left = np.asarray(tree["left_children"], dtype=np.int64)
+    right = np.asarray(tree["right_children"], dtype=np.int64)
+    node_ids = np.arange(len(left))
+    leaf = left == -1
+
+    level, depth = np.array([0]), 0
+    while True:
+      level = level[~leaf[level]]
+      if not len(level):
+        break
+      level, depth = np.concatenate([left[level], right[level]]), depth + 1
+    max_depth = max(max_depth, depth)
+
+    columns["features"].append(np.where(leaf, 0, tree["split_indices"]))
+    columns["thresholds"].append(np.asarray(tree["split_conditions"], dtype=np.float32))
+    columns["left"].append(np.where(leaf, node_ids, left) + offset)
+    columns["right"].append(np.where(leaf, node_ids, right) + offset)
+    columns["default_left"].append(np.asarray(tree["default_left"], dtype=bool))
+    columns["values"].append(np.where(leaf, tree["split_conditions"], 0.0))
+    roots.append(offset)
+    offset += len(left)
+
+  dtypes = {"features": np.int32, "thresholds": np.float32, "left": np.int32, "right": np.int32,
+            "default_left": bool, "values": np.float32}  # fmt: skip
+  arrays = {name: np.concatenate(parts).astype(dtypes[name]) for name, parts in columns.items()}
+  transform = OUTPUT_TRANSFORMS[objective]
+  meta = {
+    "objective": objective,
+    "transform": transform,
+    "base_margin": _base_margin(float(learner_params["base_score"]), transform),
+    "num_feature": int(learner_params["num_feature"]),
+    "max_depth": max_depth,
+    "roots": roots,
+  }
+  return CompiledEnsemble(arrays, meta)
+
+
+def save_compiled(ensemble: CompiledEnsemble, directory: str) -> None:
+  os.makedirs(directory, exist_ok=True)
+  for name in NODE_ARRAYS:
+    np.save(os.path.join(directory, f"{name}.npy"), getattr(ensemble, name))
+  with open(os.path.join(directory, COMPILED_META), "w") as file:
+    json.dump(ensemble.meta, file, indent=2)
+
+
+def load_compiled(directory: str) -> CompiledEnsemble:
+  """
+  Load a compiled ensemble with its node arrays memory-mapped, so every worker process shares their pages.
+  """
+  with open(os.path.join(directory, COMPILED_META), "r") as file:
+    meta = json.load(file)
+  arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in NODE_ARRAYS}
+  return CompiledEnsemble(arrays, meta)
+
+
+def verify_compiled(ensemble: CompiledEnsemble, booster: xgb.Booster, rows: int = 2048, seed: int = 0) -> float:
+  """
+  Largest relative difference between the compiled and XGBoost margins on random rows, 10% of them missing.
+  Inputs are drawn around the split thresholds so that both sides of every split are exercised.
+  """
+  rng = np.random.default_rng(seed)
+  split = ensemble.left != np.arange(len(ensemble.left))
+  X = np.zeros((rows, ensemble.num_feature), dtype=np.float32)
+  for feature in range(ensemble.num_feature):
+    thresholds = ensemble.thresholds[split & (ensemble.features == feature)]
+    if len(thresholds):
+      X[:, feature] = rng.choice(thresholds, rows) + rng.normal(0, 1e-3 + thresholds.std(), rows)
+  X[rng.random(X.shape) < 0.1] = np.nan
+
+  expected = booster.inplace_predict(X, predict_type="margin", validate_features=False)
+  actual = ensemble.predict_margin(X)
+  return float(np.max(np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0)))
@@ -0,0 +1,47 @@
+# Entry point to the warm batch-prediction service
+import logging
+import os
+import sys
+
+from data_pipeline_services.prediction.cache import PredictionCache, StatsChangeListener
+from data_pipeline_services.prediction.model import MODEL_METADATA_PATH
+from data_pipeline_services.prediction.registry import ModelRegistry
+from data_pipeline_services.prediction.service import (
+  MicroBatcher,
+  PredictionService,
+  get_connection_pool,
+  get_listen_connection,
+  serve,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+
+def main():
+  try:
+    registry = ModelRegistry(MODEL_METADATA_PATH)
+    model = registry.get()
+    logger.info(f"Loaded model version {model.version} with {len(model.features)} features")
+
+    batcher = MicroBatcher(
+      registry,
+      max_batch_rows=int(os.getenv("PREDICTION_MAX_BATCH_ROWS", "4096")),
+      max_wait_ms=float(os.getenv("PREDICTION_MAX_WAIT_MS", "2")),
+    )
+    # Cached predictions are dropped as processing loads new stats; PREDICTION_CACHE_SIZE=0 disables the cache
+    cache = None
+    cache_size = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+    if cache_size > 0:
+      cache = PredictionCache(cache_size, os.getenv("PREDICTION_CACHE_PATH"))
+      StatsChangeListener(cache, get_listen_connection).start()
+    service = PredictionService(registry, get_connection_pool(), batcher, cache)
+
+    serve(service, os.getenv("PREDICTION_HOST", "0.0.0.0"), int(os.getenv("PREDICTION_PORT", "8000")))
+  except Exception as e:
+    logger.error(f"Error in prediction service: {str(e)}")
+    exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,18 @@
+import os
+
+import yaml
+
+MODEL_METADATA_PATH = os.getenv("MODEL_METADATA_PATH", "/app/config/model_metadata.yaml")
+
+
+def load_model_metadata(metadata_path: str = MODEL_METADATA_PATH) -> dict:
+  with open(metadata_path, "r") as file:
+    return yaml.safe_load(file)
+
+
+def resolve_model_path(metadata: dict, metadata_path: str = MODEL_METADATA_PATH) -> str:
+  """
+  Model paths in the metadata are relative to the metadata file.
+  """
+  return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(metadata_path)), metadata["file_path"]))
+
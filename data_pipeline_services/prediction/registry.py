@@ -0,0 +1,262 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import xgboost as xgb
+import yaml
+
+from data_pipeline_services.prediction.compiled import (
+  CompiledEnsemble,
+  compile_booster,
+  load_compiled,
+  save_compiled,
+  verify_compiled,
+)
+from data_pipeline_services.prediction.model import MODEL_METADATA_PATH, load_model_metadata, resolve_model_path
+
+NATIVE_FORMATS = ("ubj", "json")
+# Batches up to this many rows are scored by the compiled NumPy ensemble, when a version has one; above it
+# the booster's per-call overhead is amortized and its native traversal is faster
+COMPILED_MAX_ROWS = int(os.getenv("PREDICTION_COMPILED_MAX_ROWS", "32"))
+# Largest relative margin difference from the booster a compiled ensemble may show before it is rejected
+COMPILED_TOLERANCE = 1e-4
+# Registry state lives next to the metadata file, which stays hand-written
+REGISTRY_FILE_NAME = "model_registry.yaml"
+REGISTRY_HEADER = "# Written by prediction.registry.ModelRegistry; describe models in model_metadata.yaml instead.\n"
+
+
+def feature_schema_hash(features: List[str]) -> str:
+  """
+  Hash of the ordered feature list a model version expects.
+  """
+  return hashlib.sha256(json.dumps([feature.strip() for feature in features]).encode()).hexdigest()
+
+
+class RegisteredModel:
+  """
+  A loaded model version. Predictions go straight to the booster, skipping the sklearn wrapper, or for
+  small batches to the version's compiled ensemble if it has one.
+  """
+
+  def __init__(
+    self, version: str, booster: xgb.Booster, features: List[str], compiled: Optional[CompiledEnsemble] = None
+  ):
+    self.version = version
+    self.booster = booster
+    self.features = features
+    self.compiled = compiled
+
+  def predict(self, features: np.ndarray) -> np.ndarray:
+    if self.compiled is not None and len(features) <= COMPILED_MAX_ROWS:
+      return self.compiled.predict(features)
+    return self.booster.inplace_predict(features, validate_features=False)
+
+
+class ModelRegistry:
+  """
+  Model versions tracked in model_registry.yaml, a machine-owned file next to the hand-written
+  model_metadata.yaml, which the registry only reads. Without a registry file, the metadata's model is
+  a single legacy joblib version until something is registered or activated.
+
+  Versions load lazily on first use and stay cached in-process; the registry file is re-read
+  whenever it changes on disk, so activating or rolling back a version takes effect without a restart.
+  """
+
+  def __init__(self, metadata_path: str = MODEL_METADATA_PATH, registry_path: Optional[str] = None):
+    self.metadata_path = metadata_path
+    config_dir = os.path.dirname(os.path.abspath(metadata_path))
+    self.registry_path = registry_path or os.path.join(config_dir, REGISTRY_FILE_NAME)
+    self.models_dir = os.path.join(config_dir, "..", "models")
+    self._state: Dict[str, Any] = {}
+    self._mtime = None
+    self._cache: Dict[str, RegisteredModel] = {}
+    self._lock = threading.RLock()
+
+  @property
+  def state(self) -> Dict[str, Any]:
+    """
+    The registry: active_version, versions by name and the activation history.
+    """
+    with self._lock:
+      if not os.path.exists(self.registry_path):
+        if self._mtime is not None or not self._state:
+          self._state = self._legacy_registry(load_model_metadata(self.metadata_path))
+          self._mtime = None
+        return self._state
+
+      mtime = os.path.getmtime(self.registry_path)
+      if mtime != self._mtime:
+        with open(self.registry_path, "r") as file:
+          self._state = yaml.safe_load(file)
+        self._mtime = mtime
+      return self._state
+
+  @property
+  def active_version(self) -> str:
+    return str(self.state["active_version"])
+
+  def versions(self) -> Dict[str, dict]:
+    return self.state["versions"]
+
+  def get(self, version: Optional[str] = None) -> RegisteredModel:
+    version = str(version or self.active_version)
+    with self._lock:
+      if version not in self._cache:
+        self._cache[version] = self._load(version)
+      return self._cache[version]
+
+  def register(
+    self,
+    model: Any,
+    version: str,
+    features: List[str],
+    metrics: Optional[Dict[str, float]] = None,
+    model_format: str = "ubj",
+    activate: bool = True,
+    save_date: Optional[str] = None,
+    hyperparameters: Optional[Dict[str, Any]] = None,
+  ) -> str:
+    """
+    Save a booster (or sklearn XGBModel) in XGBoost's native format and record it as a new version.
+    """
+    if model_format not in NATIVE_FORMATS:
+      raise ValueError(f"Unsupported model format '{model_format}'. Expected one of {NATIVE_FORMATS}.")
+
+    version = str(version)
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    file_name = f"xgboost_fantasy_points_{version}.{model_format}"
+    booster.save_model(os.path.join(self.models_dir, file_name))
+    try:
+      compiled_path = self._save_compiled(booster, version)
+    except ValueError as e:
+      logging.warning(f"Model version {version} will be scored by XGBoost only: {e}")
+      compiled_path = None
+
+    with self._lock:
+      state = self.state
+      state["versions"][version] = {
+        "file_path": f"../models/{file_name}",
+        "format": model_format,
+        "features": [feature.strip() for feature in features],
+        "feature_schema_hash": feature_schema_hash(features),
+        "save_date": save_date or date.today().isoformat(),
+        "performance_metrics": {name: float(value) for name, value in (metrics or {}).items()},
+      }
+      if hyperparameters:
+        state["versions"][version]["hyperparameters"] = dict(hyperparameters)
+      if compiled_path:
+        state["versions"][version]["compiled_path"] = compiled_path
+      if activate:
+        self._activate(state, version)
+      self._write(state)
+
+    return version
+
+  def compile(self, version: Optional[str] = None) -> str:
+    """
+    Compile a registered version (default: active) to NumPy node arrays and record them. Returns their
+    directory relative to the registry file.
+    """
+    model = self.get(version)
+    compiled_path = self._save_compiled(model.booster, model.version)
+    with self._lock:
+      state = self.state
+      state["versions"][model.version]["compiled_path"] = compiled_path
+      self._write(state)
+      self._cache.pop(model.version, None)
+    return compiled_path
+
+  def _save_compiled(self, booster: xgb.Booster, version: str) -> str:
+    compiled = compile_booster(booster)
+    difference = verify_compiled(compiled, booster)
+    if difference > COMPILED_TOLERANCE:
+      raise ValueError(f"Compiled predictions differ from XGBoost's by {difference:.2e}")
+    directory_name = f"xgboost_fantasy_points_{version}.compiled"
+    save_compiled(compiled, os.path.join(self.models_dir, directory_name))
+    return f"../models/{directory_name}"
+
+  def activate(self, version: str) -> None:
+    with self._lock:
+      state = self.state
+      if str(version) not in state["versions"]:
+        raise KeyError(f"Unknown model version '{version}'")
+      self._activate(state, str(version))
+      self._write(state)
+
+  def rollback(self) -> str:
+    """
+    Re-activate the version that was active before the current one.
+    """
+    with self._lock:
+      state = self.state
+      history = state.get("history", [])
+      if not history:
+        raise ValueError("No previous model version to roll back to.")
+      previous = history.pop()
+      state["active_version"] = previous
+      self._write(state)
+      return previous
+
+  @staticmethod
+  def _activate(state: dict, version: str) -> None:
+    if state.get("active_version") and str(state["active_version"]) != version:
+      state.setdefault("history", []).append(str(state["active_version"]))
+    state["active_version"] = version
+
+  def _load(self, version: str) -> RegisteredModel:
+    entry = self.versions().get(version)
+    if entry is None:
+      raise KeyError(f"Unknown model version '{version}'")
+
+    features = [feature.strip() for feature in entry["features"]]
+    if entry.get("feature_schema_hash") and entry["feature_schema_hash"] != feature_schema_hash(features):
+      raise ValueError(f"Feature schema hash mismatch for model version '{version}'")
+
+    path = resolve_model_path(entry, self.registry_path)
+    if entry.get("format", "joblib") in NATIVE_FORMATS:
+      booster = xgb.Booster()
+      booster.load_model(path)
+    else:
+      import joblib
+
+      booster = joblib.load(path).get_booster()
+
+    compiled = None
+    if entry.get("compiled_path"):
+      compiled = load_compiled(resolve_model_path({"file_path": entry["compiled_path"]}, self.registry_path))
+
+    return RegisteredModel(version, booster, features, compiled)
+
+  def _write(self, state: dict) -> None:
+    tmp_path = f"{self.registry_path}.tmp"
+    with open(tmp_path, "w") as file:
+      file.write(REGISTRY_HEADER)
+      yaml.safe_dump(state, file, sort_keys=False)
+    os.replace(tmp_path, self.registry_path)
+    self._mtime = os.path.getmtime(self.registry_path)
+
+  @staticmethod
+  def _legacy_registry(metadata: dict) -> dict:
+    """
+    Treat the metadata's model as a single joblib version, for configs without a registry file.
+    """
+    version = str(metadata.get("model_info", {}).get("version", "1.0"))
+    features = [feature.strip() for feature in metadata.get("features", [])]
+    return {
+      "active_version": version,
+      "versions": {
+        version: {
+          "file_path": metadata["file_path"],
+          "format": "joblib",
+          "features": features,
+          "feature_schema_hash": feature_schema_hash(features),
+          "save_date": metadata.get("model_info", {}).get("save_date"),
+          "performance_metrics": metadata.get("performance_metrics", {}),
+        }
+      },
+    }
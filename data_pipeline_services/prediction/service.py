@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+import psycopg2
+from psycopg2.extensions import connection
+from psycopg2.pool import ThreadedConnectionPool
+
+from data_pipeline_services.feature_generation.features import build_slate_features, fetch_recent_player_stats
+from data_pipeline_services.prediction import simulation
+from data_pipeline_services.prediction.cache import PredictionCache, slate_cache_keys
+from data_pipeline_services.prediction.registry import ModelRegistry, feature_schema_hash
+
+load_dotenv()
+
+
+class MicroBatcher:
+  """
+  Collects feature matrices from concurrent requests and scores them with one `predict` call per model version.
+  A lone request is scored as soon as it is taken off the queue. Only once other requests have joined a
+  batch does it wait for more, until it reaches `max_batch_rows` or is `max_wait_ms` old. Requests that
+  arrive while a batch is being scored queue up and form the next one.
+  """
+
+  def __init__(self, registry: ModelRegistry, max_batch_rows: int = 4096, max_wait_ms: float = 2.0):
+    self.registry = registry
+    self.max_batch_rows = max_batch_rows
+    self.max_wait = max_wait_ms / 1000
+    self._queue: "queue.Queue[Tuple[np.ndarray, str, Future]]" = queue.Queue()
+    self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+    self._thread.start()
+
+  def predict(self, features: np.ndarray, version: str) -> np.ndarray:
+    future: Future = Future()
+    self._queue.put((features, version, future))
+    return future.result()
+
+  def _run(self) -> None:
+    while True:
+      batch = [self._queue.get()]
+      rows = len(batch[0][0])
+      deadline = time.perf_counter() + self.max_wait
+
+      while rows < self.max_batch_rows:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+          break
+        try:
+          # Wait only while requests are arriving, i.e. once the batch holds more than its first one
+          item = self._queue.get(timeout=remaining) if len(batch) > 1 else self._queue.get_nowait()
+        except queue.Empty:
+          break
+        batch.append(item)
+        rows += len(item[0])
+
+      by_version: Dict[str, List[Tuple[np.ndarray, Future]]] = {}
+      for features, version, future in batch:
+        by_version.setdefault(version, []).append((features, future))
+      for version, items in by_version.items():
+        self._score(version, items)
+
+  def _score(self, version: str, batch: List[Tuple[np.ndarray, Future]]) -> None:
+    try:
+      predictions = self.registry.get(version).predict(np.vstack([features for features, _ in batch]))
+    except Exception as e:
+      for _, future in batch:
+        future.set_exception(e)
+      return
+
+    offset = 0
+    for features, future in batch:
+      future.set_result(predictions[offset : offset + len(features)])
+      offset += len(features)
+
+
+class PredictionService:
+  """
+  Keeps models and a database connection pool warm between slate requests, and optionally a cache of
+  predictions that is used while it is live (see PredictionCache).
+  """
+
+  def __init__(
+    self,
+    registry: ModelRegistry,
+    pool: ThreadedConnectionPool,
+    batcher: MicroBatcher,
+    cache: Optional[PredictionCache] = None,
+  ):
+    self.registry = registry
+    self.pool = pool
+    self.batcher = batcher
+    self.cache = cache
+
+  def predict_slate(self, players: List[dict], version: Optional[str] = None) -> List[dict]:
+    """
+    Score a slate of {"player_id", "game_date"[, "home", "mp"]} entries with the given (default: active) model version.
+    """
+    if not players:
+      return []
+
+    model = self.registry.get(version)
+
+    slate = pd.DataFrame(players)
+    slate["game_date"] = pd.to_datetime(slate["game_date"]).dt.strftime("%Y-%m-%d")
+    predictions = np.full(len(slate), np.nan)
+
+    # Cached entries need neither their recent stats nor the model
+    use_cache = self.cache is not None and self.cache.live.is_set()
+    if use_cache:
+      generation = self.cache.generation
+      keys = slate_cache_keys(model.version, feature_schema_hash(model.features), slate)
+      predictions = np.array([np.nan if value is None else value for value in self.cache.get_many(keys)])
+
+    missing = np.flatnonzero(np.isnan(predictions))
+    if len(missing):
+      pending = slate.iloc[missing].reset_index(drop=True)
+      connection = self.pool.getconn()
+      try:
+        recent = fetch_recent_player_stats(connection, pending["player_id"].tolist(), pending["game_date"].tolist())
+      finally:
+        self.pool.putconn(connection)
+
+      features = build_slate_features(recent, pending, model.features)
+      predictions[missing] = self.batcher.predict(features.to_numpy(dtype=np.float32), model.version)
+      if use_cache:
+        self.cache.put_many([(keys[row], float(predictions[row])) for row in missing], generation)
+
+    return [
+      {"player_id": int(player_id), "game_date": game_date, "prediction": float(prediction)}
+      for player_id, game_date, prediction in zip(slate["player_id"], slate["game_date"], predictions)
+    ]
+
+  def simulate_slate(
+    self, players: List[dict], version: Optional[str] = None, simulations: int = 10_000, seed: Optional[int] = None
+  ) -> List[dict]:
+    """
+    Fantasy point distributions for a slate: predict_slate entries plus the simulation summary (see
+    simulation.summarize_simulations). Entries may add 'team' and 'opponent' (default: the player's latest
+    team, no opponent) and 'salary', which sets the boom / bust thresholds.
+    """
+    predictions = self.predict_slate(players, version)
+    if not predictions:
+      return []
+
+    model = self.registry.get(version)
+    slate = pd.DataFrame(players).reindex(columns=["player_id", "team", "opponent", "salary"])
+    slate["game_date"] = [prediction["game_date"] for prediction in predictions]
+    projections = np.array([prediction["prediction"] for prediction in predictions], dtype=float)
+    player_ids = slate["player_id"].astype(int).to_numpy()
+
+    connection = self.pool.getconn()
+    try:
+      history = simulation.fetch_residual_history(
+        connection, player_ids.tolist(), slate["game_date"].min(), simulation.RESIDUAL_LOOKBACK_DAYS
+      )
+    finally:
+      self.pool.putconn(connection)
+
+    residuals = simulation.compute_residuals(history, model)
+    latest_teams = history.sort_values("Date").groupby("player_id")["Team"].last()
+    teams = slate["team"].fillna(slate["player_id"].astype(int).map(latest_teams)).fillna("")
+    team_codes, game_codes = simulation.slate_groups(slate["game_date"], teams, slate["opponent"])
+
+    loadings = simulation.factor_loadings(*simulation.estimate_correlations(residuals))
+    quantiles = simulation.residual_quantiles(residuals, player_ids)
+    draws = simulation.simulate_slate(projections, quantiles, team_codes, game_codes, loadings, simulations, seed)
+    boom, bust = simulation.outcome_thresholds(projections, slate["salary"].astype(float).to_numpy())
+    summary = simulation.summarize_simulations(draws, boom, bust)
+
+    return [{**prediction, **row} for prediction, row in zip(predictions, summary.to_dict("records"))]
+
+
+def get_connection_pool(max_connections: int = 8) -> ThreadedConnectionPool:
+  return ThreadedConnectionPool(
+    1,
+    max_connections,
+    user=os.getenv("DB_USER"),
+    password=os.getenv("DB_PASSWORD"),
+    host=os.getenv("DB_HOST"),
+    port=os.getenv("DB_PORT"),
+    database=os.getenv("DB_NAME"),
+  )
+
+
+def get_listen_connection() -> connection:
+  return psycopg2.connect(
+    user=os.getenv("DB_USER"),
+    password=os.getenv("DB_PASSWORD"),
+    host=os.getenv("DB_HOST"),
+    port=os.getenv("DB_PORT"),
+    database=os.getenv("DB_NAME"),
+  )
+
+
+def make_handler(service: PredictionService) -> type:
+  class PredictionHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+      if self.path == "/health":
+        health = {"status": "ok", "active_version": service.registry.active_version}
+        if service.cache is not None:
+          health["cache"] = {**service.cache.stats(), "live": service.cache.live.is_set()}
+        self._send_json(200, health)
+      elif self.path == "/models":
+        registry = service.registry
+        self._send_json(200, {"active_version": registry.active_version, "versions": list(registry.versions())})
+      else:
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+      if self.path not in ("/predict", "/simulate", "/models/activate", "/models/rollback"):
+        self._send_json(404, {"error": "not found"})
+        return
+
+      try:
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/models/activate":
+          service.registry.activate(body["version"])
+          self._send_json(200, {"active_version": service.registry.active_version})
+        elif self.path == "/models/rollback":
+          self._send_json(200, {"active_version": service.registry.rollback()})
+        elif self.path == "/simulate":
+          distributions = service.simulate_slate(
+            body.get("players", []), body.get("model_version"), int(body.get("simulations", 10_000)), body.get("seed")
+          )
+          self._send_json(200, {"distributions": distributions})
+        else:
+          predictions = service.predict_slate(body.get("players", []), body.get("model_version"))
+          self._send_json(200, {"predictions": predictions})
+      except (ValueError, KeyError, TypeError) as e:
+        self._send_json(400, {"error": str(e)})
+      except Exception as e:
+        logging.error(f"Prediction failed: {e}")
+        self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status: int, payload: dict) -> None:
+      body = json.dumps(payload).encode()
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Content-Length", str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+      logging.debug(format % args)
+
+  return PredictionHandler
+
+
+def serve(service: PredictionService, host: str, port: int) -> None:
+  server = ThreadingHTTPServer((host, port), make_handler(service))
+  server.daemon_threads = True
+  logging.info(f"Prediction service listening on {host}:{port}")
+  try:
+    server.serve_forever()
+  finally:
+    server.server_close()
@@ -0,0 +1,226 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from psycopg2.extensions import connection
+
+from data_pipeline_services.config.common.variables import PLAYER_STATS_DB_COLUMNS
+from data_pipeline_services.feature_generation.features import calculate_rolling_averages, rolling_feature_name
+
+TARGET = "fpts_fanduel"
+# Days of PlayerStats before the slate whose residuals describe each player's spread
+RESIDUAL_LOOKBACK_DAYS = 365
+# A player's own residual quantiles get weight n / (n + SHRINKAGE_GAMES); the rest comes from the pooled residuals
+SHRINKAGE_GAMES = 20
+# Residual quantiles are tabulated at the normal CDF of these scores, so simulated normal scores index
+# the table directly instead of going through the CDF
+Z_GRID = np.linspace(-4.0, 4.0, 161)
+# Largest share of a player's variance the game and team factors may explain together
+MAX_SHARED_VARIANCE = 0.9
+PERCENTILES = [10, 25, 50, 75, 90]
+# Boom / bust thresholds in fantasy points per $1000 of salary, or as multiples of the projection without one
+BOOM_VALUE, BUST_VALUE = 6.0, 4.0
+BOOM_RATIO, BUST_RATIO = 1.5, 0.5
+
+
+def fetch_residual_history(connection: connection, player_ids: List[int], before_date: str, days: int) -> pd.DataFrame:
+  """
+  The players' games in the `days` before before_date, with game, team and opponent for the correlations.
+  """
+  stat_columns = ", ".join(f"ps.{column}" for column in PLAYER_STATS_DB_COLUMNS.values())
+
+  cursor = connection.cursor()
+  cursor.execute(
+    f"""
+    SELECT ps.player_id, ps.game_id, ps.team, ps.opponent, ps.game_date,
+      CASE WHEN ps.team = g.home_team THEN 1 ELSE 0 END, {stat_columns}
+    FROM playerstats ps
+    JOIN games g ON g.game_id = ps.game_id
+    WHERE ps.player_id = ANY(%s::integer[])
+      AND ps.game_date >= %s::date - %s
+      AND ps.game_date < %s::date;
+    """,
+    (list(player_ids), before_date, days, before_date),
+  )
+  rows = cursor.fetchall()
+  cursor.close()
+
+  columns = ["player_id", "game_id", "Team", "Opponent", "Date", "Home"] + list(PLAYER_STATS_DB_COLUMNS)
+  df = pd.DataFrame(rows, columns=columns)
+  df["Date"] = pd.to_datetime(df["Date"])
+  df[list(PLAYER_STATS_DB_COLUMNS)] = df[list(PLAYER_STATS_DB_COLUMNS)].astype(float)
+  return df
+
+
+def compute_residuals(history: pd.DataFrame, model=None) -> pd.DataFrame:
+  """
+  Actual minus projected fantasy points for each historical game that has a full rolling window.
+
+  With a model (a RegisteredModel), the projection is what the service would have served: its features
+  with minutes taken from the rolling average, as for a slate entry without a projected 'mp'. Without
+  one, the rolling average of the target stands in for the projection.
+  """
+  rolled = calculate_rolling_averages(history)
+  if model is not None:
+    features = rolled.assign(MP=rolled[rolling_feature_name("MP")]).reindex(columns=model.features)
+    rolled = rolled[features.notna().all(axis=1).to_numpy()]
+    projected = model.predict(features.dropna().to_numpy(dtype=np.float32))
+  else:
+    rolled = rolled[rolled[rolling_feature_name(TARGET)].notna()]
+    projected = rolled[rolling_feature_name(TARGET)].to_numpy()
+
+  residuals = rolled[["player_id", "game_id", "Team", "Opponent"]].copy()
+  residuals["residual"] = rolled[TARGET].to_numpy() - projected
+  return residuals.dropna(subset=["residual"]).reset_index(drop=True)
+
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+  return np.array([0.5 * math.erfc(-value / math.sqrt(2)) for value in z])
+
+
+def _grouped_quantiles(values: np.ndarray, groups: np.ndarray, n_groups: int, probabilities: np.ndarray) -> np.ndarray:
+  """
+  (n_groups, len(probabilities)) linear-interpolation quantiles of values within each group, in one sort.
+  Groups without values get NaN rows.
+  """
+  order = np.lexsort((values, groups))
+  values, groups = values[order], groups[order]
+  counts = np.bincount(groups, minlength=n_groups)
+  starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+  positions = probabilities[None, :] * np.maximum(counts - 1, 0)[:, None]
+  lower = np.floor(positions).astype(np.int64)
+  upper = np.minimum(lower + 1, np.maximum(counts - 1, 0)[:, None])
+  fraction = positions - lower
+  padded = np.append(values, np.nan)
+  lower_index = np.where(counts[:, None] > 0, starts[:, None] + lower, len(values))
+  upper_index = np.where(counts[:, None] > 0, starts[:, None] + upper, len(values))
+  return padded[lower_index] * (1 - fraction) + padded[upper_index] * fraction
+
+
+def residual_quantiles(residuals: pd.DataFrame, player_ids: np.ndarray) -> np.ndarray:
+  """
+  (players, len(Z_GRID)) table of each slate player's residual quantiles at the normal CDF of Z_GRID:
+  their own empirical quantiles shrunk toward the pooled ones, all pooled for players without history.
+  """
+  probabilities = _normal_cdf(Z_GRID)
+  pooled = np.quantile(residuals["residual"].to_numpy(), probabilities) if len(residuals) else np.zeros(len(Z_GRID))
+
+  positions = pd.Index(player_ids).get_indexer(residuals["player_id"])
+  known = positions >= 0
+  own = _grouped_quantiles(
+    residuals["residual"].to_numpy(dtype=float)[known], positions[known], len(player_ids), probabilities
+  )
+  games = np.bincount(positions[known], minlength=len(player_ids))
+  weight = (games / (games + SHRINKAGE_GAMES))[:, None]
+  return np.where(games[:, None] > 0, weight * own + (1 - weight) * pooled, pooled)
+
+
+def estimate_correlations(residuals: pd.DataFrame) -> Tuple[float, float]:
+  """
+  Average correlation of standardized residuals between teammates and between opponents in the same game.
+
+  By the method of moments on each (game, team) group of n players with residual sum S,
+  E[S^2 - sum z^2] = n (n - 1) rho_team, and for the two sides of a game E[S_a S_b] = n_a n_b rho_opponent.
+  """
+  z = residuals.groupby("player_id")["residual"].transform(lambda r: (r - r.mean()) / r.std(ddof=0))
+  frame = residuals.assign(z=z.fillna(0.0), z2=z.fillna(0.0) ** 2)
+  sides = frame.groupby(["game_id", "Team", "Opponent"]).agg(n=("z", "size"), s=("z", "sum"), s2=("z2", "sum"))
+  sides = sides.reset_index()
+
+  pairs = sides["n"] * (sides["n"] - 1)
+  rho_team = float(((sides["s"] ** 2 - sides["s2"]).sum()) / pairs.sum()) if pairs.sum() else 0.0
+
+  matchups = sides.merge(sides, left_on=["game_id", "Team"], right_on=["game_id", "Opponent"], suffixes=("", "_opp"))
+  cross = (matchups["n"] * matchups["n_opp"]).sum()
+  rho_opponent = float((matchups["s"] * matchups["s_opp"]).sum() / cross) if cross else 0.0
+  return rho_team, rho_opponent
+
+
+def factor_loadings(rho_team: float, rho_opponent: float) -> Tuple[float, float, float]:
+  """
+  Loadings (game, team, own) of the one-factor-per-game, one-factor-per-team normal scores that reproduce
+  the correlations: teammates share both factors, opponents only the game's. A factor model can't express
+  negative correlations, so those are floored at zero.
+  """
+  game = max(rho_opponent, 0.0)
+  team = max(rho_team - game, 0.0)
+  shared = game + team
+  if shared > MAX_SHARED_VARIANCE:
+    game, team = game * MAX_SHARED_VARIANCE / shared, team * MAX_SHARED_VARIANCE / shared
+  return math.sqrt(game), math.sqrt(team), math.sqrt(1.0 - game - team)
+
+
+def simulate_slate(
+  projections: np.ndarray,
+  quantiles: np.ndarray,
+  team_codes: np.ndarray,
+  game_codes: np.ndarray,
+  loadings: Tuple[float, float, float],
+  simulations: int = 10_000,
+  seed: Optional[int] = None,
+) -> np.ndarray:
+  """
+  (simulations, players) fantasy point draws: projection plus a residual drawn through a Gaussian copula.
+
+  Correlated normal scores are a weighted sum of a per-game factor, a per-team factor and an independent
+  term, all drawn as whole arrays. Each score then looks up the player's residual quantile table by
+  linear interpolation on Z_GRID, which is the inverse CDF of their residual distribution.
+  """
+  game_loading, team_loading, own_loading = loadings
+  rng = np.random.default_rng(seed)
+  players = len(projections)
+
+  scores = rng.standard_normal((simulations, players), dtype=np.float32)
+  scores *= own_loading
+  for loading, codes in [(team_loading, team_codes), (game_loading, game_codes)]:
+    if loading:
+      scores += loading * rng.standard_normal((simulations, int(codes.max()) + 1), dtype=np.float32)[:, codes]
+
+  step = Z_GRID[1] - Z_GRID[0]
+  positions = np.clip((scores - Z_GRID[0]) / step, 0, len(Z_GRID) - 1.000001)
+  lower = positions.astype(np.int32)
+  fraction = positions - lower
+
+  table = quantiles.astype(np.float32).ravel()
+  lower += (np.arange(players, dtype=np.int32) * len(Z_GRID))[None, :]
+  draws = table[lower]
+  draws += fraction * (table[lower + 1] - draws)
+  draws += projections.astype(np.float32)[None, :]
+  return draws
+
+
+def summarize_simulations(draws: np.ndarray, boom_points: np.ndarray, bust_points: np.ndarray) -> pd.DataFrame:
+  """
+  Per player: mean, standard deviation, PERCENTILES and the probability of reaching boom_points or falling
+  below bust_points.
+  """
+  summary = pd.DataFrame({"mean": draws.mean(axis=0), "std": draws.std(axis=0)})
+  for percentile, values in zip(PERCENTILES, np.percentile(draws, PERCENTILES, axis=0)):
+    summary[f"p{percentile}"] = values
+  summary["boom_probability"] = (draws >= boom_points[None, :]).mean(axis=0)
+  summary["bust_probability"] = (draws < bust_points[None, :]).mean(axis=0)
+  return summary.astype(float)
+
+
+def outcome_thresholds(projections: np.ndarray, salaries: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Boom and bust points: salary value multiples where a salary is known, projection multiples otherwise.
+  """
+  boom, bust = projections * BOOM_RATIO, projections * BUST_RATIO
+  if salaries is not None:
+    known = ~np.isnan(salaries)
+    boom = np.where(known, salaries / 1000 * BOOM_VALUE, boom)
+    bust = np.where(known, salaries / 1000 * BUST_VALUE, bust)
+  return boom, bust
+
+
+def slate_groups(game_dates: pd.Series, teams: pd.Series, opponents: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Team and game codes of slate entries. Entries without a known opponent get a game of their team's own.
+  """
+  team_keys = game_dates.astype(str) + "/" + teams.astype(str)
+  sides = np.sort(np.stack([teams.astype(str), opponents.fillna(teams).astype(str)], axis=1), axis=1)
+  game_keys = game_dates.astype(str) + "/" + pd.Series(sides[:, 0], index=teams.index) + "/" + sides[:, 1]
+  return pd.factorize(team_keys)[0], pd.factorize(game_keys)[0]
@@ -0,0 +1,138 @@
+import cProfile
+import functools
+import io
+import logging
+import marshal
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict
+
+PROFILE_PREFIX = "profiling"
+TRACEMALLOC_FRAMES = 10
+
+logger = logging.getLogger(__name__)
+
+
+def profiling_enabled(stage: str) -> bool:
+  """
+  PIPELINE_PROFILE is "true"/"all" to profile every stage, or a comma-separated list of stage names.
+  """
+  setting = os.getenv("PIPELINE_PROFILE", "").strip().lower()
+  if setting in ("", "false", "0", "off"):
+    return False
+  return setting in ("true", "1", "all") or stage in {name.strip() for name in setting.split(",")}
+
+
+class StageProfiler:
+  """
+  cProfile plus tracemalloc around one stage run. Artifacts are uploaded to MinIO under
+  profiling/<stage>/<run id>/ and copied to PROFILE_OUTPUT_DIR when that is set.
+  """
+
+  def __init__(self, stage: str, top: int = 20):
+    self.stage = stage
+    self.top = top
+    self.run_id = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    self.profiler = cProfile.Profile()
+
+  def __enter__(self) -> "StageProfiler":
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    self.profiler.enable()
+    return self
+
+  def __exit__(self, *exc_info) -> bool:
+    self.profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    try:
+      artifacts = self.render(snapshot, peak)
+      logger.info(f"Profile summary for {self.stage}:\n{artifacts['summary.txt'].decode()}")
+      self.store(artifacts)
+    except Exception as e:
+      logger.warning(f"Could not save {self.stage} profile: {e}")
+    return False
+
+  def render(self, snapshot: tracemalloc.Snapshot, peak: int) -> Dict[str, bytes]:
+    # Drop the profiler's own frames so the allocation report only shows stage code
+    snapshot = snapshot.filter_traces(
+      [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    )
+
+    cumulative = io.StringIO()
+    stats = pstats.Stats(self.profiler, stream=cumulative)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top * 2)
+
+    own_time = io.StringIO()
+    stats.stream = own_time
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+
+    allocations = snapshot.statistics("lineno")
+    allocation_lines = [f"peak traced memory: {peak / 1e6:.1f} MB"]
+    allocation_lines += [str(statistic) for statistic in allocations[: self.top * 2]]
+    tracebacks = []
+    for statistic in snapshot.statistics("traceback")[:5]:
+      tracebacks.append(f"{statistic.count} blocks, {statistic.size / 1e6:.1f} MB")
+      tracebacks += [f"  {line}" for line in statistic.traceback.format()]
+
+    summary = [f"top {self.top} functions by own time:"]
+    for (file_name, line, function), (_, calls, own, total, _) in sorted(
+      stats.stats.items(), key=lambda item: item[1][2], reverse=True
+    )[: self.top]:
+      summary.append(f"  {own:8.3f}s own {total:8.3f}s cum {calls:>9} calls  {function} ({file_name}:{line})")
+    summary.append(f"top allocations still live at exit (peak traced {peak / 1e6:.1f} MB):")
+    summary += [f"  {statistic}" for statistic in allocations[:5]]
+
+    return {
+      # Loadable with pstats.Stats / snakeviz, like a file from `python -m cProfile -o`
+      "cprofile.prof": marshal.dumps(stats.stats),
+      "cprofile_cumulative.txt": cumulative.getvalue().encode(),
+      "cprofile_own_time.txt": own_time.getvalue().encode(),
+      "tracemalloc.txt": "\n".join(allocation_lines + [""] + tracebacks).encode(),
+      "summary.txt": "\n".join(summary).encode(),
+    }
+
+  def store(self, artifacts: Dict[str, bytes]) -> None:
+    prefix = f"{PROFILE_PREFIX}/{self.stage}/{self.run_id}"
+
+    output_dir = os.getenv("PROFILE_OUTPUT_DIR")
+    if output_dir:
+      directory = os.path.join(output_dir, prefix)
+      os.makedirs(directory, exist_ok=True)
+      for name, payload in artifacts.items():
+        with open(os.path.join(directory, name), "wb") as file:
+          file.write(payload)
+      logger.info(f"Profile written to {directory}")
+
+    bucket_name = os.getenv("MINIO_BUCKET_NAME")
+    if not bucket_name:
+      return
+    from data_pipeline_services.minio_operations import get_minio_client, upload_to_minio
+
+    minio_client = get_minio_client()
+    for name, payload in artifacts.items():
+      content_type = "text/plain" if name.endswith(".txt") else "application/octet-stream"
+      upload_to_minio(minio_client, io.BytesIO(payload), bucket_name, f"{prefix}/{name}", content_type=content_type)
+    logger.info(f"Profile uploaded to {bucket_name}/{prefix}/")
+
+
+def profiled(stage: str, top: int = 20) -> Callable:
+  """
+  Run a stage entry point under StageProfiler when profiling_enabled(stage); otherwise call it directly.
+  The check happens once per call, so a disabled profiler costs nothing inside the stage.
+  """
+
+  def decorator(function: Callable) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+      if not profiling_enabled(stage):
+        return function(*args, **kwargs)
+      with StageProfiler(stage, top):
+        return function(*args, **kwargs)
+
+    return wrapper
+
+  return decorator
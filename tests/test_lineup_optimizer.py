@@ -0,0 +1,104 @@
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from data_pipeline_services.config.common.paths import config_path
+from data_pipeline_services.lineup_optimizer.optimizer import LineupSearch
+
+SMALL_PLATFORM = {
+  "salary_cap": 30000,
+  "max_players_per_team": 3,
+  "slots": {
+    "G": {"count": 2, "positions": ["PG", "SG"]},
+    "F": {"count": 2, "positions": ["SF", "PF"]},
+    "C": {"count": 1, "positions": ["C"]},
+    "UTIL": {"count": 1, "positions": ["PG", "SG", "SF", "PF", "C"]},
+  },
+}
+SMALL_ROSTER = ["PG", "SG", "SF", "PF", "C", "PG/SG", "SF/PF"]
+FULL_ROSTER = ["PG", "PG", "SG", "SG", "SF", "SF", "PF", "PF", "C", "C", "PG/SG", "SF/PF", "PF/C"]
+
+
+def projection_priced_pool(n_teams: int, roster: list, seed: int = 0) -> pd.DataFrame:
+  """
+  Salaries follow projections plus a fixed base, which puts the multiplier minimizing the salary bound
+  above every player's points per dollar.
+  """
+  rng = np.random.default_rng(seed)
+  rows = []
+  for team in range(n_teams):
+    for number, position in enumerate(roster):
+      projection = float(rng.gamma(2.0, 9.0))
+      salary = max(3000, int(round((4000 + 200 * projection + rng.normal(0, 100)) / 100) * 100))
+      name = f"T{team} {number}"
+      rows.append({"Name": name, "Position": position, "Salary": salary, "Team": f"T{team}", "projection": projection})
+  pool = pd.DataFrame(rows)
+  pool["Positions"] = pool["Position"].str.split("/")
+  return pool
+
+
+def fanduel_config() -> dict:
+  with open(config_path("lineup_optimizer", "roster_config.yml"), "r") as file:
+    return yaml.safe_load(file)["platforms"]["fanduel"]
+
+
+def fits_roster(positions: list, seats: list) -> bool:
+  if not seats:
+    return True
+  allowed = set(SMALL_PLATFORM["slots"][seats[0]]["positions"])
+  return any(
+    allowed.intersection(player) and fits_roster(positions[:index] + positions[index + 1 :], seats[1:])
+    for index, player in enumerate(positions)
+  )
+
+
+def brute_force_values(pool: pd.DataFrame, k: int) -> list:
+  seats = [name for name, slot in SMALL_PLATFORM["slots"].items() for _ in range(slot["count"])]
+  values = []
+  for players in itertools.combinations(range(len(pool)), len(seats)):
+    lineup = pool.iloc[list(players)]
+    if lineup["Salary"].sum() > SMALL_PLATFORM["salary_cap"]:
+      continue
+    if lineup["Team"].value_counts().max() > SMALL_PLATFORM["max_players_per_team"]:
+      continue
+    if fits_roster(list(lineup["Positions"]), seats):
+      values.append(lineup["projection"].sum())
+  return sorted(values, reverse=True)[:k]
+
+
+def test_top_k_matches_brute_force():
+  pool = projection_priced_pool(3, SMALL_ROSTER)
+  search = LineupSearch(pool, SMALL_PLATFORM)
+
+  started = time.perf_counter()
+  lineups = search.top_k(10, np.zeros(len(pool), dtype=bool), set())
+  elapsed = time.perf_counter() - started
+
+  np.testing.assert_allclose([value for value, _, _ in lineups], brute_force_values(pool, 10))
+  assert elapsed < 1.0
+
+
+def test_projection_priced_fanduel_slate_is_fast():
+  pool = projection_priced_pool(4, FULL_ROSTER)
+  search = LineupSearch(pool, fanduel_config())
+
+  started = time.perf_counter()
+  lineups = search.top_k(1, np.zeros(len(pool), dtype=bool), set())
+  elapsed = time.perf_counter() - started
+
+  assert len(lineups) == 1
+  assert pool["Salary"].iloc[lineups[0][1]].sum() <= fanduel_config()["salary_cap"]
+  assert elapsed < 1.0
+
+
+def test_search_stops_at_node_budget():
+  pool = projection_priced_pool(4, FULL_ROSTER)
+  search = LineupSearch(pool, fanduel_config(), max_nodes=100)
+
+  started = time.perf_counter()
+  search.top_k(10, np.zeros(len(pool), dtype=bool), set())
+
+  assert time.perf_counter() - started < 1.0